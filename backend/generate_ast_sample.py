@@ -214,7 +214,7 @@ def create_large_ast_document():
         # Parse to AST
         print("🔄 Parsing markdown to AST...")
         ast_service = ASTService()
-        content_ast = ast_service.parse_markdown_to_ast(markdown_content)
+        content_ast = ast_service.parse_markdown_to_ast_parallel(markdown_content)
         
         print(f"✅ Created AST with {content_ast['metadata']['nodeCount']} nodes")
         print(f"📊 Metadata: {content_ast['metadata']['wordCount']} words, {content_ast['metadata']['pageCount']} pages")
@@ -5,16 +5,24 @@ FastAPI application with AST document management
 
 import time
 import logging
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Union
 from uuid import UUID
-from fastapi import FastAPI, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, create_tables, Document
+from database import get_async_db, create_tables_async, Document
 from services.document_service import DocumentService
 from services.ast_service import ASTService
+from services.parse_cache import parse_cache
+from services.document_cache import document_cache
+from services.cache_invalidation import DOCUMENT_CACHE_LISTEN, document_change_listener
+from services.worker_pool import WorkerPoolError, WorkerPoolSaturated, TaskTooLarge, worker_pool
+from services.json_stream import iter_json, iter_ndjson
+from services.compression import CompressionMiddleware, compressed_responses, uncompressed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +46,16 @@ class NodeOperation(BaseModel):
     operation: str  # update, insert, delete, move
     data: Dict[str, Any]
 
+class NodeContentUpdate(BaseModel):
+    content: str
+
+class DocumentSummary(BaseModel):
+    id: str
+    title: str
+    metadata: Dict[str, Any]
+    created_at: str
+    updated_at: str
+
 class DocumentResponse(BaseModel):
     id: str
     title: str
@@ -59,9 +77,93 @@ class VirtualBlock(BaseModel):
     isCollapsed: bool = False
 
 class DocumentBlocksResponse(BaseModel):
-    document: DocumentResponse
+    document: Optional[DocumentResponse] = None
     blocks: List[VirtualBlock]
-    outline: List[Dict[str, Any]]
+    outline: Optional[List[Dict[str, Any]]] = None
+    total: int = 0  # Blocks matching the type filter, in the whole document
+    offset: int = 0  # Position of the first returned block among them
+
+# Precompiled serializer for summary pages
+summary_list_adapter = TypeAdapter(List[DocumentSummary])
+VIRTUAL_BLOCK_FIELDS = tuple(VirtualBlock.model_fields)
+
+# Response helpers: payloads built here come from the database and our own
+# services, so they skip FastAPI's response_model validation and are encoded
+# with orjson. The response_model declared on each route still documents
+# the schema.
+def document_response(document: Document) -> Dict[str, Any]:
+    """Build a DocumentResponse payload without validating it."""
+    return {
+        "id": str(document.id),
+        "title": document.title,
+        "content_ast": document_service.storage.without_manifest(document.content_ast),
+        "raw_markdown": document.raw_markdown,
+        "metadata": document.doc_metadata,
+        "created_at": document.created_at.isoformat(),
+        "updated_at": document.updated_at.isoformat()
+    }
+
+def json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Encode a trusted payload with orjson, bypassing response_model processing."""
+    return ORJSONResponse(content, headers=headers)
+
+def streaming_json_response(content: Any, depth: int = 1,
+                            headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Encode a trusted payload incrementally while it is sent (see iter_json),
+    for responses whose size grows with the document.
+    """
+    return StreamingResponse(iter_json(content, depth), media_type="application/json", headers=headers)
+
+# Conditional GET: reads of a document are tagged with its version (updated_at)
+VERSION_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def version_tag(version: datetime) -> str:
+    """Encode a document version as used in ETags and ?v= URLs."""
+    return str((version - VERSION_EPOCH) // timedelta(microseconds=1))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def tag_version(tag: str) -> datetime:
+    """Decode a version tag (see version_tag)."""
+    return VERSION_EPOCH + timedelta(microseconds=int(tag))
+
+def version_headers(version: datetime, v: Optional[str] = None) -> Dict[str, str]:
+    """
+    Get the ETag and Cache-Control headers of a response whose body was
+    read at version.
+
+    Raises 404 if v names another version. Responses to ?v= URLs never
+    change, so they may be cached for good.
+    """
+    tag = version_tag(version)
+    if v is not None and v != tag:
+        raise HTTPException(status_code=404, detail="Document version not found")
+    return {"ETag": f'"{tag}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL if v is not None else "no-cache"}
+
+async def check_version(request: Request, db: AsyncSession, document_id: str, v: Optional[str] = None) -> None:
+    """
+    Check a read of a document against its current version, before
+    anything is loaded.
+
+    Raises 304 if If-None-Match already names the current version, and 404
+    if the document is missing or v names another version. A write may
+    still land before the body is read, so responses are tagged with the
+    version of the body they send, not the one checked here.
+    """
+    version = await document_service.get_version(db, document_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    headers = version_headers(version, v)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        raise HTTPException(status_code=304, headers=headers)
 
 # FastAPI app
 app = FastAPI(title="AST-based Markdown Editor API", version="2.0.0")
@@ -73,8 +175,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Response compression (brotli or gzip, negotiated per request)
+app.add_middleware(CompressionMiddleware)
+
 # Performance monitoring middleware
 @app.middleware("http")
 async def performance_middleware(request, call_next):
@@ -87,18 +193,56 @@ async def performance_middleware(request, call_next):
 
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    await create_tables_async()
     logger.info("Database tables created for AST-based documents")
+    # Other workers' writes reach the document cache via LISTEN/NOTIFY
+    if DOCUMENT_CACHE_LISTEN:
+        await document_change_listener.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await document_change_listener.stop()
+    worker_pool.shutdown()
+
+# Worker pool refusals: saturated lanes ask clients to retry, oversized inputs are rejected
+@app.exception_handler(WorkerPoolSaturated)
+async def worker_pool_saturated_handler(request: Request, exc: WorkerPoolSaturated):
+    logger.warning(f"{request.method} {request.url.path} rejected: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(TaskTooLarge)
+async def task_too_large_handler(request: Request, exc: TaskTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
 
 @app.get("/health")
+@uncompressed
 async def health_check():
     return {"status": "healthy", "version": "2.0.0", "type": "ast-based"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Get hit/miss counters for the server-side caches."""
+    return {
+        "parse": parse_cache.get_stats(),
+        "documents": document_cache.get_stats(),
+        "compressed": compressed_responses.get_stats(),
+        "invalidation": document_change_listener.get_stats()
+    }
+
+@app.get("/workers/stats")
+async def worker_stats():
+    """Get admission counters for the parse and transform workers."""
+    return worker_pool.get_stats()
+
 # Document CRUD endpoints
 @app.post("/documents", response_model=DocumentResponse)
 async def create_document(
     document_data: DocumentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new document from markdown content."""
     try:
@@ -106,41 +250,59 @@ async def create_document(
             db, document_data.title, document_data.markdown_content
         )
         
-        return DocumentResponse(
-            id=str(document.id),
-            title=document.title,
-            content_ast=document.content_ast,
-            raw_markdown=document.raw_markdown,
-            metadata=document.doc_metadata,
-            created_at=document.created_at.isoformat(),
-            updated_at=document.updated_at.isoformat()
-        )
+        return json_response(document_response(document))
+    except (HTTPException, WorkerPoolError):
+        raise
     except Exception as e:
         logger.error(f"Error creating document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/documents", response_model=List[DocumentResponse])
+@app.get("/documents", response_model=Union[List[DocumentSummary], List[DocumentResponse]])
 async def list_documents(
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Offset (view=full only)"),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    view: str = Query("summary", regex="^(summary|full)$"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (view=summary only)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List documents with pagination."""
+    """
+    List documents, newest first.
+    
+    The default summary view returns id, title, metadata and timestamps
+    only, paginated by keyset: pass the X-Next-Cursor response header back
+    as cursor to get the next page. view=full returns complete documents
+    with offset pagination. Mixing the two pagination styles is rejected.
+    """
+    if view == "summary" and skip:
+        raise HTTPException(status_code=400, detail="skip is not supported by view=summary; page with cursor")
+    if view == "full" and cursor is not None:
+        raise HTTPException(status_code=400, detail="cursor is only supported by view=summary")
+    
     try:
+        if view == "summary":
+            documents, next_cursor = await document_service.list_document_summaries(db, limit, cursor)
+            
+            summaries = [
+                DocumentSummary.model_construct(
+                    id=str(doc.id),
+                    title=doc.title,
+                    metadata=doc.doc_metadata or {},
+                    created_at=doc.created_at.isoformat(),
+                    updated_at=doc.updated_at.isoformat()
+                )
+                for doc in documents
+            ]
+            return Response(
+                summary_list_adapter.dump_json(summaries),
+                media_type="application/json",
+                headers={"X-Next-Cursor": next_cursor} if next_cursor else None
+            )
+        
         documents = await document_service.list_documents(db, skip, limit)
         
-        return [
-            DocumentResponse(
-                id=str(doc.id),
-                title=doc.title,
-                content_ast=doc.content_ast,
-                raw_markdown=doc.raw_markdown,
-                metadata=doc.doc_metadata,
-                created_at=doc.created_at.isoformat(),
-                updated_at=doc.updated_at.isoformat()
-            )
-            for doc in documents
-        ]
+        return json_response([document_response(doc) for doc in documents])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -148,24 +310,25 @@ async def list_documents(
 @app.get("/documents/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a document by ID."""
     try:
-        document = await document_service.get_document(db, document_id)
-        if not document:
+        await check_version(request, db, document_id, v)
+        # The body is read on a session of its own; don't hold this one's connection while it streams
+        await db.close()
+        
+        # The AST is passed through as stored (or as cached) JSON, never re-encoded
+        result = await document_service.get_document_json(document_id, tag_version(v) if v is not None else None)
+        if not result:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return DocumentResponse(
-            id=str(document.id),
-            title=document.title,
-            content_ast=document.content_ast,
-            raw_markdown=document.raw_markdown,
-            metadata=document.doc_metadata,
-            created_at=document.created_at.isoformat(),
-            updated_at=document.updated_at.isoformat()
-        )
-    except HTTPException:
+        document, ast_json = result
+        headers = version_headers(document.updated_at, v)
+        return streaming_json_response({**document_response(document), "content_ast": ast_json}, headers=headers)
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error getting document {document_id}: {e}")
@@ -175,7 +338,7 @@ async def get_document(
 async def update_document(
     document_id: str,
     update_data: DocumentUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a document."""
     try:
@@ -189,16 +352,8 @@ async def update_document(
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return DocumentResponse(
-            id=str(document.id),
-            title=document.title,
-            content_ast=document.content_ast,
-            raw_markdown=document.raw_markdown,
-            metadata=document.doc_metadata,
-            created_at=document.created_at.isoformat(),
-            updated_at=document.updated_at.isoformat()
-        )
-    except HTTPException:
+        return json_response(document_response(document))
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error updating document {document_id}: {e}")
@@ -207,7 +362,7 @@ async def update_document(
 @app.delete("/documents/{document_id}")
 async def delete_document(
     document_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a document."""
     try:
@@ -216,7 +371,7 @@ async def delete_document(
             raise HTTPException(status_code=404, detail="Document not found")
         
         return {"message": "Document deleted successfully"}
-    except HTTPException:
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error deleting document {document_id}: {e}")
@@ -228,7 +383,7 @@ async def update_ast_node(
     document_id: str,
     node_id: str,
     operation: NodeOperation,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a specific AST node in a document."""
     try:
@@ -239,26 +394,44 @@ async def update_ast_node(
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return DocumentResponse(
-            id=str(document.id),
-            title=document.title,
-            content_ast=document.content_ast,
-            raw_markdown=document.raw_markdown,
-            metadata=document.doc_metadata,
-            created_at=document.created_at.isoformat(),
-            updated_at=document.updated_at.isoformat()
-        )
-    except HTTPException:
+        return json_response(document_response(document))
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error updating node {node_id} in document {document_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.put("/documents/{document_id}/nodes/{node_id}/content")
+async def update_node_content(
+    document_id: str,
+    node_id: str,
+    update: NodeContentUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a node's content, returning only the new document metadata."""
+    try:
+        metadata = await document_service.update_node_content(db, document_id, node_id, update.content)
+        if metadata is None:
+            # Documents stored in a single row take the regular path
+            document = await document_service.update_ast_node(
+                db, document_id, node_id, "update", {"content": update.content}, fast_path=False
+            )
+            if not document:
+                raise HTTPException(status_code=404, detail="Document not found")
+            metadata = document.doc_metadata
+        
+        return {"id": document_id, "node_id": node_id, "metadata": metadata}
+    except (HTTPException, WorkerPoolError):
+        raise
+    except Exception as e:
+        logger.error(f"Error updating content of node {node_id} in document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/documents/{document_id}/update-from-markdown", response_model=DocumentResponse)
 async def update_document_from_markdown(
     document_id: str,
     request: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update entire document from raw markdown content."""
     try:
@@ -271,15 +444,9 @@ async def update_document_from_markdown(
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        return DocumentResponse(
-            id=str(document.id),
-            title=document.title,
-            content_ast=document.content_ast,
-            raw_markdown=document.raw_markdown,
-            metadata=document.doc_metadata,
-            created_at=document.created_at.isoformat(),
-            updated_at=document.updated_at.isoformat()
-        )
+        return json_response(document_response(document))
+    except (HTTPException, WorkerPoolError):
+        raise
     except Exception as e:
         logger.error(f"Failed to update document from markdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -288,73 +455,233 @@ async def update_document_from_markdown(
 @app.get("/documents/{document_id}/blocks", response_model=DocumentBlocksResponse)
 async def get_document_blocks(
     document_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    anchor: Optional[str] = Query(None),
+    before: int = Query(0, ge=0),
+    after: int = Query(50, ge=0),
+    types: Optional[str] = Query(None, description="Comma-separated node types to include"),
+    include_document: bool = Query(True),
+    include_outline: bool = Query(True),
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get document with flattened blocks for frontend rendering."""
+    """
+    Get flattened blocks for frontend rendering.
+    
+    Returns a window of blocks: from offset (up to limit, all by default),
+    or around the anchor node with before/after blocks on either side.
+    include_document=false leaves out the document and its AST, and then
+    the window and outline are served without loading the document.
+    """
     try:
-        document = await document_service.get_document(db, document_id)
-        if not document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        
-        # Flatten AST to virtual blocks
-        blocks = document_service.flatten_ast_to_blocks(document)
+        await check_version(request, db, document_id, v)
+        type_filter = [t for t in types.split(",") if t] if types else None
         
-        # Generate outline
-        outline = document_service.get_document_outline(document)
+        document = window = outline = None
+        try:
+            if not include_document:
+                window = await document_service.get_document_block_window(
+                    db, document_id, offset, limit, anchor, before, after, type_filter
+                )
+                if window is None:
+                    raise HTTPException(status_code=404, detail="Document not found")
+                if include_outline:
+                    result = await document_service.get_document_view(db, document_id, "outline")
+                    if result is None:
+                        raise HTTPException(status_code=404, detail="Document not found")
+                    outline, outline_version = result
+                    if outline_version != window["version"]:
+                        # A write landed between the two reads; take both from one loaded version
+                        window = None
+            
+            if window is None:
+                document = await document_service.get_document(db, document_id)
+                if not document:
+                    raise HTTPException(status_code=404, detail="Document not found")
+                
+                # Cut the window from the flattened blocks
+                window = await document_service.get_block_window(
+                    db, document, offset, limit, anchor, before, after, type_filter
+                )
+                outline = await document_service.get_outline(db, document) if include_outline else None
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Anchor node not found")
         
-        return DocumentBlocksResponse(
-            document=DocumentResponse(
-                id=str(document.id),
-                title=document.title,
-                content_ast=document.content_ast,
-                raw_markdown=document.raw_markdown,
-                metadata=document.doc_metadata,
-                created_at=document.created_at.isoformat(),
-                updated_at=document.updated_at.isoformat()
-            ),
-            blocks=[VirtualBlock(**block) for block in blocks],
-            outline=outline
-        )
-    except HTTPException:
+        headers = version_headers(window["version"], v)
+        return streaming_json_response({
+            "document": document_response(document) if include_document else None,
+            "blocks": [
+                {field: block.get(field) for field in VIRTUAL_BLOCK_FIELDS}
+                for block in window["blocks"]
+            ],
+            "outline": outline,
+            "total": window["total"],
+            "offset": window["offset"]
+        }, depth=4, headers=headers)
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error getting blocks for document {document_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/documents/{document_id}/blocks.ndjson")
+async def stream_document_blocks(
+    document_id: str,
+    request: Request,
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream all blocks of a document as newline-delimited JSON, one block per
+    line in document order, so rendering can start before the last block
+    has been produced.
+    """
+    try:
+        await check_version(request, db, document_id, v)
+        
+        result = await document_service.stream_blocks(document_id, tag_version(v) if v is not None else None)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        blocks, version = result
+        return StreamingResponse(iter_ndjson(blocks), media_type="application/x-ndjson", headers=version_headers(version, v))
+    except (HTTPException, WorkerPoolError):
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming blocks for document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/documents/{document_id}/outline")
 async def get_document_outline(
     document_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get document outline (Table of Contents)."""
     try:
-        document = await document_service.get_document(db, document_id)
-        if not document:
+        await check_version(request, db, document_id, v)
+        
+        result = await document_service.get_document_view(db, document_id, "outline")
+        if result is None:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        outline = document_service.get_document_outline(document)
-        return {"outline": outline}
-    except HTTPException:
+        outline, version = result
+        return json_response({"outline": outline}, headers=version_headers(version, v))
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error getting outline for document {document_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/documents/{document_id}/stats")
+async def get_document_stats(
+    document_id: str,
+    request: Request,
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get document statistics (counts by node type, sections, headings)."""
+    try:
+        await check_version(request, db, document_id, v)
+        
+        result = await document_service.get_document_view(db, document_id, "stats")
+        if result is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        stats, version = result
+        return json_response(stats, headers=version_headers(version, v))
+    except (HTTPException, WorkerPoolError):
+        raise
+    except Exception as e:
+        logger.error(f"Error getting stats for document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/documents/{document_id}/nodes/{node_id}")
+async def get_document_node(
+    document_id: str,
+    node_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one node with its subtree, without loading the whole document."""
+    try:
+        node = await document_service.get_node(db, document_id, node_id)
+        if node is None:
+            raise HTTPException(status_code=404, detail="Node not found")
+        
+        return json_response(node)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting node {node_id} of document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/documents/{document_id}/children")
+async def get_document_children(
+    document_id: str,
+    start: int = Query(0, ge=0),
+    end: int = Query(100, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get top-level nodes [start, end), without loading the whole document."""
+    try:
+        children = await document_service.get_children(db, document_id, start, end)
+        if children is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        return json_response(children)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting children of document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/documents/{document_id}/sections/{node_id}")
+async def get_document_section(
+    document_id: str,
+    node_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the section started by a top-level heading, with its nodes."""
+    try:
+        document = await document_service.get_document(db, document_id, load_content=False)
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        section = await document_service.get_section(db, document, node_id)
+        if section is None:
+            raise HTTPException(status_code=404, detail="Section not found")
+        
+        return json_response(section)
+    except (HTTPException, WorkerPoolError):
+        raise
+    except Exception as e:
+        logger.error(f"Error getting section {node_id} of document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Export endpoints
 @app.get("/documents/{document_id}/export")
 async def export_document(
     document_id: str,
+    request: Request,
     format: str = Query("markdown", regex="^(markdown|html)$"),
-    db: Session = Depends(get_db)
+    section: Optional[str] = Query(None),
+    v: Optional[str] = Query(None, description="Version (from the ETag) the response must be"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Export document in specified format."""
+    """Export document (or the section started by a heading) in specified format."""
     try:
-        content = await document_service.export_document(db, document_id, format)
-        if content is None:
+        await check_version(request, db, document_id, v)
+        
+        result = await document_service.export_document(db, document_id, format, section)
+        if result is None:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return {"content": content, "format": format}
-    except HTTPException:
+        content, version = result
+        return streaming_json_response({"content": content, "format": format}, headers=version_headers(version, v))
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error exporting document {document_id}: {e}")
@@ -365,7 +692,7 @@ async def export_document(
 async def search_document(
     document_id: str,
     q: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search within a document."""
     try:
@@ -373,9 +700,11 @@ async def search_document(
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        matches = document_service.search_document_content(document, q)
-        return {"query": q, "matches": matches}
-    except HTTPException:
+        matches = await worker_pool.run_transform(
+            document_service.search_document_content, document, q, size=document_service.node_count(document)
+        )
+        return json_response({"query": q, "matches": matches})
+    except (HTTPException, WorkerPoolError):
         raise
     except Exception as e:
         logger.error(f"Error searching document {document_id}: {e}")
@@ -3,15 +3,40 @@ AST Service for parsing and manipulating markdown documents.
 Handles conversion between markdown and AST, and AST node operations.
 """
 
-import uuid
 import re
+import bisect
+import hashlib
+import json
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 from markdown_it import MarkdownIt
 from markdown_it.token import Token
 
+from services.parse_cache import ParseCache, parse_cache
+from services.node_index import NodeIndex
+
+
+# A line that would continue a preceding list or indented block instead of
+# starting a fresh top-level block.
+CONTINUATION_LINE = re.compile(r"^(?:[ \t]|[-+*][ \t]|\d{1,9}[.)][ \t])")
+FENCE_LINE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+WORD = re.compile(r"\w+")
+
+# Bump when the AST layout changes so cached parses are invalidated
+AST_FORMAT_VERSION = 4
+
+# Inputs at least this large are parsed in chunks across worker processes
+PARALLEL_PARSE_THRESHOLD = 1024 * 1024
+PARSE_CHUNK_SIZE = 256 * 1024
+
+# Pending line shifts kept before structural edits resolve positions eagerly
+MAX_PENDING_LINE_SHIFTS = 256
+
 
 class ASTService:
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = parse_cache, section_tree: bool = True):
         # Configure markdown-it with plugins for rich parsing
         self.md = MarkdownIt("commonmark", {
             "html": True,
@@ -21,34 +46,250 @@ class ASTService:
             'table',
             'strikethrough'
         ])
+        
+        # The AST keeps block structure and raw inline source only, so
+        # tokenizing inline content would be thrown away
+        self.md.disable(['inline', 'text_join'])
+        
+        # Heading sections are precomputed on every parsed document
+        self.section_tree = section_tree
+        
+        # Parsed ASTs are cached by content hash plus parser configuration
+        self.cache = cache
+        self.config_hash = hashlib.sha1(json.dumps({
+            "format": AST_FORMAT_VERSION,
+            "sections": section_tree,
+            "options": dict(self.md.options),
+            "rules": self.md.get_active_rules()
+        }, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        
+        # Node indexes keyed by AST identity, kept only while their users hold
+        # them (the document cache does for cached versions); shared by the
+        # event loop and transform threads
+        self._indexes: "weakref.WeakValueDictionary[int, NodeIndex]" = weakref.WeakValueDictionary()
+        self._indexes_lock = threading.Lock()
     
     def parse_markdown_to_ast(self, markdown: str) -> Dict[str, Any]:
         """
         Convert markdown text to AST structure with node IDs.
         
+        Markdown parsed before with the same configuration is served from
+        the parse cache.
+        
         Args:
             markdown: Raw markdown text
             
         Returns:
             AST dictionary with document structure
         """
+        return self._cached_parse(markdown, self._parse_markdown)
+    
+    def _parse_markdown(self, markdown: str) -> Dict[str, Any]:
+        """Parse markdown to AST without consulting the cache."""
         if not markdown.strip():
-            return self._create_empty_document()
+            return self._attach_sections(self._create_empty_document())
         
         # Parse markdown to tokens
         tokens = self.md.parse(markdown)
         
-        # Convert tokens to AST
+        # Build the AST, node IDs and metadata in one pass over the tokens
         ast = self._tokens_to_ast(tokens)
+        ast["sourceHash"] = self._source_hash(markdown)
         
-        # Assign unique IDs to all nodes
-        self._assign_node_ids(ast)
+        return self._attach_sections(ast)
+    
+    def parse_markdown_to_ast_parallel(self, markdown: str, executor: Optional[Executor] = None,
+                                       max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Convert markdown text to AST, parsing large inputs in parallel.
         
-        # Calculate metadata
-        metadata = self._calculate_metadata(ast)
-        ast["metadata"] = metadata
+        The input is split into chunks at top-level block boundaries, the
+        chunks are parsed in worker processes and the partial ASTs are joined
+        with their positions offset to the chunk start. The result is the same
+        as parse_markdown_to_ast; small inputs are parsed as a single task.
         
-        return ast
+        Args:
+            markdown: Raw markdown text
+            executor: Process pool to parse on (a temporary one if omitted)
+            max_workers: Size of the temporary process pool
+            
+        Returns:
+            AST dictionary with document structure
+        """
+        return self._cached_parse(
+            markdown, lambda text: self._parse_markdown_parallel(text, executor, max_workers)
+        )
+    
+    def _parse_markdown_parallel(self, markdown: str, executor: Optional[Executor],
+                                 max_workers: Optional[int]) -> Dict[str, Any]:
+        """Parse markdown in parallel chunks without consulting the cache."""
+        if len(markdown) < PARALLEL_PARSE_THRESHOLD:
+            return self._parse_whole(markdown, executor)
+        
+        lines = self._split_lines(markdown)
+        bounds = self._chunk_boundaries(lines, PARSE_CHUNK_SIZE)
+        if len(bounds) < 2:
+            return self._parse_whole(markdown, executor)
+        
+        chunks = [
+            (lines[start:end], lines[end] if end < len(lines) else None, start)
+            for start, end in zip(bounds, bounds[1:] + [len(lines)])
+        ]
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_parse_chunk_in_worker, chunks))
+        else:
+            results = list(executor.map(_parse_chunk_in_worker, chunks))
+        
+        # A chunk that could not be parsed on its own invalidates the split
+        if any(result is None for result in results):
+            return self._parse_whole(markdown, executor)
+        
+        children = []
+        word_count = 0
+        node_count = 0
+        for chunk_children, chunk_words, chunk_nodes in results:
+            children.extend(chunk_children)
+            word_count += chunk_words
+            node_count += chunk_nodes
+        self._resolve_node_ids(children, {})
+        
+        return self._attach_sections({
+            "type": "document",
+            "children": children,
+            "metadata": self._document_metadata(word_count, node_count),
+            "sourceHash": self._source_hash(markdown)
+        })
+    
+    def _parse_whole(self, markdown: str, executor: Optional[Executor]) -> Dict[str, Any]:
+        """Parse markdown as one task, in a worker process if an executor is given."""
+        if executor is None:
+            return self._parse_markdown(markdown)
+        return executor.submit(_parse_in_worker, markdown).result()
+    
+    def reparse_markdown_incremental(self, ast: Dict[str, Any], old_markdown: str, new_markdown: str,
+                                     executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Re-parse only the top-level blocks touched by an edit.
+        
+        The old and new markdown are diffed line by line, the changed range is
+        mapped onto top-level blocks through their stored positions, and only
+        those blocks are parsed again and spliced into the AST. Untouched nodes
+        keep their IDs and identity: nodes after the edit are shared with the
+        input AST (which is left unchanged) and how far their lines moved is
+        queued in lineShifts, as structural edits do.
+        Falls back to a full parse whenever the splice could differ from it.
+        
+        Only the diff and the splice run in the calling thread; with an
+        executor, the region and any full parse are parsed in its processes.
+        
+        Args:
+            ast: AST previously parsed from old_markdown
+            old_markdown: Markdown the AST was parsed from
+            new_markdown: Edited markdown
+            executor: Process pool to parse on (in-process if omitted)
+            
+        Returns:
+            AST for new_markdown
+        """
+        if (not ast or not new_markdown.strip()
+                or ast.get("sourceHash") != self._source_hash(old_markdown)):
+            return self._full_parse(new_markdown, executor)
+        
+        old_lines = self._split_lines(old_markdown)
+        new_lines = self._split_lines(new_markdown)
+        if old_lines == new_lines:
+            return ast
+        
+        children = ast.get("children", [])
+        shifts = ast.get("lineShifts", [])
+        groups = self._top_level_groups(children, len(old_lines), shifts)
+        if not groups:
+            return self._full_parse(new_markdown, executor)
+        
+        # Changed line range, as [prefix, len - suffix) in both versions
+        prefix = 0
+        max_prefix = min(len(old_lines), len(new_lines))
+        while prefix < max_prefix and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        max_suffix = max_prefix - prefix
+        while suffix < max_suffix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+            suffix += 1
+        old_change_end = len(old_lines) - suffix
+        delta = len(new_lines) - len(old_lines)
+        
+        # Affected groups plus one block of context on each side
+        first = 0
+        while first + 1 < len(groups) and groups[first + 1][1] <= prefix:
+            first += 1
+        first = max(first - 1, 0)
+        last = first
+        while last < len(groups) and groups[last][1] < old_change_end:
+            last += 1
+        last = min(last + 1, len(groups))
+        
+        # Widen until both ends sit on boundaries that start a fresh block
+        while first > 0 and not self._is_block_boundary(new_lines, groups[first][1]):
+            first -= 1
+        while last < len(groups) and not self._is_block_boundary(new_lines, groups[last][1] + delta):
+            last += 1
+        
+        # Lines before the first block (blank lines, reference definitions) belong to it
+        start_line = groups[first][1] if first > 0 else 0
+        end_line = groups[last][1] + delta if last < len(groups) else len(new_lines)
+        next_line = new_lines[end_line] if end_line < len(new_lines) else None
+        chunk = (new_lines[start_line:end_line], next_line, start_line)
+        if executor is None:
+            region = self._parse_chunk(*chunk)
+        else:
+            region = executor.submit(_parse_chunk_in_worker, chunk).result()
+        if region is None:
+            return self._full_parse(new_markdown, executor)
+        
+        first_child = groups[first][0]
+        last_child = groups[last][0] if last < len(groups) else len(children)
+        old_nodes = children[first_child:last_child]
+        tail = children[last_child:]
+        
+        # New nodes must not reuse IDs of the nodes that are kept
+        id_counts = {}
+        self._count_node_ids(children[:first_child], id_counts)
+        self._count_node_ids(tail, id_counts)
+        new_nodes, added_words, added_count = region
+        self._resolve_node_ids(new_nodes, id_counts)
+        
+        # Lines of the tail move by delta; the new nodes' positions are current already
+        new_shifts = list(shifts)
+        if delta and tail:
+            new_shifts.append([groups[last][1] + 1, delta])
+        if new_shifts:
+            self._mark_shifts_applied(new_nodes, len(new_shifts))
+        
+        removed_words, removed_count = self._count_nodes(old_nodes)
+        old_metadata = ast.get("metadata", {})
+        
+        new_ast = {
+            "type": "document",
+            "children": children[:first_child] + new_nodes + tail,
+            "metadata": self._document_metadata(
+                old_metadata.get("wordCount", 0) - removed_words + added_words,
+                old_metadata.get("nodeCount", 0) - removed_count + added_count
+            ),
+            "sourceHash": self._source_hash(new_markdown)
+        }
+        if new_shifts:
+            new_ast["lineShifts"] = new_shifts
+        if len(new_shifts) > MAX_PENDING_LINE_SHIFTS:
+            new_ast = self.resolve_positions(new_ast)
+        
+        return self._attach_sections(new_ast)
+    
+    def _full_parse(self, markdown: str, executor: Optional[Executor]) -> Dict[str, Any]:
+        """Full parse for the incremental fallbacks, on the executor if one is given."""
+        if executor is None:
+            return self.parse_markdown_to_ast(markdown)
+        return self.parse_markdown_to_ast_parallel(markdown, executor)
     
     def ast_to_markdown(self, ast: Dict[str, Any]) -> str:
         """
@@ -69,6 +310,10 @@ class ASTService:
         """
         Update specific AST node by ID.
         
+        The update is persistent: only the edited nodes and their ancestors
+        are copied, every other subtree is shared with the input AST, and the
+        input AST is left unchanged.
+        
         Args:
             ast: Document AST
             node_id: Target node ID
@@ -78,51 +323,335 @@ class ASTService:
         Returns:
             Updated AST
         """
-        ast_copy = self._deep_copy_ast(ast)
+        new_ast = dict(ast)
+        new_ast["children"] = list(ast.get("children", []))
+        new_ast["metadata"] = dict(ast.get("metadata", {}))
+        
+        # The index follows the new version; the old one is re-indexed on demand
+        index = self._take_node_index(ast, new_ast)
+        copied = set()
+        section_steps = []
         
         if operation == "update":
-            self._update_node_content(ast_copy, node_id, data.get("content", ""))
+            self._update_node_content(index, node_id, data.get("content", ""), copied, section_steps)
         elif operation == "insert":
-            self._insert_node(ast_copy, node_id, data.get("position", "after"), data.get("node"))
+            self._insert_node(index, node_id, data.get("position", "after"), data.get("node"), copied, section_steps)
         elif operation == "delete":
-            self._delete_node(ast_copy, node_id)
+            self._delete_node(index, node_id, copied, section_steps)
         elif operation == "move":
-            self._move_node(ast_copy, node_id, data.get("target_id"), data.get("position", "after"))
+            self._move_node(index, node_id, data.get("target_id"), data.get("position", "after"), copied,
+                            section_steps)
         else:
             raise ValueError(f"Unknown operation: {operation}")
         
-        # Recalculate metadata after changes
-        ast_copy["metadata"] = self._calculate_metadata(ast_copy)
+        # The AST no longer matches the markdown it was parsed from
+        new_ast.pop("sourceHash", None)
+        if "sections" in new_ast:
+            new_ast["sections"] = self._update_sections(new_ast, section_steps)
+        
+        if len(new_ast.get("lineShifts", [])) > MAX_PENDING_LINE_SHIFTS:
+            with self._indexes_lock:
+                self._indexes.pop(id(new_ast), None)
+            new_ast = self.resolve_positions(new_ast)
         
-        return ast_copy
+        return new_ast
     
     def find_node_by_id(self, ast: Dict[str, Any], node_id: str) -> Optional[Dict[str, Any]]:
         """Find a node in the AST by its ID."""
-        def search_node(node):
-            if node.get("id") == node_id:
-                return node
-            
-            for child in node.get("children", []):
-                result = search_node(child)
-                if result:
-                    return result
-            return None
-        
-        return search_node(ast)
+        return self.get_node_index(ast).get(node_id)
     
     def get_node_path(self, ast: Dict[str, Any], node_id: str) -> List[int]:
         """Get the path to a node in the AST (list of indices)."""
-        def find_path(node, path=[]):
-            if node.get("id") == node_id:
-                return path
+        return self.get_node_index(ast).path(node_id)
+    
+    def build_sections(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Group top-level content under headings in a single stack pass.
+        
+        A section starts at a top-level heading and runs up to the next
+        heading of the same or a higher level, so it contains its
+        subsections. Sections are listed in document order; each records
+        the heading ID, level and title, its span of top-level children as
+        start and end (exclusive) indices, the index of its parent section
+        (None for outermost sections) and the word and node counts of its
+        span.
+        
+        Args:
+            ast: Document AST
+            
+        Returns:
+            List of section dictionaries
+        """
+        sections = []
+        offsets = []
+        stack = []
+        word_count = 0
+        node_count = 0
+        children = ast.get("children", [])
+        
+        def close(section_index, end):
+            section = sections[section_index]
+            start_words, start_nodes = offsets[section_index]
+            section["end"] = end
+            section["wordCount"] = word_count - start_words
+            section["nodeCount"] = node_count - start_nodes
+        
+        for i, node in enumerate(children):
+            if node.get("type") == "heading":
+                level = node.get("level", 1)
+                while stack and sections[stack[-1]]["level"] >= level:
+                    close(stack.pop(), i)
+                
+                sections.append({
+                    "id": node.get("id"),
+                    "level": level,
+                    "title": node.get("content", ""),
+                    "start": i,
+                    "end": len(children),
+                    "parent": stack[-1] if stack else None
+                })
+                offsets.append((word_count, node_count))
+                stack.append(len(sections) - 1)
+            
+            node_words, node_nodes = self._count_nodes([node])
+            word_count += node_words
+            node_count += node_nodes
+        
+        while stack:
+            close(stack.pop(), len(children))
+        
+        return sections
+    
+    def _update_sections(self, ast: Dict[str, Any], steps: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Apply the section steps recorded by a node operation to ast's sections.
+        
+        Steps refer to top-level slots as they were when the step was taken:
+        ("count", slot, words, nodes) adjusts the sections containing slot,
+        ("insert", ...) and ("remove", ...) add or drop a non-heading node at
+        slot, adjusting the sections containing it and moving the spans after
+        it, and ("title", slot, title) renames the section starting at slot.
+        A top-level heading added or removed changes the section structure,
+        so ("rebuild",) rebuilds them all. Changed sections are copied; the
+        input sections are left unchanged.
+        """
+        if any(step[0] == "rebuild" for step in steps):
+            return self.build_sections(ast)
+        
+        sections = list(ast["sections"])
+        copied = set()
+        
+        def writable(i):
+            if i not in copied:
+                sections[i] = dict(sections[i])
+                copied.add(i)
+            return sections[i]
+        
+        def adjust_enclosing(i, words, nodes, end_delta):
+            # The last section starting before a slot is open there, and so are its ancestors
+            while i is not None and i >= 0:
+                section = writable(i)
+                section["end"] += end_delta
+                section["wordCount"] += words
+                section["nodeCount"] += nodes
+                i = section["parent"]
+        
+        def shift_from(i, delta):
+            for j in range(i, len(sections)):
+                section = writable(j)
+                section["start"] += delta
+                section["end"] += delta
+        
+        for kind, slot, *rest in steps:
+            if kind == "count":
+                adjust_enclosing(bisect.bisect_right(sections, slot, key=lambda section: section["start"]) - 1,
+                                 rest[0], rest[1], 0)
+            elif kind == "insert":
+                i = bisect.bisect_left(sections, slot, key=lambda section: section["start"])
+                adjust_enclosing(i - 1, rest[0], rest[1], 1)
+                shift_from(i, 1)
+            elif kind == "remove":
+                i = bisect.bisect_left(sections, slot, key=lambda section: section["start"])
+                adjust_enclosing(i - 1, rest[0], rest[1], -1)
+                shift_from(i, -1)
+            elif kind == "title":
+                i = bisect.bisect_left(sections, slot, key=lambda section: section["start"])
+                if i < len(sections) and sections[i]["start"] == slot:
+                    writable(i)["title"] = rest[0]
+        
+        return sections
+    
+    def get_section(self, ast: Dict[str, Any], node_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the section started by a top-level heading.
+        
+        Uses the sections precomputed at parse time when present, so the
+        lookup is a node index access plus a binary search.
+        
+        Args:
+            ast: Document AST
+            node_id: Heading node ID
             
-            for i, child in enumerate(node.get("children", [])):
-                result = find_path(child, path + [i])
-                if result is not None:
-                    return result
+        Returns:
+            Section dictionary, or None if node_id is not a top-level heading
+        """
+        index = self.get_node_index(ast)
+        node = index.get(node_id)
+        if node is None or node.get("type") != "heading" or index.parent_id(node_id) is not None:
+            return None
+        
+        sections = ast.get("sections")
+        if sections is None:
+            sections = self.build_sections(ast)
+        
+        slot = index.slot(node_id)
+        i = bisect.bisect_left(sections, slot, key=lambda section: section["start"])
+        if i < len(sections) and sections[i]["start"] == slot:
+            return sections[i]
+        return None
+    
+    def get_section_nodes(self, ast: Dict[str, Any], node_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Get the top-level nodes of the section started by a heading (None if there is none)."""
+        section = self.get_section(ast, node_id)
+        if section is None:
             return None
+        return ast["children"][section["start"]:section["end"]]
+    
+    def get_node_index(self, ast: Dict[str, Any]) -> NodeIndex:
+        """
+        Get the node index for an AST, building it on first use.
+        
+        While an index is held elsewhere, repeated lookups on the same AST
+        object find it again for the cost of a dictionary access. The
+        service keeps no index alive by itself.
+        """
+        index = self._find_index(ast)
+        if index is None:
+            index = NodeIndex(ast)
+            self._remember_index(ast, index)
+        return index
+    
+    def resolve_positions(self, ast: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the line shifts queued by structural edits to node positions.
+        
+        Insert, delete, move and incremental re-parses only record how
+        following lines move, so the edits stay proportional to the size of
+        the edited subtree. Positions of nodes created after shifts were
+        queued record in "shiftsApplied" how many of them they already
+        include. This pass brings every position up to date in one walk when
+        positions are actually read. Nodes whose position does not change
+        are shared with the input AST, which is left unchanged.
         
-        return find_path(ast) or []
+        Args:
+            ast: Document AST
+            
+        Returns:
+            AST with current positions and no pending shifts
+        """
+        shifts = ast.get("lineShifts")
+        if not shifts:
+            return ast
+        
+        def resolve(node):
+            children = node.get("children")
+            new_children = [resolve(child) for child in children] if children else children
+            position = node.get("position")
+            new_position = position
+            if position:
+                new_position = {key: value for key, value in position.items() if key != "shiftsApplied"}
+                new_position["line"] = self._current_line(position, "line", shifts)
+                new_position["endLine"] = self._current_line(position, "endLine", shifts)
+                if new_position == position:
+                    new_position = position
+            
+            if new_position is position and all(a is b for a, b in zip(new_children or [], children or [])):
+                return node
+            
+            new_node = dict(node)
+            if children is not None:
+                new_node["children"] = new_children
+            if new_position is not None:
+                new_node["position"] = new_position
+            return new_node
+        
+        new_ast = {key: value for key, value in ast.items() if key != "lineShifts"}
+        new_ast["children"] = [resolve(child) for child in ast.get("children", [])]
+        return new_ast
+    
+    def _take_node_index(self, ast: Dict[str, Any], new_ast: Dict[str, Any]) -> NodeIndex:
+        """Get an index for new_ast, a copy of ast's root, from the index of ast."""
+        # The index of ast may be in use by readers, so the edit gets its own copy
+        index = self._find_index(ast)
+        index = index.copy() if index is not None else NodeIndex(ast)
+        index.ast = new_ast
+        self._remember_index(new_ast, index)
+        return index
+    
+    def _writable_node(self, index: NodeIndex, node_id: str, copied: set) -> Dict[str, Any]:
+        """
+        Get a private copy of a node that may be modified in place.
+        
+        The node and its ancestors are copied (path copying) and linked into
+        the index's AST; the copies' children lists are new, but the children
+        themselves stay shared. Nodes already in copied are reused.
+        """
+        if node_id in copied:
+            return index.get(node_id)
+        
+        parent_id = index.parent_id(node_id)
+        parent = index.ast if parent_id is None else self._writable_node(index, parent_id, copied)
+        
+        node = dict(index.get(node_id))
+        if "children" in node:
+            node["children"] = list(node["children"])
+        parent["children"][index.slot(node_id)] = node
+        index.replace(node)
+        copied.add(node_id)
+        return node
+    
+    def _apply_metadata_delta(self, index: NodeIndex, node_id: Optional[str], word_delta: int, node_delta: int,
+                              copied: set, section_steps: list) -> None:
+        """Adjust subtree counts of a node (None for none), its ancestors, their sections and the document."""
+        chain = [] if node_id is None else [node_id] + index.ancestors(node_id)
+        if chain:
+            section_steps.append(("count", index.slot(chain[-1]), word_delta, node_delta))
+        for current_id in chain:
+            node = self._writable_node(index, current_id, copied)
+            metadata = node.get("metadata")
+            if metadata and "nodeCount" in metadata:
+                node["metadata"] = {
+                    **metadata,
+                    "wordCount": metadata.get("wordCount", 0) + word_delta,
+                    "nodeCount": metadata["nodeCount"] + node_delta
+                }
+        
+        metadata = index.ast.get("metadata", {})
+        index.ast["metadata"] = {
+            **metadata,
+            **self._document_metadata(
+                metadata.get("wordCount", 0) + word_delta,
+                metadata.get("nodeCount", 0) + node_delta
+            )
+        }
+    
+    def _find_index(self, ast: Dict[str, Any]) -> Optional[NodeIndex]:
+        """Get the live index of an AST object, if any."""
+        with self._indexes_lock:
+            index = self._indexes.get(id(ast))
+        return index if index is not None and index.ast is ast else None
+    
+    def _remember_index(self, ast: Dict[str, Any], index: NodeIndex) -> None:
+        """Register an index for an AST for as long as something else holds it."""
+        # The index references the AST, so its id() cannot be reused while the entry lives
+        with self._indexes_lock:
+            self._indexes[id(ast)] = index
+    
+    def _attach_sections(self, ast: Dict[str, Any]) -> Dict[str, Any]:
+        """Precompute heading sections on a parsed document when enabled."""
+        if self.section_tree:
+            ast["sections"] = self.build_sections(ast)
+        return ast
     
     def _create_empty_document(self) -> Dict[str, Any]:
         """Create an empty document AST."""
@@ -136,30 +665,196 @@ class ASTService:
             }
         }
     
-    def _tokens_to_ast(self, tokens: List[Token]) -> Dict[str, Any]:
-        """Convert markdown-it tokens to AST structure."""
+    def _cached_parse(self, markdown: str, parse) -> Dict[str, Any]:
+        """Look markdown up in the parse cache, parsing and storing it on a miss."""
+        if self.cache is None:
+            return parse(markdown)
+        
+        key = hashlib.sha1(f"{self.config_hash}:{self._source_hash(markdown)}".encode("utf-8")).hexdigest()
+        ast = self.cache.get(key)
+        if ast is None:
+            ast = parse(markdown)
+            self.cache.put(key, ast)
+        return ast
+    
+    def _source_hash(self, markdown: str) -> str:
+        """Hash of the markdown an AST's positions refer to."""
+        return hashlib.sha1(markdown.encode("utf-8")).hexdigest()
+    
+    def _split_lines(self, markdown: str) -> List[str]:
+        """Split markdown into lines numbered the way markdown-it maps them."""
+        return markdown.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    
+    def _top_level_groups(self, children: List[Dict[str, Any]], line_count: int,
+                          shifts: List[List[int]]) -> Optional[List[Tuple[int, int, int]]]:
+        """
+        Group top-level nodes into source blocks.
+        
+        Nodes whose start line falls inside the previous block (e.g. the flat
+        table row nodes) join that block. Returns (child index, start line,
+        end line) tuples with 0-based, end-exclusive lines (pending shifts
+        applied), or None if positions are missing.
+        """
+        groups = []
+        group_end = -1
+        for index, node in enumerate(children):
+            position = node.get("position")
+            if not position:
+                if not groups:
+                    return None
+                continue
+            if "endLine" not in position:
+                return None
+            start = self._current_line(position, "line", shifts) - 1
+            end = self._current_line(position, "endLine", shifts)
+            if start >= group_end:
+                groups.append([index, start, end])
+                group_end = end
+            else:
+                group_end = max(group_end, end)
+                groups[-1][2] = group_end
+        
+        if groups and groups[-1][2] > line_count:
+            return None
+        return [tuple(group) for group in groups]
+    
+    def _is_block_boundary(self, lines: List[str], index: int) -> bool:
+        """Check whether a top-level block starting at lines[index] parses independently."""
+        if index <= 0 or index >= len(lines):
+            return True
+        return not lines[index - 1].strip() and not CONTINUATION_LINE.match(lines[index])
+    
+    def _parse_region(self, lines: List[str], next_line: Optional[str]) -> Optional[List[Token]]:
+        """
+        Parse a run of whole top-level blocks in isolation.
+        
+        The first line of the following block is parsed along with the region
+        so that blocks at its end see the same following text as in a full
+        parse. That line must still start a top-level block of its own; if it
+        does not (e.g. an unterminated fence swallowed it) the region cannot be
+        parsed separately and None is returned.
+        """
+        if next_line is None:
+            return self.md.parse("\n".join(lines))
+        
+        tokens = self.md.parse("\n".join(lines) + "\n" + next_line)
+        cut = next((
+            index for index, token in enumerate(tokens)
+            if token.level == 0 and token.map and token.map[0] >= len(lines)
+        ), None)
+        if cut is None or tokens[cut].map[0] != len(lines):
+            return None
+        return tokens[:cut]
+    
+    def _chunk_boundaries(self, lines: List[str], chunk_size: int) -> List[int]:
+        """Pick chunk start lines roughly chunk_size characters apart, outside fences."""
+        bounds = [0]
+        size = 0
+        fence = None
+        
+        for index, line in enumerate(lines):
+            match = FENCE_LINE.match(line)
+            if fence:
+                if (match and match.group(1)[0] == fence[0]
+                        and len(match.group(1)) >= len(fence)
+                        and not line[match.end():].strip()):
+                    fence = None
+            else:
+                if size >= chunk_size and line.strip() and self._is_block_boundary(lines, index):
+                    bounds.append(index)
+                    size = 0
+                if match:
+                    fence = match.group(1)
+            size += len(line) + 1
+        
+        return bounds
+    
+    def _parse_chunk(self, lines: List[str], next_line: Optional[str], line_offset: int) -> Optional[Tuple[List[Dict[str, Any]], int, int]]:
+        """Parse one chunk into top-level nodes with their word and node counts."""
+        tokens = self._parse_region(lines, next_line)
+        if tokens is None:
+            return None
+        
+        # IDs are made unique once all chunks are joined
+        fragment = self._tokens_to_ast(tokens, line_offset=line_offset, resolve_ids=False)
+        metadata = fragment["metadata"]
+        return fragment["children"], metadata["wordCount"], metadata["nodeCount"]
+    
+    def _mark_shifts_applied(self, nodes: List[Dict[str, Any]], count: int) -> None:
+        """Record that the positions of new nodes include the first count pending line shifts."""
+        for node in nodes:
+            if node.get("position"):
+                node["position"]["shiftsApplied"] = count
+            if node.get("children"):
+                self._mark_shifts_applied(node["children"], count)
+    
+    def _tokens_to_ast(self, tokens: List[Token], line_offset: int = 0,
+                       id_counts: Optional[Dict[str, int]] = None,
+                       resolve_ids: bool = True) -> Dict[str, Any]:
+        """
+        Convert markdown-it tokens to AST structure in a single pass.
+        
+        The token list is consumed. As each node is completed it gets its ID and a metadata entry with
+        the word and node counts of its subtree; the document metadata is
+        the sum over the top-level nodes.
+        
+        Node IDs are content-addressed: a node's ID hashes its depth, type,
+        attributes and content together with the hashes of its children.
+        Repeated IDs get an occurrence suffix tracked in id_counts, which
+        callers can share to keep IDs unique across fragments. With
+        resolve_ids=False the bare content IDs are stored and left for
+        _resolve_node_ids.
+        """
         ast = {
             "type": "document",
             "children": []
         }
+        if id_counts is None:
+            id_counts = {}
         
         stack = [ast]
+        # Child digests, word count and node count of each open node's
+        # completed children
+        frames = [([], [0, 0])]
+        
+        def finish(node, frame):
+            child_digests, (child_words, child_nodes) = frame
+            content = node["content"]
+            word_count = child_words + (len(WORD.findall(content)) if content else 0)
+            node_count = child_nodes + 1
+            node["metadata"] = {"wordCount": word_count, "nodeCount": node_count}
+            
+            digest = self._node_digest(node, len(stack) - 1, child_digests)
+            base_id = f"node_{digest.hex()[:12]}"
+            node["id"] = self._claim_node_id(base_id, id_counts) if resolve_ids else base_id
+            
+            parent_digests, parent_counts = frames[-1]
+            parent_digests.append(digest)
+            parent_counts[0] += word_count
+            parent_counts[1] += node_count
         
-        for token in tokens:
+        # Consume the token list so each token is freed once it is converted
+        tokens.reverse()
+        while tokens:
+            token = tokens.pop()
             if token.type.endswith("_open"):
                 # Opening tag - create new node
-                node = self._token_to_node(token)
+                node = self._token_to_node(token, line_offset)
                 stack[-1]["children"].append(node)
                 
                 # If this node can have children, push to stack
                 if token.type in ["heading_open", "paragraph_open", "list_item_open", 
                                 "blockquote_open", "bullet_list_open", "ordered_list_open"]:
                     stack.append(node)
+                    frames.append(([], [0, 0]))
+                else:
+                    finish(node, ([], (0, 0)))
                     
             elif token.type.endswith("_close"):
                 # Closing tag - pop from stack
                 if len(stack) > 1:
-                    stack.pop()
+                    node = stack.pop()
+                    finish(node, frames.pop())
                     
             elif token.type == "inline":
                 # Inline content - add to current node
@@ -168,13 +863,59 @@ class ASTService:
                     
             else:
                 # Self-closing elements
-                node = self._token_to_node(token)
+                node = self._token_to_node(token, line_offset)
                 if node:
                     stack[-1]["children"].append(node)
+                    finish(node, ([], (0, 0)))
+        
+        # Complete nodes left open by unbalanced tokens
+        while len(stack) > 1:
+            node = stack.pop()
+            finish(node, frames.pop())
+        
+        word_count, node_count = frames[0][1]
+        ast["metadata"] = self._document_metadata(word_count, node_count)
         
         return ast
     
-    def _token_to_node(self, token: Token) -> Dict[str, Any]:
+    def _node_digest(self, node: Dict[str, Any], depth: int, child_digests: List[bytes]) -> bytes:
+        """Hash a node's structural position and content, including its children."""
+        key = "\x1f".join((
+            str(depth),
+            node["type"],
+            str(node.get("level", "")),
+            node.get("listType", ""),
+            node.get("language", ""),
+            node.get("content", "")
+        ))
+        return hashlib.blake2b(key.encode("utf-8") + b"".join(child_digests), digest_size=16).digest()
+    
+    def _claim_node_id(self, base_id: str, id_counts: Dict[str, int]) -> str:
+        """Make a content ID unique by suffixing its occurrence number."""
+        count = id_counts.get(base_id, 0)
+        id_counts[base_id] = count + 1
+        return base_id if count == 0 else f"{base_id}_{count}"
+    
+    def _count_node_ids(self, nodes: List[Dict[str, Any]], id_counts: Dict[str, int]) -> None:
+        """Record the IDs used by nodes in id_counts so new IDs do not repeat them."""
+        for node in nodes:
+            node_id = node.get("id")
+            if node_id:
+                base_id, _, suffix = node_id.rpartition("_")
+                if not suffix.isdigit() or not base_id.startswith("node_"):
+                    base_id, suffix = node_id, "0"
+                id_counts[base_id] = max(id_counts.get(base_id, 0), int(suffix) + 1)
+            if node.get("children"):
+                self._count_node_ids(node["children"], id_counts)
+    
+    def _resolve_node_ids(self, nodes: List[Dict[str, Any]], id_counts: Dict[str, int]) -> None:
+        """Claim unique IDs for nodes carrying bare content IDs, in completion order."""
+        for node in nodes:
+            if node.get("children"):
+                self._resolve_node_ids(node["children"], id_counts)
+            node["id"] = self._claim_node_id(node["id"], id_counts)
+    
+    def _token_to_node(self, token: Token, line_offset: int = 0) -> Dict[str, Any]:
         """Convert a markdown-it token to an AST node."""
         node = {
             "type": self._normalize_token_type(token.type),
@@ -193,7 +934,8 @@ class ASTService:
         # Add position information
         if hasattr(token, 'map') and token.map:
             node["position"] = {
-                "line": token.map[0] + 1,
+                "line": token.map[0] + line_offset + 1,
+                "endLine": token.map[1] + line_offset,
                 "column": 1
             }
         
@@ -214,38 +956,30 @@ class ASTService:
         }
         return type_map.get(token_type, token_type)
     
-    def _assign_node_ids(self, ast: Dict[str, Any]) -> None:
-        """Recursively assign unique IDs to all AST nodes."""
-        def assign_ids(node):
-            if "id" not in node:
-                node["id"] = f"node_{uuid.uuid4().hex[:8]}"
-            
-            for child in node.get("children", []):
-                assign_ids(child)
-        
-        assign_ids(ast)
-    
     def _calculate_metadata(self, ast: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate document metadata from AST."""
-        word_count = 0
-        node_count = 0
-        
-        def count_nodes(node):
-            nonlocal word_count, node_count
-            node_count += 1
-            
+        """Recalculate per-node and document metadata for the whole AST."""
+        def refresh(node):
             content = node.get("content", "")
-            if content:
-                # Simple word count
-                words = len(re.findall(r'\b\w+\b', content))
-                word_count += words
-            
+            word_count = len(WORD.findall(content)) if content else 0
+            node_count = 1
             for child in node.get("children", []):
-                count_nodes(child)
+                child_words, child_nodes = refresh(child)
+                word_count += child_words
+                node_count += child_nodes
+            node["metadata"] = {"wordCount": word_count, "nodeCount": node_count}
+            return word_count, node_count
         
+        word_count = 0
+        node_count = 0
         for child in ast.get("children", []):
-            count_nodes(child)
+            child_words, child_nodes = refresh(child)
+            word_count += child_words
+            node_count += child_nodes
         
+        return self._document_metadata(word_count, node_count)
+    
+    def _document_metadata(self, word_count: int, node_count: int) -> Dict[str, Any]:
+        """Build document metadata from total word and node counts."""
         # Estimate page count (assuming ~250 words per page)
         page_count = max(1, (word_count + 249) // 250)
         
@@ -255,6 +989,30 @@ class ASTService:
             "pageCount": page_count
         }
     
+    def _count_nodes(self, nodes: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Count words and nodes in a list of subtrees."""
+        word_count = 0
+        node_count = 0
+        
+        for node in nodes:
+            metadata = node.get("metadata")
+            if metadata and "nodeCount" in metadata:
+                # Subtree totals recorded when the node was built
+                word_count += metadata.get("wordCount", 0)
+                node_count += metadata["nodeCount"]
+                continue
+            
+            content = node.get("content", "")
+            if content:
+                word_count += len(WORD.findall(content))
+            node_count += 1
+            
+            child_words, child_nodes = self._count_nodes(node.get("children", []))
+            word_count += child_words
+            node_count += child_nodes
+        
+        return word_count, node_count
+    
     def _render_ast_nodes(self, nodes: List[Dict[str, Any]], level: int = 0) -> str:
         """Render AST nodes back to markdown."""
         result = []
@@ -296,28 +1054,225 @@ class ASTService:
         
         return "\n\n".join(result)
     
-    def _deep_copy_ast(self, ast: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a deep copy of the AST."""
-        import copy
-        return copy.deepcopy(ast)
-    
-    def _update_node_content(self, ast: Dict[str, Any], node_id: str, content: str) -> None:
+    def _update_node_content(self, index: NodeIndex, node_id: str, content: str, copied: set,
+                             section_steps: list) -> None:
         """Update the content of a specific node."""
-        node = self.find_node_by_id(ast, node_id)
-        if node:
-            node["content"] = content
-    
-    def _insert_node(self, ast: Dict[str, Any], target_id: str, position: str, new_node: Dict[str, Any]) -> None:
-        """Insert a new node relative to target node."""
-        # Implementation for inserting nodes
-        pass
-    
-    def _delete_node(self, ast: Dict[str, Any], node_id: str) -> None:
-        """Delete a node from the AST."""
-        # Implementation for deleting nodes
-        pass
-    
-    def _move_node(self, ast: Dict[str, Any], node_id: str, target_id: str, position: str) -> None:
-        """Move a node to a new position."""
-        # Implementation for moving nodes
-        pass
+        if node_id not in index:
+            return
+        
+        node = self._writable_node(index, node_id, copied)
+        old_content = node.get("content", "")
+        node["content"] = content
+        if node.get("type") == "heading" and index.parent_id(node_id) is None:
+            section_steps.append(("title", index.slot(node_id), content))
+        
+        word_delta = len(WORD.findall(content)) - len(WORD.findall(old_content))
+        if word_delta:
+            self._apply_metadata_delta(index, node_id, word_delta, 0, copied, section_steps)
+    
+    def _insert_node(self, index: NodeIndex, target_id: str, position: str, new_node: Dict[str, Any],
+                     copied: set, section_steps: list) -> None:
+        """Insert a new node before or after the target node."""
+        if target_id not in index or not new_node:
+            return
+        if position not in ("before", "after"):
+            raise ValueError(f"Unknown insert position: {position}")
+        
+        parent_id = index.parent_id(target_id)
+        depth = 0 if parent_id is None else len(index.ancestors(parent_id)) + 1
+        node, _ = self._build_inserted_node(index, new_node, depth)
+        
+        # Lines after the insertion point move down by the rendered block
+        line = self._insertion_line(index, target_id, position)
+        if line is not None:
+            separator = 1 if parent_id is None else 0
+            lines = self._render_ast_nodes([node]).count("\n") + 1 + separator
+            self._record_line_shift(index.ast, line, lines)
+        
+        container = index.ast if parent_id is None else self._writable_node(index, parent_id, copied)
+        slot = index.slot(target_id) + (1 if position == "after" else 0)
+        container["children"].insert(slot, node)
+        index.add(node, parent_id)
+        
+        word_count, node_count = self._count_nodes([node])
+        if parent_id is None:
+            self._record_top_level_step(node, "insert", slot, word_count, node_count, section_steps)
+        self._apply_metadata_delta(index, parent_id, word_count, node_count, copied, section_steps)
+    
+    def _delete_node(self, index: NodeIndex, node_id: str, copied: set, section_steps: list) -> None:
+        """Delete a node and its subtree from the AST."""
+        if node_id not in index:
+            return
+        
+        span = self._line_span(index, node_id)
+        if span is not None:
+            self._record_line_shift(index.ast, span[1], span[0] - span[1])
+        
+        node = index.get(node_id)
+        parent_id = index.parent_id(node_id)
+        word_count, node_count = self._count_nodes([node])
+        if parent_id is None:
+            self._record_top_level_step(node, "remove", index.slot(node_id), -word_count, -node_count, section_steps)
+        self._apply_metadata_delta(index, parent_id, -word_count, -node_count, copied, section_steps)
+        
+        container = index.ast if parent_id is None else self._writable_node(index, parent_id, copied)
+        del container["children"][index.slot(node_id)]
+        index.remove(node_id)
+    
+    def _move_node(self, index: NodeIndex, node_id: str, target_id: str, position: str, copied: set,
+                   section_steps: list) -> None:
+        """Move a node (with its subtree) before or after the target node."""
+        if node_id not in index or target_id not in index or node_id == target_id:
+            return
+        if position not in ("before", "after"):
+            raise ValueError(f"Unknown move position: {position}")
+        if node_id in index.ancestors(target_id):
+            raise ValueError("Cannot move a node into its own subtree")
+        
+        node = index.get(node_id)
+        old_parent_id = index.parent_id(node_id)
+        new_parent_id = index.parent_id(target_id)
+        word_count, node_count = self._count_nodes([node])
+        
+        # Shift following lines up as for a delete, then down at the new place
+        span = self._line_span(index, node_id)
+        if span is not None:
+            self._record_line_shift(index.ast, span[1], span[0] - span[1])
+        
+        if old_parent_id is None:
+            self._record_top_level_step(node, "remove", index.slot(node_id), -word_count, -node_count, section_steps)
+        self._apply_metadata_delta(index, old_parent_id, -word_count, -node_count, copied, section_steps)
+        container = index.ast if old_parent_id is None else self._writable_node(index, old_parent_id, copied)
+        del container["children"][index.slot(node_id)]
+        index.detach(node_id)
+        
+        line = self._insertion_line(index, target_id, position)
+        if span is not None and line is not None:
+            self._record_line_shift(index.ast, line, span[1] - span[0])
+        
+        # The moved subtree's own lines are only known again after a re-parse
+        node = self._without_positions(node)
+        container = index.ast if new_parent_id is None else self._writable_node(index, new_parent_id, copied)
+        slot = index.slot(target_id) + (1 if position == "after" else 0)
+        container["children"].insert(slot, node)
+        index.add(node, new_parent_id)
+        
+        if new_parent_id is None:
+            self._record_top_level_step(node, "insert", slot, word_count, node_count, section_steps)
+        self._apply_metadata_delta(index, new_parent_id, word_count, node_count, copied, section_steps)
+    
+    def _record_top_level_step(self, node: Dict[str, Any], kind: str, slot: int, word_delta: int,
+                               node_delta: int, section_steps: list) -> None:
+        """Record a top-level node inserted or removed at slot for _update_sections."""
+        if node.get("type") == "heading":
+            section_steps.append(("rebuild",))
+        else:
+            section_steps.append((kind, slot, word_delta, node_delta))
+    
+    def _build_inserted_node(self, index: NodeIndex, spec: Dict[str, Any], depth: int) -> Tuple[Dict[str, Any], bytes]:
+        """Build a complete node (children, metadata, unique ID) from a client node."""
+        node = {
+            "type": spec.get("type") or "paragraph",
+            "content": spec.get("content") or "",
+            "children": []
+        }
+        for key in ("level", "listType", "language"):
+            if spec.get(key) is not None:
+                node[key] = spec[key]
+        
+        child_digests = []
+        word_count = len(WORD.findall(node["content"]))
+        node_count = 1
+        for child_spec in spec.get("children") or []:
+            child, digest = self._build_inserted_node(index, child_spec, depth + 1)
+            node["children"].append(child)
+            child_digests.append(digest)
+            word_count += child["metadata"]["wordCount"]
+            node_count += child["metadata"]["nodeCount"]
+        node["metadata"] = {"wordCount": word_count, "nodeCount": node_count}
+        
+        digest = self._node_digest(node, depth, child_digests)
+        base_id = spec.get("id") or f"node_{digest.hex()[:12]}"
+        node_id = base_id
+        suffix = 0
+        while node_id in index or any(node_id == child["id"] for child in node["children"]):
+            suffix += 1
+            node_id = f"{base_id}_{suffix}"
+        node["id"] = node_id
+        
+        return node, digest
+    
+    def _without_positions(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a subtree, dropping its line positions."""
+        copy = {key: value for key, value in node.items() if key != "position"}
+        if node.get("children"):
+            copy["children"] = [self._without_positions(child) for child in node["children"]]
+        return copy
+    
+    def _line_span(self, index: NodeIndex, node_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the current source lines [start, end) taken by a node.
+        
+        The span runs up to the next sibling, so it includes the blank lines
+        separating the node from what follows.
+        """
+        position = index.get(node_id).get("position")
+        if not position:
+            return None
+        
+        shifts = index.ast.get("lineShifts", [])
+        start = self._current_line(position, "line", shifts)
+        
+        siblings = index.parent(node_id)["children"]
+        slot = index.slot(node_id)
+        if slot + 1 < len(siblings) and siblings[slot + 1].get("position"):
+            end = self._current_line(siblings[slot + 1]["position"], "line", shifts)
+        else:
+            # Top-level blocks are separated by a blank line
+            separator = 1 if index.parent_id(node_id) is None else 0
+            end = self._current_line(position, "endLine", shifts) + 1 + separator
+        return start, max(start, end)
+    
+    def _insertion_line(self, index: NodeIndex, target_id: str, position: str) -> Optional[int]:
+        """Get the current source line at which a node placed next to target begins."""
+        span = self._line_span(index, target_id)
+        if span is None:
+            return None
+        return span[0] if position == "before" else span[1]
+    
+    def _record_line_shift(self, ast: Dict[str, Any], from_line: int, delta: int) -> None:
+        """Queue a shift of every line at or after from_line by delta."""
+        if delta:
+            ast["lineShifts"] = ast.get("lineShifts", []) + [[from_line, delta]]
+    
+    def _shifted_line(self, line: int, shifts: List[List[int]]) -> int:
+        """Apply queued line shifts, in order, to a single line number."""
+        for from_line, delta in shifts:
+            if line >= from_line:
+                line += delta
+        return line
+    
+    def _current_line(self, position: Dict[str, Any], key: str, shifts: List[List[int]]) -> int:
+        """Get a position's line or endLine with the shifts it does not include yet applied."""
+        return self._shifted_line(position[key], shifts[position.get("shiftsApplied", 0):])
+
+
+_worker_ast_service = None
+
+
+def _worker_service() -> ASTService:
+    """Get the AST service of this worker process, creating it on first use."""
+    global _worker_ast_service
+    if _worker_ast_service is None:
+        _worker_ast_service = ASTService(cache=None)
+    return _worker_ast_service
+
+
+def _parse_chunk_in_worker(chunk: Tuple[List[str], Optional[str], int]) -> Optional[Tuple[List[Dict[str, Any]], int, int]]:
+    """Process pool entry point for parse_markdown_to_ast_parallel."""
+    return _worker_service()._parse_chunk(*chunk)
+
+
+def _parse_in_worker(markdown: str) -> Dict[str, Any]:
+    """Process pool entry point for inputs parsed as a single task."""
+    return _worker_service()._parse_markdown(markdown)
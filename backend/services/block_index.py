@@ -0,0 +1,83 @@
+"""
+Flat index over a document's virtual blocks.
+Serves windows of blocks (by offset, or around an anchor node) in time
+proportional to the window, optionally restricted to some node types.
+"""
+
+import bisect
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# Type filters whose block positions are kept per index
+MAX_TYPE_FILTERS = 16
+
+
+class BlockIndex:
+    """
+    Positions of blocks by node ID and by node type.
+
+    Built once per document version from the blocks view and shared by
+    every request for that version; the blocks themselves are not copied.
+    """
+
+    def __init__(self, blocks: List[Dict[str, Any]]):
+        self.blocks = blocks
+        self.positions: Dict[str, int] = {block["id"]: i for i, block in enumerate(blocks) if block.get("id")}
+        self._filtered: "OrderedDict[frozenset, List[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def window(self, offset: int = 0, limit: Optional[int] = None, anchor: Optional[str] = None,
+               before: int = 0, after: int = 0,
+               types: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Get a window of blocks.
+
+        With anchor, the window holds up to before blocks preceding the
+        anchor node, the anchor and up to after blocks following it;
+        otherwise it starts at offset and holds up to limit blocks (all
+        remaining if limit is None). With types, only blocks of those node
+        types are counted and returned; an anchor of another type is
+        placed where it would sort among them.
+
+        Returns:
+            Tuple of (blocks, total matching blocks, offset of the first block)
+
+        Raises:
+            KeyError: if anchor is not a block of this document
+        """
+        selected = self._select(types)
+        total = len(selected) if selected is not None else len(self.blocks)
+
+        if anchor is not None:
+            position = self.positions[anchor]
+            if selected is not None:
+                position = bisect.bisect_left(selected, position)
+            start = max(0, position - before)
+            end = position + after + 1
+        else:
+            start = offset
+            end = total if limit is None else offset + limit
+
+        start = min(start, total)
+        end = min(end, total)
+        if selected is None:
+            return self.blocks[start:end], total, start
+        return [self.blocks[i] for i in selected[start:end]], total, start
+
+    def _select(self, types: Optional[Sequence[str]]) -> Optional[List[int]]:
+        """Get the positions of blocks of the given types (None for all blocks)."""
+        if not types:
+            return None
+
+        key = frozenset(types)
+        selected = self._filtered.get(key)
+        if selected is None:
+            selected = [i for i, block in enumerate(self.blocks) if block.get("type") in key]
+            self._filtered[key] = selected
+            if len(self._filtered) > MAX_TYPE_FILTERS:
+                self._filtered.popitem(last=False)
+        else:
+            self._filtered.move_to_end(key)
+        return selected
@@ -0,0 +1,131 @@
+"""
+Cross-worker invalidation of the document cache.
+Writers send a Postgres NOTIFY with the document ID and its new version; every
+API worker LISTENs on the channel and evicts older cached versions.
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import ASYNC_DATABASE_URL
+from services.document_cache import DocumentCache, document_cache
+
+# Invalidation configuration from environment
+DOCUMENT_CHANGES_CHANNEL = os.getenv("DOCUMENT_CHANGES_CHANNEL", "document_changes")
+DOCUMENT_CACHE_LISTEN = os.getenv("DOCUMENT_CACHE_LISTEN", "true").lower() in ("1", "true", "yes")
+LISTEN_KEEPALIVE_SECONDS = float(os.getenv("LISTEN_KEEPALIVE_SECONDS", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+async def notify_document_changed(db: AsyncSession, document_id: Any) -> None:
+    """
+    Queue a change notification in db's transaction.
+
+    Postgres delivers it on commit (and drops it on rollback). The write is
+    flushed first and the version sent is the updated_at stored in the
+    document's row; a deleted document is sent without a version.
+    """
+    await db.flush()
+    await db.execute(
+        text(
+            "SELECT pg_notify(:channel, CAST(:document_id AS text) || COALESCE(' ' || ("
+            "SELECT to_json(updated_at) #>> '{}' FROM documents "
+            "WHERE id = CAST(CAST(:document_id AS text) AS uuid)), ''))"
+        ),
+        {"channel": DOCUMENT_CHANGES_CHANNEL, "document_id": str(document_id)}
+    )
+
+
+class DocumentChangeListener:
+    """
+    Background task that applies change notifications to a DocumentCache.
+
+    The cache is only enabled while the LISTEN connection is up: on connect
+    and on any connection failure it is cleared, since notifications may
+    have been missed, and it stays disabled until listening again.
+    """
+
+    def __init__(self, cache: DocumentCache = document_cache, url: str = ASYNC_DATABASE_URL,
+                 channel: str = DOCUMENT_CHANGES_CHANNEL, keepalive: float = LISTEN_KEEPALIVE_SECONDS):
+        self.cache = cache
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.keepalive = keepalive
+        self.notifications = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening in the background."""
+        if self._task is None:
+            self.cache.enabled = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening; the cache is left disabled."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.cache.enabled = False
+        self.cache.clear()
+
+    def get_stats(self) -> dict:
+        """Get listener state and counters."""
+        return {
+            "listening": self.cache.enabled and self._task is not None,
+            "notifications": self.notifications,
+            "reconnects": self.reconnects
+        }
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._on_notification)
+                self.cache.clear()
+                self.cache.enabled = True
+                logger.info(f"Listening for document changes on {self.channel}")
+                delay = 1.0
+                while True:
+                    # Fails once the connection is gone, even without traffic
+                    await asyncio.sleep(self.keepalive)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.cache.enabled = False
+                self.cache.clear()
+                self.reconnects += 1
+                logger.warning(f"Document change listener failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if connection is not None:
+                    connection.terminate()
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        document_id, _, version = payload.partition(" ")
+        try:
+            self.cache.invalidate(document_id, datetime.fromisoformat(version) if version else None)
+        except ValueError:
+            self.cache.invalidate(document_id)
+
+
+# Shared listener for the API's document cache
+document_change_listener = DocumentChangeListener()
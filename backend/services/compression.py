@@ -0,0 +1,344 @@
+"""
+Response compression for the API.
+Negotiates brotli or gzip per request and compresses responses as they
+stream; bodies of per-version (ETag-tagged) responses are kept compressed so
+that each version is compressed once.
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import anyio
+import brotli
+
+# Compression configuration from environment
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Preferred first when a client accepts several with the same weight
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Chunks at least this large are compressed off the event loop
+THREAD_CHUNK_BYTES = 32 * 1024
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the encoding for an Accept-Encoding header, or None for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def uncompressed(endpoint: Callable) -> Callable:
+    """Mark a route's endpoint to have its responses sent uncompressed."""
+    endpoint.compress = False
+    return endpoint
+
+
+class _Compressor:
+    """Streaming compressor for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        """Compress data; output is flushed so it can be sent right away."""
+        if self._brotli is not None:
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if last else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class CompressedResponseCache:
+    """
+    LRU cache of compressed response bodies by (path, query, ETag, encoding).
+
+    Only responses tagged with a document version are stored: their bodies
+    never change, so a hit is replayed without compressing again.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, bytes, str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, bytes, str, str]) -> Optional[bytes]:
+        """Return a cached compressed body, or None."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple[str, bytes, str, str], body: bytes) -> None:
+        """Cache a compressed body (unless it would take over the budget)."""
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss, eviction and size counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "maxBytes": self.max_bytes
+            }
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip.
+
+    Compressible responses (JSON, NDJSON, text) of at least minimum_size
+    bytes are compressed chunk by chunk as the application sends them,
+    flushing after each chunk so that streamed responses keep flowing.
+    Responses of endpoints marked with uncompressed() are left alone.
+
+    A compressed response's ETag gets the encoding as a suffix (strong
+    ETags differ per representation); the suffix is removed from
+    If-None-Match before the application sees it and put back on the
+    ETag of a 304 answering a suffixed tag.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = COMPRESSION_MIN_BYTES, gzip_level: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY, cache: Optional[CompressedResponseCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache if cache is not None else compressed_responses
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        suffixes = set()
+        headers = []
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+            elif name == b"if-none-match":
+                tags = [_strip_etag_suffix(tag) for tag in value.split(b",")]
+                suffixes.update(encoding for _, encoding in tags if encoding)
+                value = b",".join(tag for tag, _ in tags)
+            headers.append((name, value))
+
+        scope = dict(scope, headers=headers)
+        responder = _Responder(self, scope, negotiate(accept_encoding), send, suffixes)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """Compresses (or passes through) the messages of one response."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Dict[str, Any], encoding: Optional[str],
+                 send: Callable, suffixes: Set[str]):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.suffixes = suffixes
+        self._send = send
+        self.start: Optional[Dict[str, Any]] = None
+        self.compressor: Optional[_Compressor] = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.cache_key: Optional[Tuple[str, bytes, str, str]] = None
+        self.compressed: Optional[List[bytes]] = None
+        self.done = False
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        if self.done:
+            # The response was replayed from the cache; the application's body is not needed
+            return
+
+        if message["type"] == "http.response.start":
+            await self._on_start(message)
+        elif message["type"] != "http.response.body":
+            await self._send(message)
+        elif self.start is None:
+            await self._send(message)
+        else:
+            await self._on_body(message)
+
+    async def _on_start(self, message: Dict[str, Any]) -> None:
+        headers = _MutableHeaders(message["headers"])
+        status = message["status"]
+        enabled = getattr(self.scope.get("endpoint"), "compress", True)
+        compressible = enabled and (
+            (headers.get("content-type") or "").startswith(COMPRESSIBLE_TYPES)
+            and headers.get("content-encoding") is None
+        )
+        if compressible or (enabled and status == 304):
+            headers.add_vary("Accept-Encoding")
+
+        etag = headers.get("etag")
+        length = headers.get("content-length")
+        if status == 304 and etag and enabled and self.encoding in self.suffixes:
+            # A 304 confirms the representation the client holds: compressed if it sent the suffixed tag
+            headers.set("etag", _with_etag_suffix(etag, self.encoding))
+        if (self.encoding is None or status != 200 or not compressible
+                or (length is not None and int(length) < self.middleware.minimum_size)):
+            await self._send(dict(message, headers=headers.raw))
+            return
+
+        if etag:
+            self.cache_key = (self.scope["path"], self.scope.get("query_string", b""), etag, self.encoding)
+            body = self.middleware.cache.get(self.cache_key)
+            if body is not None:
+                self._set_encoded(headers, etag, len(body))
+                await self._send(dict(message, headers=headers.raw))
+                await self._send({"type": "http.response.body", "body": body, "more_body": False})
+                self.done = True
+                return
+
+        self.start = dict(message, headers=headers)
+
+    async def _on_body(self, message: Dict[str, Any]) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.pending.append(body)
+            self.pending_size += len(body)
+            if more_body and self.pending_size < self.middleware.minimum_size:
+                return
+
+            headers = self.start["headers"]
+            if not more_body and self.pending_size < self.middleware.minimum_size:
+                await self._send(dict(self.start, headers=headers.raw))
+                await self._send({"type": "http.response.body", "body": b"".join(self.pending), "more_body": False})
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            if self.cache_key is not None:
+                self.compressed = []
+            self._set_encoded(headers, headers.get("etag"), None)
+            await self._send(dict(self.start, headers=headers.raw))
+            body = b"".join(self.pending)
+            self.pending = []
+
+        if len(body) >= THREAD_CHUNK_BYTES:
+            output = await anyio.to_thread.run_sync(self.compressor.compress, body, not more_body)
+        else:
+            output = self.compressor.compress(body, not more_body)
+
+        if self.compressed is not None:
+            self.compressed.append(output)
+            if not more_body:
+                self.middleware.cache.put(self.cache_key, b"".join(self.compressed))
+        await self._send({"type": "http.response.body", "body": output, "more_body": more_body})
+
+    def _set_encoded(self, headers: "_MutableHeaders", etag: Optional[str], length: Optional[int]) -> None:
+        headers.set("content-encoding", self.encoding)
+        if etag:
+            headers.set("etag", _with_etag_suffix(etag, self.encoding))
+        if length is None:
+            headers.remove("content-length")
+        else:
+            headers.set("content-length", str(length))
+
+
+class _MutableHeaders:
+    """Minimal editable view of raw ASGI response headers."""
+
+    def __init__(self, raw: List[Tuple[bytes, bytes]]):
+        self.raw = list(raw)
+
+    def get(self, name: str) -> Optional[str]:
+        key = name.encode("latin-1")
+        for header, value in self.raw:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return None
+
+    def set(self, name: str, value: str) -> None:
+        self.remove(name)
+        self.raw.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    def remove(self, name: str) -> None:
+        key = name.encode("latin-1")
+        self.raw = [(header, value) for header, value in self.raw if header.lower() != key]
+
+    def add_vary(self, token: str) -> None:
+        vary = self.get("vary")
+        if vary is None:
+            self.set("vary", token)
+        elif token.lower() not in vary.lower():
+            self.set("vary", f"{vary}, {token}")
+
+
+def _with_etag_suffix(etag: str, encoding: str) -> str:
+    """Tag an ETag with the encoding of the representation it names."""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _strip_etag_suffix(tag: bytes) -> Tuple[bytes, Optional[str]]:
+    """Undo _with_etag_suffix on one If-None-Match entry; returns (tag, encoding or None)."""
+    tag = tag.strip()
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'.encode("latin-1")
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + b'"', encoding
+    return tag, None
+
+
+# Shared cache of compressed per-version responses
+compressed_responses = CompressedResponseCache()
@@ -0,0 +1,203 @@
+"""
+Document cache for DocumentService.
+Keeps decoded documents and their derived views (blocks, outline) in memory,
+versioned by updated_at and bounded by a byte budget with LRU eviction.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# Cache configuration from environment
+DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def deep_size(obj: Any) -> int:
+    """
+    Approximate the memory held by a JSON-like object graph.
+
+    Containers shared between several places (untouched subtrees of
+    copy-on-write ASTs) are counted once.
+    """
+    getsizeof = sys.getsizeof
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += getsizeof(current)
+        for value in (current.values() if type(current) is dict else current):
+            if type(value) is dict or type(value) is list:
+                stack.append(value)
+            else:
+                size += getsizeof(value)
+    return size
+
+
+class _Entry:
+    """One cached document version and the views derived from it."""
+
+    __slots__ = ("version", "fields", "views", "size")
+
+    def __init__(self, version: datetime, fields: Dict[str, Any], size: int):
+        self.version = version
+        self.fields = fields
+        self.views: Dict[str, Any] = {}
+        self.size = size
+
+
+class DocumentCache:
+    """
+    LRU cache of decoded documents by ID.
+
+    Cached values are shared between readers and must be treated as
+    read-only. Writers call invalidate() after committing; fills are made
+    with a token taken before the database read, so a fill that raced with
+    any invalidation is dropped instead of caching a stale version.
+    While enabled is False (e.g. invalidations from other workers cannot
+    be received), every lookup misses and nothing is stored.
+    """
+
+    def __init__(self, max_bytes: int = DOCUMENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.view_hits = 0
+        self.view_misses = 0
+
+    def token(self) -> int:
+        """Get a fill token; take it before reading the document to cache."""
+        with self._lock:
+            return self._generation
+
+    def get(self, document_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the cached column values of a document, or None."""
+        key = str(document_id)
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.fields
+
+    def put(self, document_id: Any, version: datetime, fields: Dict[str, Any], token: int) -> bool:
+        """
+        Cache a document's column values at version.
+
+        Returns False if the entry was not stored: an invalidation happened
+        since token was taken, a newer version is cached, or it is larger
+        than the whole budget.
+        """
+        size = deep_size(fields)
+        if size > self.max_bytes:
+            return False
+
+        key = str(document_id)
+        with self._lock:
+            if token != self._generation or not self.enabled:
+                return False
+            current = self._entries.get(key)
+            if current is not None:
+                if current.version > version:
+                    return False
+                self._remove(key)
+
+            self._entries[key] = _Entry(version, fields, size)
+            self._size += size
+            self._evict()
+            return True
+
+    def get_view(self, document_id: Any, version: datetime, name: str) -> Optional[Any]:
+        """Return a derived view cached for this document version, or None."""
+        with self._lock:
+            entry = self._entries.get(str(document_id)) if self.enabled else None
+            if entry is None or entry.version != version or name not in entry.views:
+                self.view_misses += 1
+                return None
+            self.view_hits += 1
+            return entry.views[name]
+
+    def put_view(self, document_id: Any, version: datetime, name: str, value: Any,
+                 size: Optional[int] = None) -> None:
+        """
+        Cache a derived view next to the document version it was built from.
+
+        size is measured with deep_size unless given (for values that are
+        not JSON-like).
+        """
+        if size is None:
+            size = deep_size(value)
+        key = str(document_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version or name in entry.views:
+                return
+            entry.views[name] = value
+            entry.size += size
+            self._size += size
+            self._evict()
+
+    def invalidate(self, document_id: Any, version: Optional[datetime] = None) -> None:
+        """Drop a document's entry (only if older than version, when given)."""
+        key = str(document_id)
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(key)
+            if entry is not None and (version is None or entry.version < version):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss, eviction and size counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "viewHits": self.view_hits,
+                "viewMisses": self.view_misses,
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "maxBytes": self.max_bytes
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within budget."""
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+
+
+# Shared cache used by DocumentService instances unless one is passed explicitly
+document_cache = DocumentCache()
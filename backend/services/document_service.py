@@ -3,20 +3,47 @@ Document Service for managing AST-based documents.
 Handles CRUD operations and integrates with AST service.
 """
 
-from typing import Dict, List, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from database import Document
+from typing import Dict, List, Any, AsyncIterator, Callable, Iterator, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import select, desc, tuple_, func
+from sqlalchemy.exc import SQLAlchemyError
+from database import Document, AsyncSessionLocal
 from services.ast_service import ASTService
+from services.document_storage import DocumentStorage
+from services.document_views import DocumentViews, VIEW_NAMES, WRITE_VIEW_NAMES
+from services.document_cache import DocumentCache, document_cache, deep_size
+from services.block_index import BlockIndex
+from services.node_index import NodeIndex
+from services.json_stream import RawJSON
+from services.cache_invalidation import notify_document_changed
+from services.worker_pool import WorkerPool, WorkerPoolError, worker_pool
 import uuid
+import base64
+import orjson
 from datetime import datetime
 
+# Document columns kept in the document cache
+CACHED_COLUMNS = ("id", "title", "content_ast", "raw_markdown", "doc_metadata", "created_at", "updated_at")
+
 
 class DocumentService:
-    def __init__(self):
+    def __init__(self, workers: WorkerPool = worker_pool, cache: DocumentCache = document_cache,
+                 session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
         self.ast_service = ASTService()
+        self.storage = DocumentStorage()
+        self.views = DocumentViews()
+        self.workers = workers
+        self.cache = cache
+        self.session_factory = session_factory  # Sessions for reads that outlive the request handler
+        self.view_builders: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "blocks": self.flatten_ast_to_blocks,
+            "outline": self.get_document_outline,
+            "stats": self.get_document_stats
+        }
     
-    async def create_document(self, db: Session, title: str, markdown_content: str = "") -> Document:
+    async def create_document(self, db: AsyncSession, title: str, markdown_content: str = "") -> Document:
         """
         Create a new document from markdown content.
         
@@ -28,37 +55,167 @@ class DocumentService:
         Returns:
             Created document
         """
-        # Parse markdown to AST
-        content_ast = self.ast_service.parse_markdown_to_ast(markdown_content)
+        # Parse markdown to AST on the worker processes (in parallel chunks for large imports)
+        content_ast = await self.workers.run_parse(
+            self.ast_service.parse_markdown_to_ast_parallel, markdown_content,
+            executor=self.workers.processes, size=len(markdown_content)
+        )
         
-        # Create document
+        # Create document (the ID is needed up front to key its chunks)
         document = Document(
+            id=uuid.uuid4(),
             title=title,
-            content_ast=content_ast,
             raw_markdown=markdown_content,
             doc_metadata=content_ast.get("metadata", {})
         )
+        stored_ast = await self.storage.store(db, document, content_ast)
         
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        await db.flush()
+        await self._store_views(db, document.id, content_ast)
+        await db.commit()
+        await db.refresh(document)
         
-        return document
+        return self.storage.attach(document, stored_ast)
     
-    async def get_document(self, db: Session, document_id: str) -> Optional[Document]:
+    async def get_document(self, db: AsyncSession, document_id: str, load_content: bool = True) -> Optional[Document]:
         """
         Get a document by ID.
         
         Args:
             db: Database session
             document_id: Document UUID
+            load_content: Assemble the full AST of chunked documents; when
+                False, content_ast may be a skeleton without children
+            
+        Returns:
+            Document or None if not found. Documents with content may come
+            from the document cache, detached from db: treat them as read-only.
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None or not load_content:
+            return await self._fetch_document(db, document_id, load_content)
+        
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            return Document(**fields)
+        
+        token = self.cache.token()
+        document = await self._fetch_document(db, document_id)
+        if document is not None:
+            await self._cache_document(document, token)
+        return document
+    
+    async def get_version(self, db: AsyncSession, document_id: str) -> Optional[datetime]:
+        """
+        Get the current version (updated_at) of a document without loading it.
+    
+        Cached documents answer from the cache, so that the version agrees
+        with the content the same reads are served from; others cost one
+        primary key lookup of a single column.
+    
+        Args:
+            db: Database session
+            document_id: Document UUID
+    
+        Returns:
+            The version, or None if the document is not found
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+    
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            return fields["updated_at"]
+        return (await db.execute(select(Document.updated_at).where(Document.id == document_id))).scalar_one_or_none()
+    
+    async def get_document_json(self, document_id: str,
+                                version: Optional[datetime] = None) -> Optional[Tuple[Document, RawJSON]]:
+        """
+        Get a document with its AST as JSON, for responses that pass the
+        AST through unchanged.
+        
+        Cached documents are encoded once per version. Others have their
+        AST read as text straight from JSONB, one chunk at a time while the
+        response streams, from a read-only snapshot of their own session.
+        
+        Args:
+            document_id: Document UUID
+            version: Only return the document at this version (updated_at)
             
         Returns:
-            Document or None if not found
+            Tuple of (document without content_ast, AST JSON), or None if
+            not found (or at another version than the one asked for)
         """
-        return db.query(Document).filter(Document.id == document_id).first()
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        fields = self.cache.get(document_id)
+        if fields is None:
+            db = self.session_factory()
+            try:
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+                row = await self.storage.read_json(db, document_id)
+                if row is not None and version is not None and row[0]["updated_at"] != version:
+                    row = None
+                if row is not None and row[0]["raw_markdown"] is not None:
+                    columns, parts = row
+                    return Document(id=document_id, **columns), RawJSON(self._close_after(parts, db))
+                # Missing, or the markdown must be regenerated from the decoded AST first
+                document = await self.get_document(db, document_id) if row is not None else None
+            except BaseException:
+                await db.close()
+                raise
+            await db.close()
+            if document is None:
+                return None
+            fields = {column: getattr(document, column) for column in CACHED_COLUMNS}
+        
+        if version is not None and fields["updated_at"] != version:
+            return None
+        document = Document(**{column: value for column, value in fields.items() if column != "content_ast"})
+        ast_json = self.cache.get_view(document_id, document.updated_at, "astJson")
+        if ast_json is None:
+            ast_json = await self.workers.run_transform(
+                self._encode_ast, document_id, document.updated_at, fields["content_ast"],
+                size=self.node_count(document)
+            )
+        return document, RawJSON(ast_json)
+    
+    async def _close_after(self, parts: AsyncIterator[str], db: AsyncSession) -> AsyncIterator[str]:
+        """Pass parts through, closing db once they are consumed (or abandoned)."""
+        try:
+            async for part in parts:
+                yield part
+        finally:
+            await db.close()
+    
+    def _encode_ast(self, document_id: uuid.UUID, version: datetime, ast: Dict[str, Any]) -> bytes:
+        """Encode an AST and cache it next to the document version (runs on a transform worker)."""
+        ast_json = orjson.dumps(self.storage.without_manifest(ast))
+        self.cache.put_view(document_id, version, "astJson", ast_json, size=len(ast_json))
+        return ast_json
+    
+    async def _fetch_document(self, db: AsyncSession, document_id: Any, load_content: bool = True) -> Optional[Document]:
+        """Load a document from the database, attached to db (see get_document)."""
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        document = (await db.execute(select(Document).where(Document.id == document_id))).scalar_one_or_none()
+        if document is not None and load_content:
+            await self.storage.load(db, document)
+            # Node edits made in the database leave the markdown to be regenerated
+            if document.raw_markdown is None and document.content_ast:
+                markdown = await self.workers.run_transform(
+                    self.ast_service.ast_to_markdown, document.content_ast, size=self.node_count(document)
+                )
+                set_committed_value(document, "raw_markdown", markdown)
+        return document
     
-    async def list_documents(self, db: Session, skip: int = 0, limit: int = 100) -> List[Document]:
+    async def list_documents(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Document]:
         """
         List documents with pagination.
         
@@ -70,13 +227,91 @@ class DocumentService:
         Returns:
             List of documents
         """
-        return db.query(Document)\
-                 .order_by(desc(Document.updated_at))\
-                 .offset(skip)\
-                 .limit(limit)\
-                 .all()
+        documents = (await db.execute(
+            select(Document)
+            .order_by(desc(Document.updated_at))
+            .offset(skip)
+            .limit(limit)
+        )).scalars().all()
+        for document in documents:
+            await self.storage.load(db, document)
+        return documents
+    
+    async def list_document_summaries(self, db: AsyncSession, limit: int = 100,
+                                      cursor: Optional[str] = None) -> Tuple[List[Document], Optional[str]]:
+        """
+        List documents without their content, newest first.
+        
+        Only id, title, metadata and timestamps are loaded; content_ast and
+        raw_markdown stay deferred. Pages are keyset-paginated on
+        (updated_at, id), so deep pages cost the same as the first one.
+        
+        Args:
+            db: Database session
+            limit: Maximum number of documents to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Tuple of (documents, cursor for the next page or None)
+        """
+        query = select(Document).options(load_only(
+            Document.id, Document.title, Document.doc_metadata, Document.created_at, Document.updated_at
+        ))
+        
+        if cursor:
+            updated_at, document_id = self._decode_cursor(cursor)
+            query = query.where(tuple_(Document.updated_at, Document.id) < tuple_(updated_at, document_id))
+        
+        documents = (await db.execute(
+            query.order_by(desc(Document.updated_at), desc(Document.id)).limit(limit + 1)
+        )).scalars().all()
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = self._encode_cursor(documents[-1])
+        
+        return documents, next_cursor
+    
+    def _parse_id(self, document_id: Any) -> Optional[uuid.UUID]:
+        """Convert a document ID to a UUID, or None if it is not one."""
+        if isinstance(document_id, uuid.UUID):
+            return document_id
+        try:
+            return uuid.UUID(str(document_id))
+        except ValueError:
+            return None
+    
+    async def _cache_document(self, document: Document, token: int) -> None:
+        """Add a freshly loaded document to the cache (sized on a transform worker)."""
+        fields = {column: getattr(document, column) for column in CACHED_COLUMNS}
+        try:
+            await self.workers.run_transform(
+                self.cache.put, document.id, document.updated_at, fields, token, size=self.node_count(document)
+            )
+        except WorkerPoolError:
+            # Busy or oversized: leave it to a later read
+            pass
+    
+    def node_count(self, document: Document) -> int:
+        """Get a document's node count, the size of its transform tasks."""
+        return (document.doc_metadata or {}).get("nodeCount", 0)
+    
+    def _encode_cursor(self, document: Document) -> str:
+        """Build an opaque keyset cursor pointing after document."""
+        key = f"{document.updated_at.isoformat()}|{document.id}"
+        return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+    
+    def _decode_cursor(self, cursor: str) -> Tuple[datetime, uuid.UUID]:
+        """Parse a cursor from _encode_cursor; raises ValueError if malformed."""
+        try:
+            key = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            updated_at, document_id = key.split("|")
+            return datetime.fromisoformat(updated_at), uuid.UUID(document_id)
+        except (ValueError, UnicodeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
     
-    async def update_document(self, db: Session, document_id: str, title: str = None, 
+    async def update_document(self, db: AsyncSession, document_id: str, title: str = None, 
                             content_ast: Dict[str, Any] = None, 
                             raw_markdown: str = None) -> Optional[Document]:
         """
@@ -92,30 +327,45 @@ class DocumentService:
         Returns:
             Updated document or None if not found
         """
-        document = await self.get_document(db, document_id)
+        document = await self._fetch_document(db, document_id)
         if not document:
             return None
         
         if title is not None:
             document.title = title
         
-        if content_ast is not None:
-            document.content_ast = content_ast
-            document.doc_metadata = content_ast.get("metadata", {})
+        previous_ast = document.content_ast
+        new_ast = content_ast
         
         if raw_markdown is not None:
+            previous_markdown = document.raw_markdown
             document.raw_markdown = raw_markdown
-            # If raw markdown is provided but not AST, parse it
+            # If raw markdown is provided but not AST, re-parse the changed blocks
             if content_ast is None:
-                document.content_ast = self.ast_service.parse_markdown_to_ast(raw_markdown)
-                document.doc_metadata = document.content_ast.get("metadata", {})
+                new_ast = await self.workers.run_parse(
+                    self.ast_service.reparse_markdown_incremental,
+                    previous_ast, previous_markdown or "", raw_markdown,
+                    executor=self.workers.processes, size=len(raw_markdown)
+                )
         
-        db.commit()
-        db.refresh(document)
+        stored_ast = previous_ast
+        if new_ast is not None:
+            stored_ast = await self.storage.store(db, document, new_ast, previous_ast)
+            document.doc_metadata = new_ast.get("metadata", {})
+            await self._store_views(db, document.id, stored_ast)
+        elif title is not None:
+            version = document.updated_at
+            await db.flush()
+            await self.views.touch(db, document.id, version)
         
-        return document
+        await notify_document_changed(db, document.id)
+        await db.commit()
+        self.cache.invalidate(document.id)
+        await db.refresh(document)
+        
+        return self.storage.attach(document, stored_ast)
     
-    async def delete_document(self, db: Session, document_id: str) -> bool:
+    async def delete_document(self, db: AsyncSession, document_id: str) -> bool:
         """
         Delete a document.
         
@@ -126,17 +376,19 @@ class DocumentService:
         Returns:
             True if deleted, False if not found
         """
-        document = await self.get_document(db, document_id)
+        document = await self._fetch_document(db, document_id, load_content=False)
         if not document:
             return False
         
-        db.delete(document)
-        db.commit()
+        await db.delete(document)
+        await notify_document_changed(db, document.id)
+        await db.commit()
+        self.cache.invalidate(document.id)
         
         return True
     
-    async def update_ast_node(self, db: Session, document_id: str, node_id: str, 
-                            operation: str, data: Dict[str, Any]) -> Optional[Document]:
+    async def update_ast_node(self, db: AsyncSession, document_id: str, node_id: str, 
+                            operation: str, data: Dict[str, Any], fast_path: bool = True) -> Optional[Document]:
         """
         Update a specific AST node in a document.
         
@@ -146,38 +398,89 @@ class DocumentService:
             node_id: AST node ID
             operation: Operation type (update, insert, delete, move)
             data: Operation data
+            fast_path: Try update_node_content first for content updates
+                (False when the caller already found it does not apply)
             
         Returns:
             Updated document or None if not found
         """
-        document = await self.get_document(db, document_id)
+        if operation == "update" and fast_path:
+            metadata = await self.update_node_content(db, document_id, node_id, data.get("content", ""))
+            if metadata is not None:
+                return await self._fetch_document(db, document_id)
+        
+        document = await self._fetch_document(db, document_id)
         if not document:
             return None
         
         try:
-            # Update AST
-            updated_ast = self.ast_service.update_ast_node(
-                document.content_ast, node_id, operation, data
+            # Update AST and convert back to markdown
+            updated_ast, updated_markdown = await self.workers.run_transform(
+                self._apply_node_operation, document.content_ast, node_id, operation, data,
+                size=self.node_count(document)
             )
             
-            # Convert back to markdown
-            updated_markdown = self.ast_service.ast_to_markdown(updated_ast)
-            
-            # Update document
-            document.content_ast = updated_ast
+            # Update document, rewriting only the chunks the edit touched
+            stored_ast = await self.storage.store(db, document, updated_ast, document.content_ast)
             document.raw_markdown = updated_markdown
             document.doc_metadata = updated_ast.get("metadata", {})
+            await self._store_views(db, document.id, stored_ast)
+            
+            await notify_document_changed(db, document.id)
+            await db.commit()
+            self.cache.invalidate(document.id)
+            await db.refresh(document)
+            
+            return self.storage.attach(document, stored_ast)
+            
+        except Exception as e:
+            await db.rollback()
+            raise e
+    
+    def _apply_node_operation(self, ast: Dict[str, Any], node_id: str, operation: str,
+                              data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Apply a node operation and render the result (runs on a transform worker)."""
+        updated_ast = self.ast_service.update_ast_node(ast, node_id, operation, data)
+        return updated_ast, self.ast_service.ast_to_markdown(updated_ast)
+    
+    async def update_node_content(self, db: AsyncSession, document_id: str, node_id: str,
+                                  content: str) -> Optional[Dict[str, Any]]:
+        """
+        Update one node's content without loading the document.
+        
+        Only chunked documents keep the node path index this needs; for
+        others None is returned and update_ast_node should be used.
+        
+        Args:
+            db: Database session
+            document_id: Document UUID
+            node_id: AST node ID
+            content: New node content
             
-            db.commit()
-            db.refresh(document)
+        Returns:
+            Updated document metadata, or None if the fast path does not apply
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        try:
+            metadata = await self.storage.update_node_content(db, document_id, node_id, content)
+            if metadata is None:
+                await db.rollback()
+                return None
             
-            return document
+            await notify_document_changed(db, document_id)
+            await db.commit()
+            self.cache.invalidate(document_id)
+            return metadata
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise e
     
-    async def export_document(self, db: Session, document_id: str, format: str = "markdown") -> Optional[str]:
+    async def export_document(self, db: AsyncSession, document_id: str, format: str = "markdown",
+                              section_id: Optional[str] = None) -> Optional[Tuple[str, datetime]]:
         """
         Export document in specified format.
         
@@ -185,28 +488,57 @@ class DocumentService:
             db: Database session
             document_id: Document UUID
             format: Export format (markdown, html, etc.)
+            section_id: Heading node ID to export only that section
             
         Returns:
-            Exported content or None if document not found
+            Tuple of (exported content, version it was exported from), or
+            None if document (or section) not found
         """
         document = await self.get_document(db, document_id)
         if not document:
             return None
         
+        content = await self._export(document, format, section_id)
+        return (content, document.updated_at) if content is not None else None
+    
+    async def _export(self, document: Document, format: str, section_id: Optional[str]) -> Optional[str]:
+        """Export a loaded document (see export_document)."""
+        if section_id is not None:
+            self._node_index(document.id, document.updated_at, document.content_ast)
+            nodes = self.ast_service.get_section_nodes(document.content_ast, section_id)
+            if nodes is None:
+                return None
+            section_ast = {"type": "document", "children": nodes}
+            if format == "markdown":
+                return await self.workers.run_transform(
+                    self.ast_service.ast_to_markdown, section_ast, size=self.node_count(document)
+                )
+            elif format == "html":
+                return await self.workers.run_transform(
+                    self._ast_to_html, section_ast, size=self.node_count(document)
+                )
+            raise ValueError(f"Unsupported export format: {format}")
+        
         if format == "markdown":
-            return document.raw_markdown or self.ast_service.ast_to_markdown(document.content_ast)
+            if document.raw_markdown:
+                return document.raw_markdown
+            return await self.workers.run_transform(
+                self.ast_service.ast_to_markdown, document.content_ast, size=self.node_count(document)
+            )
         elif format == "html":
             # Convert AST to HTML (would need additional implementation)
-            return self._ast_to_html(document.content_ast)
+            return await self.workers.run_transform(
+                self._ast_to_html, document.content_ast, size=self.node_count(document)
+            )
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
-    def get_document_outline(self, document: Document) -> List[Dict[str, Any]]:
+    def get_document_outline(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Generate document outline from AST (Table of Contents).
         
         Args:
-            document: Document object
+            ast: Full document AST
             
         Returns:
             List of outline items
@@ -227,56 +559,438 @@ class DocumentService:
                 if node.get("children"):
                     extract_headings(node["children"], level + 1)
         
-        if document.content_ast and document.content_ast.get("children"):
-            extract_headings(document.content_ast["children"])
+        if ast and ast.get("children"):
+            extract_headings(ast["children"])
         
         return outline
     
-    def flatten_ast_to_blocks(self, document: Document) -> List[Dict[str, Any]]:
+    def get_document_stats(self, ast: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Flatten AST into virtual blocks for frontend rendering.
+        Summarize a document AST: its metadata counts plus node counts by type.
+        
+        Args:
+            ast: Full document AST
+            
+        Returns:
+            Document statistics
+        """
+        node_types: Dict[str, int] = {}
+        stack = list((ast or {}).get("children", []))
+        while stack:
+            node = stack.pop()
+            node_types[node.get("type")] = node_types.get(node.get("type"), 0) + 1
+            stack.extend(node.get("children") or [])
+        
+        return {
+            **(ast or {}).get("metadata", {}),
+            "topLevelNodes": len((ast or {}).get("children", [])),
+            "sectionCount": len((ast or {}).get("sections", [])),
+            "headingCount": node_types.get("heading", 0),
+            "nodeTypes": node_types
+        }
+    
+    async def get_section(self, db: AsyncSession, document: Document, node_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a heading's section with its top-level nodes.
+        
+        The document may be loaded without content; for chunked documents
+        the section is found in the skeleton and only its chunks are read.
         
         Args:
+            db: Database session
             document: Document object
+            node_id: Heading node ID
             
         Returns:
-            List of virtual blocks
+            Section span and counts plus its nodes, or None if not a section heading
         """
-        blocks = []
+        ast = document.content_ast
+        if not ast:
+            return None
         
-        def flatten_nodes(nodes, path=[], depth=0):
-            for i, node in enumerate(nodes):
-                current_path = path + [i]
-                
-                # Create virtual block
-                block = {
-                    "id": node.get("id"),
-                    "type": node.get("type"),
-                    "content": node.get("content", ""),
-                    "level": node.get("level"),
-                    "astPath": current_path,
-                    "depth": depth,
-                    "position": node.get("position"),
-                    "isCollapsible": node.get("type") == "heading",
-                    "isCollapsed": False
-                }
-                
-                # Add type-specific properties
-                if node.get("type") == "list":
-                    block["listType"] = node.get("listType")
-                elif node.get("type") == "code_block":
-                    block["language"] = node.get("language")
-                
-                blocks.append(block)
-                
-                # Recursively process children
-                if node.get("children"):
-                    flatten_nodes(node["children"], current_path, depth + 1)
+        if self.storage.is_chunked(document) and not ast.get("children") and "sections" in ast:
+            section = next((s for s in ast["sections"] if s["id"] == node_id), None)
+        else:
+            await self.storage.load(db, document)
+            self._node_index(document.id, document.updated_at, document.content_ast)
+            section = self.ast_service.get_section(document.content_ast, node_id)
+        if section is None:
+            return None
         
-        if document.content_ast and document.content_ast.get("children"):
-            flatten_nodes(document.content_ast["children"])
+        return {
+            **section,
+            "nodes": await self.storage.load_children(db, document, section["start"], section["end"])
+        }
+    
+    async def get_node(self, db: AsyncSession, document_id: str, node_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one node with its subtree.
+        
+        Cached documents are served from memory; otherwise only the subtree
+        is read from the database (see DocumentStorage.read_node).
+        
+        Args:
+            db: Database session
+            document_id: Document UUID
+            node_id: AST node ID
+            
+        Returns:
+            The node, or None if the document or node is not found
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            ast = fields["content_ast"]
+            node, shifts = self._node_index(document_id, fields["updated_at"], ast).get(node_id), ast.get("lineShifts")
+        else:
+            result = await self.storage.read_node(db, document_id, node_id)
+            node, shifts = result if result is not None else (None, None)
+        
+        if node is None:
+            return None
+        return self._resolve_nodes([node], shifts)[0]
+    
+    async def get_children(self, db: AsyncSession, document_id: str, start: int,
+                           end: int) -> Optional[Dict[str, Any]]:
+        """
+        Get top-level nodes [start, end) of a document.
+        
+        Cached documents are served from memory; otherwise the range is
+        sliced in the database (see DocumentStorage.read_children).
+        
+        Args:
+            db: Database session
+            document_id: Document UUID
+            start: First top-level index
+            end: Top-level index after the last one
+            
+        Returns:
+            Dict with the nodes, their start index and the total number of
+            top-level nodes, or None if the document is not found
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            ast = fields["content_ast"]
+            children, total, shifts = ast.get("children", [])[start:end], len(ast.get("children", [])), ast.get("lineShifts")
+        else:
+            result = await self.storage.read_children(db, document_id, start, end)
+            if result is None:
+                return None
+            children, total, shifts = result
+        
+        return {"children": self._resolve_nodes(children, shifts), "start": min(start, total), "total": total}
+    
+    def _node_index(self, document_id: Any, version: datetime, ast: Dict[str, Any]) -> NodeIndex:
+        """
+        Get the node index of a document version's AST.
+        
+        The index of a cached version is kept in its cache entry, so it
+        counts against the cache budget and is dropped with the entry; the
+        AST service only finds it again while it is held there.
+        """
+        index = self.cache.get_view(document_id, version, "nodeIndex")
+        if index is None or index.ast is not ast:
+            index = self.ast_service.get_node_index(ast)
+            self.cache.put_view(document_id, version, "nodeIndex", index, size=index.memory_size())
+        return index
+    
+    def _resolve_nodes(self, nodes: List[Dict[str, Any]], shifts: Optional[List[List[int]]]) -> List[Dict[str, Any]]:
+        """Apply a document's pending line shifts to nodes read on their own."""
+        if not shifts:
+            return nodes
+        return self.ast_service.resolve_positions({"children": nodes, "lineShifts": shifts})["children"]
+    
+    async def get_document_view(self, db: AsyncSession, document_id: str, name: str) -> Optional[Tuple[Any, datetime]]:
+        """
+        Get a derived view (blocks, outline or stats) of a document.
+        
+        A current stored view is served without loading the document;
+        missing or stale ones are rebuilt from the AST and stored again.
+        
+        Args:
+            db: Database session
+            document_id: Document UUID
+            name: View name
+            
+        Returns:
+            Tuple of (view, version it was built from), or None if the
+            document is not found
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            document = Document(**fields)
+            return await self._get_view(db, document, name), document.updated_at
+        
+        stored = await self.views.load_current(db, document_id, name)
+        if stored is not None:
+            return stored
         
-        return blocks
+        document = await self.get_document(db, document_id)
+        if not document:
+            return None
+        return await self._get_view(db, document, name), document.updated_at
+    
+    async def get_blocks(self, db: AsyncSession, document: Document) -> List[Dict[str, Any]]:
+        """Get the virtual blocks of a loaded document (see get_document_view)."""
+        return await self._get_view(db, document, "blocks")
+    
+    async def stream_blocks(self, document_id: str, version: Optional[datetime] = None
+                            ) -> Optional[Tuple[Union[Iterator[Dict[str, Any]], AsyncIterator[str]], datetime]]:
+        """
+        Get the virtual blocks of a document as they are produced.
+    
+        Blocks of a cached document come from its cached blocks view or are
+        flattened lazily from its AST. Otherwise the current stored view is
+        streamed as JSON text straight from JSONB, from a read-only snapshot
+        of its own session; only if that view is missing or stale is the
+        document loaded and flattened lazily.
+    
+        Args:
+            document_id: Document UUID
+            version: Only stream blocks of this version (updated_at)
+    
+        Returns:
+            Tuple of (iterator of blocks (dicts, or JSON text), version they
+            come from), or None if the document is not found (or at another
+            version than the one asked for)
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+    
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            document = Document(**fields)
+        else:
+            db = self.session_factory()
+            try:
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+                stored = await self.views.read_elements(db, document_id, "blocks")
+                if stored is None:
+                    document = await self.get_document(db, document_id)
+                elif version is None or stored[1] == version:
+                    elements, current = stored
+                    return self._close_after(elements, db), current
+                else:
+                    # Current, but not the version asked for
+                    document = None
+            except BaseException:
+                await db.close()
+                raise
+            await db.close()
+            if document is None:
+                return None
+    
+        if version is not None and document.updated_at != version:
+            return None
+        blocks = self.cache.get_view(document.id, document.updated_at, "blocks")
+        return (iter(blocks) if blocks is not None else self.iter_blocks(document.content_ast)), document.updated_at
+    
+    async def get_block_window(self, db: AsyncSession, document: Document, offset: int = 0,
+                               limit: Optional[int] = None, anchor: Optional[str] = None,
+                               before: int = 0, after: int = 0,
+                               types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get a window of a loaded document's virtual blocks.
+        
+        Windows are cut from a BlockIndex cached per document version, so
+        once it is built their cost depends on the window size only.
+        
+        Args:
+            db: Database session
+            document: Document object
+            offset: Position of the first block (without anchor)
+            limit: Maximum number of blocks (without anchor; None for all)
+            anchor: Node ID to center the window on
+            before: Blocks to include before the anchor
+            after: Blocks to include after the anchor
+            types: Node types to restrict the blocks to
+            
+        Returns:
+            Dict with the blocks, the total matching blocks, the window
+            offset and the document version
+            
+        Raises:
+            KeyError: if anchor is not a node of the document
+        """
+        index = self.cache.get_view(document.id, document.updated_at, "blockIndex")
+        if index is None:
+            blocks = await self.get_blocks(db, document)
+            index = await self.workers.run_transform(
+                self._build_block_index, document, blocks, size=self.node_count(document)
+            )
+        
+        blocks, total, start = index.window(offset, limit, anchor, before, after, types)
+        return {"blocks": blocks, "total": total, "offset": start, "version": document.updated_at}
+    
+    async def get_document_block_window(self, db: AsyncSession, document_id: str, offset: int = 0,
+                                        limit: Optional[int] = None, anchor: Optional[str] = None,
+                                        before: int = 0, after: int = 0,
+                                        types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a window of a document's virtual blocks without loading it.
+        
+        Cached documents are served from their BlockIndex (see
+        get_block_window). Otherwise the window is cut from the current
+        stored blocks view in the database, so only the window is read into
+        Python; only if that view is missing or stale is the document loaded.
+        
+        Args:
+            db: Database session
+            document_id: Document UUID
+            offset: Position of the first block (without anchor)
+            limit: Maximum number of blocks (without anchor; None for all)
+            anchor: Node ID to center the window on
+            before: Blocks to include before the anchor
+            after: Blocks to include after the anchor
+            types: Node types to restrict the blocks to
+            
+        Returns:
+            Dict with the blocks, the total matching blocks, the window
+            offset and the version they come from, or None if the document
+            is not found
+            
+        Raises:
+            KeyError: if anchor is not a node of the document
+        """
+        document_id = self._parse_id(document_id)
+        if document_id is None:
+            return None
+        
+        fields = self.cache.get(document_id)
+        if fields is not None:
+            return await self.get_block_window(db, Document(**fields), offset, limit, anchor, before, after, types)
+        
+        window = await self.views.read_window(db, document_id, "blocks", offset, limit, anchor, before, after, types)
+        if window is not None:
+            return window
+        
+        document = await self.get_document(db, document_id)
+        if not document:
+            return None
+        return await self.get_block_window(db, document, offset, limit, anchor, before, after, types)
+    
+    def _build_block_index(self, document: Document, blocks: List[Dict[str, Any]]) -> BlockIndex:
+        """Index blocks and cache the index next to the document (runs on a transform worker)."""
+        index = BlockIndex(blocks)
+        self.cache.put_view(document.id, document.updated_at, "blockIndex", index, size=deep_size(index.positions))
+        return index
+    
+    async def get_outline(self, db: AsyncSession, document: Document) -> List[Dict[str, Any]]:
+        """Get the outline of a loaded document (see get_document_view)."""
+        return await self._get_view(db, document, "outline")
+    
+    def build_views(self, ast: Dict[str, Any], names: Tuple[str, ...] = VIEW_NAMES) -> Dict[str, Any]:
+        """Build derived views of an AST (all of them by default)."""
+        return {name: self.view_builders[name](ast) for name in names}
+    
+    async def _store_views(self, db: AsyncSession, document_id: uuid.UUID, ast: Dict[str, Any]) -> None:
+        """
+        Build and store the small views of a new AST in the write's transaction.
+        
+        The blocks view of the previous version is left stale rather than
+        rebuilt; _get_view rebuilds and stores it when it is first read.
+        """
+        try:
+            views = await self.workers.run_transform(
+                self.build_views, ast, WRITE_VIEW_NAMES, size=ast.get("metadata", {}).get("nodeCount", 0)
+            )
+        except WorkerPoolError:
+            # Left stale; the first read rebuilds them
+            return
+        # The views take the version the flush gives the document row
+        await db.flush()
+        await self.views.store(db, document_id, views)
+    
+    async def _get_view(self, db: AsyncSession, document: Document, name: str) -> Any:
+        """Get a view from the cache, from document_views, or by rebuilding and storing it."""
+        view = self.cache.get_view(document.id, document.updated_at, name)
+        if view is not None:
+            return view
+        
+        view = await self.views.load(db, document.id, name, document.updated_at)
+        if view is None:
+            view = await self.workers.run_transform(
+                self.view_builders[name], document.content_ast, size=self.node_count(document)
+            )
+            try:
+                await self.views.store(db, document.id, {name: view}, document.updated_at)
+                await db.commit()
+            except SQLAlchemyError:
+                # The document changed or was deleted meanwhile; the view still matches what was read
+                await db.rollback()
+        
+        try:
+            await self.workers.run_transform(
+                self.cache.put_view, document.id, document.updated_at, name, view, size=self.node_count(document)
+            )
+        except WorkerPoolError:
+            pass
+        return view
+    
+    def flatten_ast_to_blocks(self, ast: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Flatten AST into virtual blocks for frontend rendering.
+        
+        Args:
+            ast: Full document AST
+            
+        Returns:
+            List of virtual blocks
+        """
+        return list(self.iter_blocks(ast))
+    
+    def iter_blocks(self, ast: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the virtual blocks of an AST in document order.
+        
+        Pending line shifts are applied one top-level subtree at a time, so
+        the first blocks come out before the rest of the AST is visited.
+        """
+        def flatten_node(node, path, depth):
+            # Create virtual block
+            block = {
+                "id": node.get("id"),
+                "type": node.get("type"),
+                "content": node.get("content", ""),
+                "level": node.get("level"),
+                "astPath": path,
+                "depth": depth,
+                "position": node.get("position"),
+                "isCollapsible": node.get("type") == "heading",
+                "isCollapsed": False
+            }
+            
+            # Add type-specific properties
+            if node.get("type") == "list":
+                block["listType"] = node.get("listType")
+            elif node.get("type") == "code_block":
+                block["language"] = node.get("language")
+            
+            yield block
+            
+            # Recursively process children
+            for i, child in enumerate(node.get("children") or []):
+                yield from flatten_node(child, path + [i], depth + 1)
+        
+        if not ast or not ast.get("children"):
+            return
+        shifts = ast.get("lineShifts")
+        for i, node in enumerate(ast["children"]):
+            if shifts:
+                node = self._resolve_nodes([node], shifts)[0]
+            yield from flatten_node(node, [i], 0)
     
     def search_document_content(self, document: Document, query: str) -> List[Dict[str, Any]]:
         """
@@ -341,28 +1055,35 @@ class DocumentService:
         
         return context
 
-    async def update_document_from_markdown(self, db: Session, document_id: str, markdown: str) -> Optional[Document]:
+    async def update_document_from_markdown(self, db: AsyncSession, document_id: str, markdown: str) -> Optional[Document]:
         """Update entire document from raw markdown content."""
         try:
             # Get existing document
-            document = db.query(Document).filter(Document.id == document_id).first()
+            document = await self._fetch_document(db, document_id)
             if not document:
                 return None
 
-            # Parse new markdown to AST
-            content_ast = self.ast_service.parse_markdown_to_ast(markdown)
+            # Re-parse only the blocks changed since the stored markdown
+            content_ast = await self.workers.run_parse(
+                self.ast_service.reparse_markdown_incremental,
+                document.content_ast, document.raw_markdown or "", markdown,
+                executor=self.workers.processes, size=len(markdown)
+            )
 
             # Update document
-            document.content_ast = content_ast
+            stored_ast = await self.storage.store(db, document, content_ast, document.content_ast)
             document.raw_markdown = markdown
             document.doc_metadata = content_ast.get('metadata', {})
-            document.updated_at = datetime.utcnow()
+            document.updated_at = func.clock_timestamp()
+            await self._store_views(db, document.id, stored_ast)
 
-            db.commit()
-            db.refresh(document)
+            await notify_document_changed(db, document.id)
+            await db.commit()
+            self.cache.invalidate(document.id)
+            await db.refresh(document)
 
-            return document
+            return self.storage.attach(document, stored_ast)
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise e
@@ -0,0 +1,555 @@
+"""
+Chunked storage for document ASTs.
+Large ASTs are split into document_chunks rows of consecutive top-level nodes
+so that an edit rewrites only the chunks it touches; small ASTs stay in the
+single documents.content_ast column.
+"""
+
+import os
+import json
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
+from sqlalchemy import text, select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database import Document, DocumentChunk
+
+# Storage configuration from environment
+CHUNKED_STORAGE_THRESHOLD = int(os.getenv("CHUNKED_STORAGE_THRESHOLD", str(1024 * 1024)))
+DOCUMENT_CHUNK_BYTES = int(os.getenv("DOCUMENT_CHUNK_BYTES", str(256 * 1024)))
+
+# A chunk that grows past this multiple of DOCUMENT_CHUNK_BYTES triggers a re-split
+CHUNK_SPLIT_FACTOR = 4
+
+
+def json_path_parts(indices: List[int], *keys: str) -> List[str]:
+    """Turn a node index path into a jsonb path (#>, jsonb_set) into a children array."""
+    parts = []
+    for depth, i in enumerate(indices):
+        if depth:
+            parts.append("children")
+        parts.append(str(i))
+    return parts + list(keys)
+
+
+class DocumentStorage:
+    """
+    Reads and writes document ASTs, chunking large ones.
+
+    A chunked document keeps a skeleton in content_ast: the root without its
+    children plus a "chunks" manifest listing each chunk's ordinal, node
+    count and serialized size. The chunks hold the top-level children in
+    order; chunk boundaries prefer headings so that sections tend to live in
+    one row.
+    """
+
+    def __init__(self, threshold: int = CHUNKED_STORAGE_THRESHOLD, chunk_bytes: int = DOCUMENT_CHUNK_BYTES):
+        self.threshold = threshold
+        self.chunk_bytes = chunk_bytes
+
+    def is_chunked(self, document: Document) -> bool:
+        """Check whether a document's children live in document_chunks."""
+        return bool(document.content_ast and document.content_ast.get("chunks"))
+
+    async def load(self, db: AsyncSession, document: Document) -> Document:
+        """Replace a loaded skeleton with the full AST, without marking it modified."""
+        if not self.is_chunked(document):
+            return document
+
+        rows = (await db.execute(
+            select(DocumentChunk.children)
+            .where(DocumentChunk.document_id == document.id)
+            .order_by(DocumentChunk.ordinal)
+        )).all()
+
+        children = []
+        for (chunk_children,) in rows:
+            children.extend(chunk_children)
+
+        set_committed_value(document, "content_ast", {**document.content_ast, "children": children})
+        return document
+
+    async def load_children(self, db: AsyncSession, document: Document, start: int, end: int) -> List[Dict[str, Any]]:
+        """
+        Get top-level nodes [start, end) of a document.
+
+        For chunked documents whose children are not loaded, only the chunks
+        overlapping the range are read.
+        """
+        ast = document.content_ast or {}
+        manifest = ast.get("chunks")
+        if not manifest or ast.get("children"):
+            return ast.get("children", [])[start:end]
+
+        return await self._read_chunk_slices(db, document.id, manifest, start, end)
+
+    async def read_node(self, db: AsyncSession, document_id: Any,
+                        node_id: str) -> Optional[Tuple[Dict[str, Any], Optional[List[List[int]]]]]:
+        """
+        Read one node and its subtree without loading the document.
+
+        Chunked documents are looked up through the node_paths index and the
+        node is extracted with #>; others are searched with a jsonpath query.
+        Either way only the subtree leaves Postgres.
+
+        Returns:
+            Tuple of (node, the document's pending lineShifts), or None if
+            there is no such document or node
+        """
+        row = (await db.execute(text(
+            "SELECT c.ordinal, c.node_paths -> CAST(:node_id AS text) AS path, d.content_ast -> 'lineShifts' AS shifts "
+            "FROM document_chunks c JOIN documents d ON d.id = c.document_id "
+            "WHERE c.document_id = :document_id AND c.node_paths ? CAST(:node_id AS text)"
+        ), {"document_id": document_id, "node_id": node_id})).first()
+
+        if row is not None:
+            node = (await db.execute(text(
+                "SELECT children #> CAST(:path AS text[]) FROM document_chunks "
+                "WHERE document_id = :document_id AND ordinal = :ordinal"
+            ), {
+                "document_id": document_id,
+                "ordinal": row.ordinal,
+                "path": json_path_parts([int(i) for i in row.path])
+            })).scalar()
+            return (node, row.shifts) if node is not None else None
+
+        row = (await db.execute(text(
+            "SELECT jsonb_path_query_first(content_ast -> 'children', '$.** ? (@.id == $id)', "
+            "jsonb_build_object('id', CAST(:node_id AS text))) AS node, content_ast -> 'lineShifts' AS shifts "
+            "FROM documents WHERE id = :document_id"
+        ), {"document_id": document_id, "node_id": node_id})).first()
+        if row is None or row.node is None:
+            return None
+        return row.node, row.shifts
+
+    async def read_children(self, db: AsyncSession, document_id: Any, start: int,
+                            end: int) -> Optional[Tuple[List[Dict[str, Any]], int, Optional[List[List[int]]]]]:
+        """
+        Read top-level nodes [start, end) without loading the document.
+
+        The range is sliced in Postgres (jsonpath array ranges), from the
+        document row or from the chunks that overlap it.
+
+        Returns:
+            Tuple of (nodes, total top-level nodes, pending lineShifts), or
+            None if there is no such document
+        """
+        row = (await db.execute(text(
+            "SELECT CASE WHEN CAST(:last AS integer) >= CAST(:start AS integer) "
+            "THEN jsonb_path_query_array(content_ast -> 'children', '$[$start to $last]', "
+            "jsonb_build_object('start', CAST(:start AS integer), 'last', CAST(:last AS integer))) "
+            "ELSE '[]'::jsonb END AS children, "
+            "jsonb_array_length(COALESCE(content_ast -> 'children', '[]'::jsonb)) AS total, "
+            "content_ast -> 'chunks' AS chunks, content_ast -> 'lineShifts' AS shifts "
+            "FROM documents WHERE id = :document_id"
+        ), {"document_id": document_id, "start": start, "last": end - 1})).first()
+        if row is None:
+            return None
+
+        if not row.chunks:
+            return row.children, row.total, row.shifts
+
+        children = await self._read_chunk_slices(db, document_id, row.chunks, start, end)
+        return children, sum(chunk["count"] for chunk in row.chunks), row.shifts
+
+    async def read_json(self, db: AsyncSession,
+                        document_id: Any) -> Optional[Tuple[Dict[str, Any], AsyncIterator[str]]]:
+        """
+        Read a document with its full AST as JSON text, without decoding it.
+
+        Postgres renders the jsonb (without the chunk manifest, see
+        without_manifest); the AST text is produced piece by piece,
+        the children of chunked documents one chunk per statement, so only
+        one chunk is held at a time. db must hold a REPEATABLE READ
+        transaction until the pieces are consumed, so that they all come
+        from the snapshot the columns were read from.
+
+        Returns:
+            Tuple of (the other columns by name, async iterator of the AST
+            JSON's pieces), or None if there is no such document
+        """
+        row = (await db.execute(text(
+            "SELECT title, raw_markdown, doc_metadata, created_at, updated_at, "
+            "(content_ast - 'children' - 'chunks')::text AS skeleton, content_ast -> 'chunks' AS chunks, "
+            "CASE WHEN content_ast ? 'chunks' THEN NULL ELSE (content_ast -> 'children')::text END AS children "
+            "FROM documents WHERE id = :document_id"
+        ), {"document_id": document_id})).first()
+        if row is None:
+            return None
+
+        columns = {
+            "title": row.title,
+            "raw_markdown": row.raw_markdown,
+            "doc_metadata": row.doc_metadata,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at
+        }
+        return columns, self._ast_json_parts(db, document_id, row.skeleton, row.chunks, row.children)
+
+    async def _ast_json_parts(self, db: AsyncSession, document_id: Any, skeleton: str,
+                              manifest: Optional[List[Dict[str, Any]]], children: Optional[str]) -> AsyncIterator[str]:
+        """Splice the children (inline or read chunk by chunk) into the skeleton's JSON text."""
+        if manifest is None and children is None:
+            yield skeleton
+            return
+
+        yield '{"children": ' if skeleton == "{}" else f'{skeleton[:-1]}, "children": '
+        if manifest is None:
+            yield children
+        else:
+            separator = "["
+            for chunk in manifest:
+                if not chunk["count"]:
+                    continue
+                chunk_children = (await db.execute(text(
+                    "SELECT children::text FROM document_chunks WHERE document_id = :document_id AND ordinal = :ordinal"
+                ), {"document_id": document_id, "ordinal": chunk["ordinal"]})).scalar()
+                yield separator + chunk_children[1:-1]
+                separator = ", "
+            yield "[]" if separator == "[" else "]"
+        yield "}"
+
+    async def store(self, db: AsyncSession, document: Document, ast: Dict[str, Any],
+              previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Write ast as the document's content.
+
+        When previous (the AST the edit started from, as loaded) is chunked,
+        top-level nodes shared with it by identity are recognized and only
+        chunks whose nodes changed are rewritten.
+
+        Args:
+            db: Database session
+            document: Document to write (must have an id)
+            ast: New full AST
+            previous: Full AST the new one was derived from
+
+        Returns:
+            The full AST as it should be seen after the write (with its manifest)
+        """
+        manifest = None
+        if previous and previous.get("chunks") and previous.get("children") is not None:
+            manifest = await self._store_changed_chunks(db, document, previous, ast)
+
+        if manifest is None:
+            manifest = await self._store_all(db, document, ast, bool(previous and previous.get("chunks")))
+
+        if manifest is None:
+            stored = {key: value for key, value in ast.items() if key != "chunks"}
+            document.content_ast = stored
+            return stored
+
+        skeleton = {key: value for key, value in ast.items() if key != "children"}
+        skeleton["children"] = []
+        skeleton["chunks"] = manifest
+        document.content_ast = skeleton
+        return {**skeleton, "children": ast.get("children", [])}
+
+    def without_manifest(self, ast: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Get an AST as clients see it: the chunk manifest is storage bookkeeping."""
+        if not ast or "chunks" not in ast:
+            return ast
+        return {key: value for key, value in ast.items() if key != "chunks"}
+
+    def attach(self, document: Document, ast: Dict[str, Any]) -> Document:
+        """Put the full AST back on a document refreshed after store()."""
+        set_committed_value(document, "content_ast", ast)
+        return document
+
+    async def update_node_content(self, db: AsyncSession, document_id: str, node_id: str,
+                            content: str) -> Optional[Dict[str, Any]]:
+        """
+        Set one node's content inside the database.
+
+        The node is located through the chunks' node_paths index and changed
+        with jsonb_set; the word count delta is computed from the old content
+        in the same statement and applied to the node, its ancestors, the
+        enclosing sections and the document metadata. Neither the AST nor the
+        markdown is transferred; raw_markdown is cleared and regenerated from
+        the AST on the next full read.
+
+        Args:
+            db: Database session (the caller commits)
+            document_id: Document UUID
+            node_id: Node ID
+            content: New content
+
+        Returns:
+            Updated document metadata, or None if the document is not chunked
+            or has no such node
+        """
+        row = (await db.execute(text(
+            "SELECT ordinal, node_paths -> CAST(:node_id AS text) AS path FROM document_chunks "
+            "WHERE document_id = :document_id AND node_paths ? CAST(:node_id AS text) "
+            "FOR UPDATE"
+        ), {"document_id": document_id, "node_id": node_id})).first()
+        if row is None:
+            return None
+
+        ordinal, path = row.ordinal, [int(i) for i in row.path]
+
+        # Paths are built from integers only, so they are safe to inline
+        def json_path(indices, *keys):
+            return "'{" + ",".join(json_path_parts(indices, *keys)) + "}'"
+
+        children_expr = f"jsonb_set(document_chunks.children, {json_path(path, 'content')}, to_jsonb(CAST(:content AS text)))"
+        for depth in range(len(path), 0, -1):
+            count_path = json_path(path[:depth], "metadata", "wordCount")
+            children_expr = (
+                f"jsonb_set({children_expr}, {count_path}, to_jsonb(COALESCE("
+                f"CAST(document_chunks.children #>> {count_path} AS integer), 0) + delta.words))"
+            )
+
+        words = "CAST(documents.content_ast #>> '{metadata,wordCount}' AS integer) + chunk.words"
+        metadata_words = "COALESCE(CAST(documents.doc_metadata ->> 'wordCount' AS integer), 0) + chunk.words"
+
+        result = (await db.execute(text(rf"""
+            WITH old AS (
+                SELECT children #>> {json_path(path, 'content')} AS content
+                FROM document_chunks
+                WHERE document_id = :document_id AND ordinal = :ordinal
+            ), delta AS (
+                SELECT (SELECT count(*) FROM regexp_matches(CAST(:content AS text), '\w+', 'g'))
+                     - (SELECT count(*) FROM regexp_matches(COALESCE(old.content, ''), '\w+', 'g')) AS words
+                FROM old
+            ), chunk AS (
+                UPDATE document_chunks
+                SET children = {children_expr}, updated_at = clock_timestamp()
+                FROM delta
+                WHERE document_id = :document_id AND ordinal = :ordinal
+                RETURNING delta.words
+            ), slot AS (
+                SELECT COALESCE(sum(CAST(c ->> 'count' AS integer)), 0) + :top_slot AS top_slot
+                FROM documents, jsonb_array_elements(documents.content_ast -> 'chunks') AS c
+                WHERE documents.id = :document_id AND CAST(c ->> 'ordinal' AS integer) < :ordinal
+            )
+            UPDATE documents
+            SET content_ast = CASE WHEN documents.content_ast ? 'sections' THEN jsonb_set(
+                    jsonb_set(jsonb_set(documents.content_ast - 'sourceHash',
+                        '{{metadata,wordCount}}', to_jsonb({words})),
+                        '{{metadata,pageCount}}', to_jsonb(GREATEST(1, ({words} + 249) / 250))),
+                    '{{sections}}', (
+                        SELECT COALESCE(jsonb_agg(CASE
+                            WHEN CAST(s ->> 'start' AS integer) <= slot.top_slot
+                                 AND slot.top_slot < CAST(s ->> 'end' AS integer)
+                            THEN jsonb_set(
+                                jsonb_set(s, '{{wordCount}}', to_jsonb(CAST(s ->> 'wordCount' AS integer) + chunk.words)),
+                                '{{title}}', CASE WHEN s ->> 'id' = CAST(:node_id AS text) THEN to_jsonb(CAST(:content AS text))
+                                                  ELSE s -> 'title' END)
+                            ELSE s END ORDER BY n), '[]'::jsonb)
+                        FROM jsonb_array_elements(documents.content_ast -> 'sections') WITH ORDINALITY AS e(s, n)
+                    ))
+                ELSE jsonb_set(jsonb_set(documents.content_ast - 'sourceHash',
+                    '{{metadata,wordCount}}', to_jsonb({words})),
+                    '{{metadata,pageCount}}', to_jsonb(GREATEST(1, ({words} + 249) / 250)))
+                END,
+                doc_metadata = COALESCE(documents.doc_metadata, '{{}}'::jsonb) || jsonb_build_object(
+                    'wordCount', {metadata_words},
+                    'pageCount', GREATEST(1, ({metadata_words} + 249) / 250)
+                ),
+                raw_markdown = NULL,
+                updated_at = clock_timestamp()
+            FROM chunk, slot
+            WHERE documents.id = :document_id
+            RETURNING documents.doc_metadata
+        """), {
+            "document_id": document_id,
+            "node_id": node_id,
+            "ordinal": ordinal,
+            "top_slot": path[0],
+            "content": content
+        })).first()
+
+        return result.doc_metadata if result is not None else None
+
+    async def _read_chunk_slices(self, db: AsyncSession, document_id: Any, manifest: List[Dict[str, Any]],
+                                 start: int, end: int) -> List[Dict[str, Any]]:
+        """Read top-level nodes [start, end) of a chunked document, slicing each chunk in SQL."""
+        ordinals, firsts, lasts = [], [], []
+        offset = 0
+        for chunk in manifest:
+            chunk_end = offset + chunk["count"]
+            if chunk_end > start and offset < end and chunk["count"]:
+                ordinals.append(chunk["ordinal"])
+                firsts.append(max(start, offset) - offset)
+                lasts.append(min(end, chunk_end) - offset - 1)
+            offset = chunk_end
+
+        if not ordinals:
+            return []
+
+        rows = (await db.execute(text(
+            "SELECT jsonb_path_query_array(c.children, '$[$first to $last]', "
+            "jsonb_build_object('first', r.first, 'last', r.last)) AS children "
+            "FROM document_chunks c "
+            "JOIN unnest(CAST(:ordinals AS integer[]), CAST(:firsts AS integer[]), CAST(:lasts AS integer[])) "
+            "AS r(ordinal, first, last) ON c.ordinal = r.ordinal "
+            "WHERE c.document_id = :document_id ORDER BY c.ordinal"
+        ), {"document_id": document_id, "ordinals": ordinals, "firsts": firsts, "lasts": lasts})).all()
+
+        children = []
+        for (chunk_children,) in rows:
+            children.extend(chunk_children)
+        return children
+
+    async def _store_all(self, db: AsyncSession, document: Document, ast: Dict[str, Any],
+                   had_chunks: bool) -> Optional[List[Dict[str, Any]]]:
+        """Write every chunk from scratch; returns None if the AST fits in one row."""
+        children = ast.get("children", [])
+        sizes = [self._size(node) for node in children]
+
+        if had_chunks:
+            await db.execute(
+                delete(DocumentChunk).where(DocumentChunk.document_id == document.id),
+                execution_options={"synchronize_session": False}
+            )
+
+        if sum(sizes) < self.threshold:
+            return None
+
+        manifest = []
+        for ordinal, (start, end) in enumerate(self._split(children, sizes)):
+            db.add(DocumentChunk(
+                document_id=document.id,
+                ordinal=ordinal,
+                children=children[start:end],
+                node_paths=self._node_paths(children[start:end])
+            ))
+            manifest.append({"ordinal": ordinal, "count": end - start, "bytes": sum(sizes[start:end])})
+
+        return manifest
+
+    async def _store_changed_chunks(self, db: AsyncSession, document: Document, previous: Dict[str, Any],
+                              ast: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Rewrite only changed chunks; returns None when a full rewrite is needed."""
+        plan = self._plan(previous["children"], previous["chunks"], ast.get("children", []))
+        children = ast.get("children", [])
+
+        manifest = []
+        updates = []
+        for chunk, start, end, changed in plan:
+            if not changed:
+                manifest.append(chunk)
+                continue
+
+            size = sum(self._size(node) for node in children[start:end])
+            if size > self.chunk_bytes * CHUNK_SPLIT_FACTOR:
+                return None
+            updates.append((chunk["ordinal"], start, end))
+            if end > start:
+                manifest.append({"ordinal": chunk["ordinal"], "count": end - start, "bytes": size})
+
+        # Documents that shrank well below the threshold go back to one row
+        if sum(chunk["bytes"] for chunk in manifest) < self.threshold // 2:
+            return None
+
+        for ordinal, start, end in updates:
+            where = (DocumentChunk.document_id == document.id, DocumentChunk.ordinal == ordinal)
+            if end > start:
+                statement = update(DocumentChunk).where(*where).values(
+                    children=children[start:end],
+                    node_paths=self._node_paths(children[start:end])
+                )
+            else:
+                statement = delete(DocumentChunk).where(*where)
+            await db.execute(statement, execution_options={"synchronize_session": False})
+
+        return manifest
+
+    def _plan(self, old: List[Dict[str, Any]], manifest: List[Dict[str, Any]],
+              new: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], int, int, bool]]:
+        """
+        Map old chunks onto the new children.
+
+        A chunk whose nodes all appear, in order and by identity, in the new
+        children is kept as is; new nodes between kept chunks are assigned to
+        the changed chunk before them (or the chunk after them at the start).
+        Returns (chunk, start, end, changed) for every old chunk, in order.
+        """
+        new_positions = {id(node): j for j, node in enumerate(new)}
+
+        plan = []
+        offset = 0
+        cursor = 0
+        for chunk in manifest:
+            start, end = offset, offset + chunk["count"]
+            offset = end
+
+            kept_at = None
+            if end > start:
+                j = new_positions.get(id(old[start]))
+                if (j is not None and j >= cursor and j + (end - start) <= len(new)
+                        and all(old[i] is new[j + i - start] for i in range(start, end))):
+                    kept_at = j
+                    cursor = j + (end - start)
+            plan.append([chunk, kept_at, end - start])
+
+        result = []
+        position = 0
+        open_entries = []
+        for chunk, kept_at, count in plan:
+            if kept_at is None:
+                entry = [chunk, position, position, True]
+                open_entries.append(entry)
+                result.append(entry)
+                continue
+
+            if open_entries:
+                # Changed chunks before this one share the gap; the first takes it all
+                open_entries[0][2] = kept_at
+                for entry in open_entries[1:]:
+                    entry[1] = entry[2] = kept_at
+                open_entries = []
+                result.append([chunk, kept_at, kept_at + count, False])
+            elif kept_at > position and result:
+                result[-1][2] = kept_at
+                result[-1][3] = True
+                result.append([chunk, kept_at, kept_at + count, False])
+            else:
+                result.append([chunk, position, kept_at + count, kept_at > position])
+            position = kept_at + count
+
+        if open_entries:
+            open_entries[0][2] = len(new)
+            for entry in open_entries[1:]:
+                entry[1] = entry[2] = len(new)
+        elif position < len(new) and result:
+            result[-1][2] = len(new)
+            result[-1][3] = True
+
+        return [tuple(entry) for entry in result]
+
+    def _split(self, children: List[Dict[str, Any]], sizes: List[int]) -> List[Tuple[int, int]]:
+        """Split children into [start, end) ranges of about chunk_bytes, preferring headings."""
+        ranges = []
+        start = 0
+        size = 0
+        for i, node in enumerate(children):
+            if i > start and (
+                (size >= self.chunk_bytes and node.get("type") == "heading")
+                or size >= self.chunk_bytes * 2
+            ):
+                ranges.append((start, i))
+                start, size = i, 0
+            size += sizes[i]
+
+        if start < len(children):
+            ranges.append((start, len(children)))
+        return ranges
+
+    def _node_paths(self, children: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+        """Map every node ID in children to its list of child indices."""
+        paths = {}
+        stack = [(children, [])]
+        while stack:
+            nodes, prefix = stack.pop()
+            for i, node in enumerate(nodes):
+                path = prefix + [i]
+                if node.get("id") is not None:
+                    paths[node["id"]] = path
+                if node.get("children"):
+                    stack.append((node["children"], path))
+        return paths
+
+    def _size(self, node: Dict[str, Any]) -> int:
+        return len(json.dumps(node, separators=(",", ":")))
@@ -0,0 +1,206 @@
+"""
+Persisted derived views of documents.
+Blocks, outline and stats are built at most once per document version and
+stored in document_views rows stamped with the updated_at they were built from.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, Optional, Sequence, Tuple
+from sqlalchemy import select, update, and_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Document, DocumentView
+
+# Views kept for every document
+VIEW_NAMES = ("blocks", "outline", "stats")
+
+# Views rebuilt by every write; blocks, by far the largest, is rebuilt on its first read
+WRITE_VIEW_NAMES = ("outline", "stats")
+
+# Elements of a streamed view fetched per round trip
+ELEMENT_BATCH_SIZE = 500
+
+
+class DocumentViews:
+    """
+    Reads and writes document_views rows.
+
+    A view is current only while its version equals the document's
+    updated_at. Views written in the same transaction as the document take
+    the updated_at stored in its row, so the write must be flushed first.
+    """
+
+    async def load(self, db: AsyncSession, document_id: Any, name: str, version: datetime) -> Optional[Any]:
+        """Get a stored view built from version, or None if missing or stale."""
+        return (await db.execute(
+            select(DocumentView.data)
+            .where(DocumentView.document_id == document_id, DocumentView.name == name,
+                   DocumentView.version == version)
+        )).scalar_one_or_none()
+
+    async def load_current(self, db: AsyncSession, document_id: Any, name: str) -> Optional[Tuple[Any, datetime]]:
+        """
+        Get a stored view with its version, or None if missing or stale.
+
+        The view is checked against the document's current updated_at in
+        the same query.
+        """
+        row = (await db.execute(
+            select(DocumentView.data, DocumentView.version)
+            .join(Document, and_(Document.id == DocumentView.document_id, Document.updated_at == DocumentView.version))
+            .where(DocumentView.document_id == document_id, DocumentView.name == name)
+        )).first()
+        return (row.data, row.version) if row is not None else None
+
+    async def read_elements(self, db: AsyncSession, document_id: Any,
+                            name: str) -> Optional[Tuple[AsyncIterator[str], datetime]]:
+        """
+        Read a current stored list view as the JSON text of its elements,
+        without decoding it.
+
+        The elements are fetched through a server-side cursor while they are
+        consumed; db must hold a REPEATABLE READ transaction until then, so
+        that they come from the snapshot the version was checked in.
+
+        Returns:
+            Tuple of (async iterator of the elements' JSON, version), or
+            None if the view is missing or stale
+        """
+        current = (await db.execute(
+            select(DocumentView.version)
+            .join(Document, and_(Document.id == DocumentView.document_id, Document.updated_at == DocumentView.version))
+            .where(DocumentView.document_id == document_id, DocumentView.name == name)
+        )).scalar_one_or_none()
+        if current is None:
+            return None
+        return self._elements(db, document_id, name), current
+
+    async def read_window(self, db: AsyncSession, document_id: Any, name: str, offset: int = 0,
+                          limit: Optional[int] = None, anchor: Optional[str] = None, before: int = 0,
+                          after: int = 0, types: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cut a window out of a current stored list view in the database.
+
+        The window follows BlockIndex.window (offset and limit, or before and
+        after around the element whose "id" is anchor, among the elements
+        whose "type" is in types); only the window's elements are sent and
+        decoded, and the version check is part of the same statement.
+
+        Returns:
+            Dict with the elements, the total matching elements, the window
+            offset and the view's version, or None if the view is missing or
+            stale
+
+        Raises:
+            KeyError: if anchor is not the ID of an element
+        """
+        ctes = ["""view AS MATERIALIZED (
+                SELECT document_views.data, document_views.version FROM document_views
+                JOIN documents ON documents.id = document_views.document_id
+                              AND documents.updated_at = document_views.version
+                WHERE document_views.document_id = :document_id AND document_views.name = :name
+            )"""]
+        params = {
+            "document_id": document_id, "name": name, "offset": offset, "limit": limit,
+            "anchor": anchor, "before": before, "after": after, "types": list(types or [])
+        }
+
+        if types:
+            ctes.append("""selected AS (
+                SELECT e.element, e.n - 1 AS position, row_number() OVER (ORDER BY e.n) - 1 AS slot
+                FROM view, jsonb_array_elements(view.data) WITH ORDINALITY AS e(element, n)
+                WHERE e.element ->> 'type' = ANY(CAST(:types AS text[]))
+            )""")
+            total = "(SELECT count(*) FROM selected)"
+        else:
+            total = "jsonb_array_length(view.data)"
+
+        if anchor is not None:
+            ctes.append("""anchor AS (
+                SELECT e.n - 1 AS position
+                FROM view, jsonb_array_elements(view.data) WITH ORDINALITY AS e(element, n)
+                WHERE e.element ->> 'id' = CAST(:anchor AS text)
+                LIMIT 1
+            )""")
+            # An anchor of another type sorts among the selected elements
+            slot = "(SELECT count(*) FROM selected WHERE selected.position < anchor.position)" if types else "anchor.position"
+            bounds = f"""SELECT {total} AS total, anchor.position AS anchor,
+                       GREATEST({slot} - :before, 0) AS first, {slot} + :after + 1 AS stop
+                FROM view LEFT JOIN anchor ON true"""
+        else:
+            bounds = f"""SELECT {total} AS total, 0 AS anchor,
+                       CAST(:offset AS bigint) AS first, CAST(:offset AS bigint) + CAST(:limit AS bigint) AS stop
+                FROM view"""
+        ctes.append(f"""bounds AS (
+                SELECT total, anchor, LEAST(first, total) AS first, LEAST(COALESCE(stop, total), total) AS stop
+                FROM ({bounds}) AS b
+            )""")
+
+        if types:
+            elements = """(SELECT COALESCE(jsonb_agg(selected.element ORDER BY selected.slot), '[]'::jsonb)
+                 FROM selected WHERE selected.slot >= bounds.first AND selected.slot < bounds.stop)"""
+        else:
+            elements = """jsonb_path_query_array(view.data, '$[$first to $last]',
+                 jsonb_build_object('first', bounds.first, 'last', bounds.stop - 1))"""
+
+        row = (await db.execute(text(
+            "WITH " + ", ".join(ctes) +
+            f" SELECT view.version, bounds.total, bounds.anchor, bounds.first, {elements} AS elements FROM view, bounds"
+        ), params)).first()
+
+        if row is None:
+            return None
+        if row.anchor is None:
+            raise KeyError(anchor)
+        return {"blocks": row.elements, "total": row.total, "offset": row.first, "version": row.version}
+
+    async def _elements(self, db: AsyncSession, document_id: Any, name: str) -> AsyncIterator[str]:
+        result = await db.stream(text(
+            "SELECT jsonb_array_elements(data)::text FROM document_views "
+            "WHERE document_id = :document_id AND name = :name"
+        ), {"document_id": document_id, "name": name})
+        async for rows in result.partitions(ELEMENT_BATCH_SIZE):
+            for (element,) in rows:
+                yield element
+
+    async def store(self, db: AsyncSession, document_id: Any, views: Dict[str, Any],
+                    version: Optional[datetime] = None) -> None:
+        """
+        Write views built from one document version.
+
+        version defaults to the document's stored updated_at; an existing
+        row is only replaced by a newer version.
+        """
+        if not views:
+            return
+
+        if version is None:
+            version = self._stored_version(document_id)
+        statement = insert(DocumentView).values([
+            {
+                "document_id": document_id,
+                "name": name,
+                "version": version,
+                "data": data
+            }
+            for name, data in views.items()
+        ])
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[DocumentView.document_id, DocumentView.name],
+            set_={"version": statement.excluded.version, "data": statement.excluded.data},
+            where=DocumentView.version < statement.excluded.version
+        ))
+
+    async def touch(self, db: AsyncSession, document_id: Any, version: datetime) -> None:
+        """Carry views of version over to a flushed write that left the AST unchanged."""
+        await db.execute(
+            update(DocumentView)
+            .where(DocumentView.document_id == document_id, DocumentView.version == version)
+            .values(version=self._stored_version(document_id)),
+            execution_options={"synchronize_session": False}
+        )
+
+    def _stored_version(self, document_id: Any):
+        """SQL expression for the document's updated_at as stored in its row."""
+        return select(Document.updated_at).where(Document.id == document_id).scalar_subquery()
@@ -0,0 +1,130 @@
+"""
+Incremental JSON encoding for large responses.
+Payloads are walked and emitted in chunks of about STREAM_CHUNK_BYTES, so a
+response never holds its whole encoded body in memory.
+"""
+
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Union
+
+import orjson
+
+# Size of the chunks handed to the server
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# List items encoded per orjson call
+LIST_BATCH_SIZE = 64
+
+
+class RawJSON:
+    """
+    A value that is already JSON, spliced into the output as is.
+
+    parts is the JSON text itself, or an async iterable of consecutive
+    pieces of it (e.g. read from the database one chunk at a time).
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: Union[bytes, str, AsyncIterable[Union[bytes, str]]]):
+        self.parts = parts
+
+
+async def iter_json(value: Any, depth: int = 1, chunk_bytes: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """
+    Encode value as JSON in chunks of about chunk_bytes.
+
+    Containers are walked down to depth levels: dicts key by key, lists
+    a batch of LIST_BATCH_SIZE items at a time, each item encoded whole
+    with orjson. Long strings are encoded in slices. Peak memory is one
+    chunk plus the largest batch, whatever the size of value.
+    """
+    buffer = bytearray()
+    async for part in _encode(value, depth, chunk_bytes):
+        if len(part) < chunk_bytes:
+            buffer += part
+            if len(buffer) < chunk_bytes:
+                continue
+            yield bytes(buffer)
+            buffer.clear()
+        else:
+            if buffer:
+                yield bytes(buffer)
+                buffer.clear()
+            for start in range(0, len(part), chunk_bytes):
+                yield part[start:start + chunk_bytes]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_ndjson(items: Union[Iterable[Any], AsyncIterable[Any]],
+                      chunk_bytes: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """
+    Encode items as newline-delimited JSON in chunks of about chunk_bytes.
+
+    items may be produced lazily (a generator, or an async iterator such
+    as a database cursor); str items are taken to be JSON already. The
+    first chunk is sent after a single item, so clients can start on it
+    while the rest is produced.
+    """
+    buffer = bytearray()
+    limit = 1
+    if not hasattr(items, "__aiter__"):
+        items = _aiter(items)
+    async for item in items:
+        buffer += item.encode() if isinstance(item, str) else orjson.dumps(item)
+        buffer += b"\n"
+        if len(buffer) >= limit:
+            yield bytes(buffer)
+            buffer.clear()
+            limit = chunk_bytes
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _aiter(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def _encode(value: Any, depth: int, chunk_bytes: int) -> AsyncIterator[bytes]:
+    """Yield consecutive pieces of the JSON encoding of value."""
+    if isinstance(value, RawJSON):
+        parts = value.parts
+        if isinstance(parts, (bytes, str)):
+            yield parts.encode() if isinstance(parts, str) else parts
+        else:
+            async for part in parts:
+                yield part.encode() if isinstance(part, str) else part
+    elif isinstance(value, dict) and depth > 0:
+        separator = b"{"
+        for key, item in value.items():
+            yield separator + orjson.dumps(key) + b":"
+            separator = b","
+            async for part in _encode(item, depth - 1, chunk_bytes):
+                yield part
+        yield b"{}" if separator == b"{" else b"}"
+    elif isinstance(value, list) and depth > 0:
+        if not any(isinstance(item, RawJSON) for item in value):
+            # Items are small (nodes, blocks): encode them a batch at a time
+            separator = b"["
+            for start in range(0, len(value), LIST_BATCH_SIZE):
+                yield separator + orjson.dumps(value[start:start + LIST_BATCH_SIZE])[1:-1]
+                separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+            return
+        separator = b"["
+        for item in value:
+            yield separator
+            async for part in _encode(item, 0, chunk_bytes):
+                yield part
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+    elif isinstance(value, str) and len(value) > chunk_bytes:
+        # Slices are whole code points, so each one encodes on its own
+        yield b'"'
+        for start in range(0, len(value), chunk_bytes):
+            yield orjson.dumps(value[start:start + chunk_bytes])[1:-1]
+        yield b'"'
+    else:
+        yield orjson.dumps(value)
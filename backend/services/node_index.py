@@ -0,0 +1,142 @@
+"""
+Node index for AST documents.
+Maps node IDs to their node, parent and child slot so that lookups and path
+computation do not need to search the tree.
+"""
+
+import sys
+from typing import Dict, List, Any, Optional, Set
+
+
+class NodeIndex:
+    """
+    Index of every node in an AST by ID.
+
+    Parents are recorded by ID (None for top-level nodes) and child slots are
+    renumbered lazily: structural edits only mark the affected parent as
+    dirty, and its children are renumbered the next time a slot is needed.
+    """
+
+    def __init__(self, ast: Dict[str, Any]):
+        self.ast = ast
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._parents: Dict[str, Optional[str]] = {}
+        self._slots: Dict[str, int] = {}
+        self._dirty: Set[Optional[str]] = set()
+
+        self._add_children(ast.get("children", []), None)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Get a node by ID."""
+        return self._nodes.get(node_id)
+
+    def parent_id(self, node_id: str) -> Optional[str]:
+        """Get the ID of a node's parent (None for top-level nodes)."""
+        return self._parents.get(node_id)
+
+    def parent(self, node_id: str) -> Dict[str, Any]:
+        """Get a node's parent node (the document root for top-level nodes)."""
+        return self._container(self._parents[node_id])
+
+    def slot(self, node_id: str) -> int:
+        """Get a node's index within its parent's children."""
+        parent_id = self._parents[node_id]
+        if parent_id in self._dirty:
+            self._renumber(parent_id)
+        return self._slots[node_id]
+
+    def path(self, node_id: str) -> List[int]:
+        """Get the path to a node (list of child indices from the root)."""
+        if node_id not in self._nodes:
+            return []
+
+        path = []
+        current = node_id
+        while current is not None:
+            path.append(self.slot(current))
+            current = self._parents[current]
+        path.reverse()
+        return path
+
+    def ancestors(self, node_id: str) -> List[str]:
+        """Get the IDs of a node's ancestors, nearest first."""
+        ancestors = []
+        current = self._parents.get(node_id)
+        while current is not None:
+            ancestors.append(current)
+            current = self._parents[current]
+        return ancestors
+
+    def add(self, node: Dict[str, Any], parent_id: Optional[str]) -> None:
+        """Index a node inserted under parent_id, together with its subtree."""
+        self._add_children([node], parent_id)
+        self._dirty.add(parent_id)
+
+    def remove(self, node_id: str) -> None:
+        """Drop a removed node and its subtree from the index."""
+        node = self._nodes.get(node_id)
+        if node is None:
+            return
+
+        self._dirty.add(self._parents[node_id])
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current_id = current.get("id")
+            if current_id is not None:
+                self._nodes.pop(current_id, None)
+                self._parents.pop(current_id, None)
+                self._slots.pop(current_id, None)
+                self._dirty.discard(current_id)
+            stack.extend(current.get("children", []))
+
+    def detach(self, node_id: str) -> None:
+        """Note that a node was taken out of its parent's children; add() re-attaches it."""
+        self._dirty.add(self._parents[node_id])
+
+    def replace(self, node: Dict[str, Any]) -> None:
+        """Point the index at a new object for an already indexed node ID."""
+        self._nodes[node["id"]] = node
+
+    def copy(self) -> "NodeIndex":
+        """Get an independent index of the same AST, to be edited along with a copy of it."""
+        index = NodeIndex.__new__(NodeIndex)
+        index.ast = self.ast
+        index._nodes = dict(self._nodes)
+        index._parents = dict(self._parents)
+        index._slots = dict(self._slots)
+        index._dirty = set(self._dirty)
+        return index
+
+    def memory_size(self) -> int:
+        """Approximate the memory held by the index itself, without the indexed AST."""
+        return sum(sys.getsizeof(table) for table in (self._nodes, self._parents, self._slots, self._dirty))
+
+    def _container(self, parent_id: Optional[str]) -> Dict[str, Any]:
+        return self.ast if parent_id is None else self._nodes[parent_id]
+
+    def _renumber(self, parent_id: Optional[str]) -> None:
+        for i, child in enumerate(self._container(parent_id).get("children", [])):
+            if "id" in child:
+                self._slots[child["id"]] = i
+        self._dirty.discard(parent_id)
+
+    def _add_children(self, children: List[Dict[str, Any]], parent_id: Optional[str]) -> None:
+        stack = [(children, parent_id)]
+        while stack:
+            nodes, current_parent = stack.pop()
+            for i, node in enumerate(nodes):
+                node_id = node.get("id")
+                if node_id is None:
+                    continue
+                self._nodes[node_id] = node
+                self._parents[node_id] = current_parent
+                self._slots[node_id] = i
+                if node.get("children"):
+                    stack.append((node["children"], node_id))
@@ -0,0 +1,142 @@
+"""
+Parse cache for ASTService.
+Maps a hash of markdown content plus parser configuration to the parsed AST,
+with a memory-bounded LRU tier and an optional on-disk tier.
+"""
+
+import os
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Cache configuration from environment
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR")
+
+
+class ParseCache:
+    """
+    Two-tier cache of parsed ASTs.
+
+    Entries are stored as serialized JSON so that every hit hands out a fresh,
+    independently mutable AST and memory use can be accounted exactly. The disk
+    tier keeps gzip-compressed copies that survive restarts.
+    """
+
+    def __init__(self, max_bytes: int = PARSE_CACHE_MAX_BYTES, directory: Optional[str] = PARSE_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached AST for key, or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if data is None:
+            data = self._read_disk(key)
+            with self._lock:
+                if data is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                self.disk_hits += 1
+            self._store_memory(key, data)
+
+        return json.loads(data)
+
+    def put(self, key: str, ast: Dict[str, Any]) -> None:
+        """Cache an AST under key in every configured tier."""
+        data = json.dumps(ast, separators=(",", ":")).encode("utf-8")
+        self._store_memory(key, data)
+        self._write_disk(key, data)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and size counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "maxBytes": self.max_bytes,
+                "diskEnabled": bool(self.directory)
+            }
+
+    def _store_memory(self, key: str, data: bytes) -> None:
+        """Insert into the LRU tier, evicting least recently used entries."""
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+
+        try:
+            with gzip.open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.directory:
+            return
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+
+        # Write to a temporary file first so readers never see partial entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# Shared cache used by ASTService instances unless one is passed explicitly
+parse_cache = ParseCache()
@@ -0,0 +1,164 @@
+"""
+Bounded executors for CPU-heavy request work.
+Parsing runs in a parse lane whose threads hand the markdown to a process
+pool, lighter AST transforms (rendering, flattening, searching) in a thread
+pool lane. Each lane admits a
+bounded number of tasks and rejects the rest immediately so that callers can
+answer 503 instead of queueing without limit.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Callable, Optional
+
+# Worker pool configuration from environment
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+PARSE_CONCURRENCY = int(os.getenv("PARSE_CONCURRENCY", "2"))
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", "4"))
+WORKER_QUEUE_DEPTH = int(os.getenv("WORKER_QUEUE_DEPTH", "8"))
+MAX_PARSE_BYTES = int(os.getenv("MAX_PARSE_BYTES", str(50 * 1024 * 1024)))
+MAX_TRANSFORM_NODES = int(os.getenv("MAX_TRANSFORM_NODES", "2000000"))
+
+
+class WorkerPoolError(Exception):
+    """Base class for tasks refused by the worker pool."""
+
+
+class WorkerPoolSaturated(WorkerPoolError):
+    """A lane has no room for another task; retry after retry_after seconds."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"The {lane} workers are busy, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class TaskTooLarge(WorkerPoolError):
+    """A task's input exceeds the lane's size limit."""
+
+    def __init__(self, lane: str, size: int, limit: int):
+        super().__init__(f"Input of size {size} exceeds the {lane} limit of {limit}")
+        self.lane = lane
+        self.size = size
+        self.limit = limit
+
+
+class _Lane:
+    """Admission control and timing for one kind of task."""
+
+    def __init__(self, name: str, workers: int, queue_depth: int, size_limit: int):
+        self.name = name
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self.size_limit = size_limit
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.avg_seconds = 0.0
+
+    def admit(self, size: int) -> None:
+        if size > self.size_limit:
+            self.rejected += 1
+            raise TaskTooLarge(self.name, size, self.size_limit)
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise WorkerPoolSaturated(self.name, self.retry_after())
+        self.in_flight += 1
+
+    def release(self, seconds: float) -> None:
+        self.in_flight -= 1
+        self.completed += 1
+        # Exponentially weighted average task time, for Retry-After estimates
+        self.avg_seconds = seconds if self.completed == 1 else 0.8 * self.avg_seconds + 0.2 * seconds
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until a slot frees up (at least 1)."""
+        waves = self.in_flight / max(1, self.workers)
+        return max(1, int(self.avg_seconds * waves + 0.999))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "inFlight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avgSeconds": round(self.avg_seconds, 4)
+        }
+
+
+class WorkerPool:
+    """
+    Parse and transform lanes with bounded admission.
+
+    Parse tasks run on a small set of orchestration threads that hand the
+    markdown parsing to the shared process pool (see processes); the
+    process pool is created on first use. Admission is checked on the
+    event loop thread, so the counters need no locking.
+    """
+
+    def __init__(self, parse_workers: int = PARSE_WORKERS, parse_concurrency: int = PARSE_CONCURRENCY,
+                 transform_workers: int = TRANSFORM_WORKERS, queue_depth: int = WORKER_QUEUE_DEPTH,
+                 max_parse_bytes: int = MAX_PARSE_BYTES, max_transform_nodes: int = MAX_TRANSFORM_NODES):
+        self.parse_workers = parse_workers
+        self.parse_lane = _Lane("parse", parse_concurrency, queue_depth, max_parse_bytes)
+        self.transform_lane = _Lane("transform", transform_workers, queue_depth, max_transform_nodes)
+        self._parse_threads = ThreadPoolExecutor(max_workers=parse_concurrency, thread_name_prefix="parse")
+        self._transform_threads = ThreadPoolExecutor(max_workers=transform_workers, thread_name_prefix="transform")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def processes(self) -> Executor:
+        """The process pool used for parsing markdown chunks."""
+        with self._lock:
+            if self._processes is None:
+                # Spawned workers do not inherit the server's threads or sockets
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._processes
+
+    async def run_parse(self, fn: Callable, *args, size: int = 0, **kwargs) -> Any:
+        """Run a parse task (size in bytes of markdown) off the event loop."""
+        return await self._run(self.parse_lane, self._parse_threads, fn, args, kwargs, size)
+
+    async def run_transform(self, fn: Callable, *args, size: int = 0, **kwargs) -> Any:
+        """Run an AST transform (size in nodes) off the event loop."""
+        return await self._run(self.transform_lane, self._transform_threads, fn, args, kwargs, size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-lane admission counters."""
+        return {
+            "parse": {**self.parse_lane.get_stats(), "processes": self.parse_workers},
+            "transform": self.transform_lane.get_stats()
+        }
+
+    def shutdown(self) -> None:
+        """Stop all executors, waiting for running tasks."""
+        self._parse_threads.shutdown()
+        self._transform_threads.shutdown()
+        with self._lock:
+            if self._processes is not None:
+                self._processes.shutdown()
+                self._processes = None
+
+    async def _run(self, lane: _Lane, executor: Executor, fn: Callable, args: tuple,
+                   kwargs: Dict[str, Any], size: int) -> Any:
+        lane.admit(size)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+        finally:
+            lane.release(time.perf_counter() - start)
+
+
+# Shared pool used by the API unless one is passed explicitly
+worker_pool = WorkerPool()
@@ -45,6 +45,19 @@ export interface Document {
   updated_at: string;
 }
 
+export interface DocumentSummary {
+  id: string;
+  title: string;
+  metadata: Document['metadata'];
+  created_at: string;
+  updated_at: string;
+}
+
+export interface DocumentSummaryPage {
+  documents: DocumentSummary[];
+  nextCursor: string | null;
+}
+
 export interface VirtualBlock {
   id: string;
   type: string;
@@ -66,6 +79,27 @@ export interface DocumentBlocksResponse {
   document: Document;
   blocks: VirtualBlock[];
   outline: OutlineItem[];
+  total: number;
+  offset: number;
+}
+
+export interface BlockWindowOptions {
+  offset?: number;
+  limit?: number;
+  anchor?: string;
+  before?: number;
+  after?: number;
+  types?: string[];
+  includeDocument?: boolean;
+  includeOutline?: boolean;
+}
+
+export interface BlockWindowResponse {
+  document?: Document | null;
+  blocks: VirtualBlock[];
+  outline?: OutlineItem[] | null;
+  total: number;
+  offset: number;
 }
 
 export interface OutlineItem {
@@ -145,9 +179,16 @@ class DocumentService {
     return response.data;
   }
 
-  async listDocuments(skip: number = 0, limit: number = 100): Promise<Document[]> {
+  async listDocuments(limit: number = 100, cursor?: string): Promise<DocumentSummaryPage> {
     const response = await this.api.get('/documents', {
-      params: { skip, limit },
+      params: { limit, cursor },
+    });
+    return { documents: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
+  }
+
+  async listFullDocuments(skip: number = 0, limit: number = 100): Promise<Document[]> {
+    const response = await this.api.get('/documents', {
+      params: { skip, limit, view: 'full' },
     });
     return response.data;
   }
@@ -187,6 +228,72 @@ class DocumentService {
     return response.data;
   }
 
+  async getNode(documentId: string, nodeId: string): Promise<ASTNode> {
+    const response = await this.api.get(`/documents/${documentId}/nodes/${nodeId}`);
+    return response.data;
+  }
+
+  async getChildren(
+    documentId: string,
+    start: number,
+    end: number
+  ): Promise<{ children: ASTNode[]; start: number; total: number }> {
+    const response = await this.api.get(`/documents/${documentId}/children`, {
+      params: { start, end },
+    });
+    return response.data;
+  }
+
+  async getBlockWindow(documentId: string, options: BlockWindowOptions = {}): Promise<BlockWindowResponse> {
+    const response = await this.api.get(`/documents/${documentId}/blocks`, {
+      params: {
+        offset: options.offset,
+        limit: options.limit,
+        anchor: options.anchor,
+        before: options.before,
+        after: options.after,
+        types: options.types?.join(','),
+        include_document: options.includeDocument ?? false,
+        include_outline: options.includeOutline ?? false,
+      },
+    });
+    return response.data;
+  }
+
+  /**
+   * Stream all blocks of a document, calling onBlocks with each batch as it
+   * arrives so rendering can start before the whole document is flattened.
+   */
+  async streamBlocks(
+    documentId: string,
+    onBlocks: (blocks: VirtualBlock[]) => void,
+    signal?: AbortSignal
+  ): Promise<number> {
+    const response = await fetch(`${API_BASE_URL}/documents/${documentId}/blocks.ndjson`, { signal });
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to stream blocks: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = '';
+    let count = 0;
+    for (;;) {
+      const { done, value } = await reader.read();
+      pending += decoder.decode(value, { stream: !done });
+      const lines = pending.split('\n');
+      pending = done ? '' : lines.pop() ?? '';
+      const blocks = lines.filter((line) => line).map((line) => JSON.parse(line) as VirtualBlock);
+      if (blocks.length) {
+        count += blocks.length;
+        onBlocks(blocks);
+      }
+      if (done) {
+        return count;
+      }
+    }
+  }
+
   async getDocumentOutline(documentId: string): Promise<OutlineItem[]> {
     const response = await this.api.get(`/documents/${documentId}/outline`);
     return response.data.outline;
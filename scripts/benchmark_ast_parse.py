@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark markdown -> AST parsing on the sample documents.
+Compares the original three-pass pipeline (tokens to AST, uuid4 ID pass,
+regex metadata pass) against the single-pass ASTService builder, reporting
+wall time and peak traced memory for each file in sample_data/.
+"""
+
+import os
+import re
+import sys
+import time
+import uuid
+import tracemalloc
+
+# Add backend to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+if os.path.exists(backend_path):
+    sys.path.append(backend_path)
+else:
+    sys.path.append(os.path.dirname(__file__))
+
+from markdown_it import MarkdownIt
+from services.ast_service import ASTService
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample_data')
+SAMPLE_FILES = ["dummy_300_pages_detailed.md", "large_sample.md"]
+RUNS = 3
+
+
+class LegacyParser:
+    """The parse pipeline as it was before the fused builder."""
+
+    CONTAINERS = ["heading_open", "paragraph_open", "list_item_open",
+                  "blockquote_open", "bullet_list_open", "ordered_list_open"]
+
+    def __init__(self):
+        self.md = MarkdownIt("commonmark", {
+            "html": True,
+            "linkify": True,
+            "typographer": True
+        }).enable(['table', 'strikethrough'])
+        self.service = ASTService(cache=None)
+
+    def parse(self, markdown):
+        tokens = self.md.parse(markdown)
+
+        ast = {"type": "document", "children": []}
+        stack = [ast]
+        for token in tokens:
+            if token.type.endswith("_open"):
+                node = self.service._token_to_node(token)
+                stack[-1]["children"].append(node)
+                if token.type in self.CONTAINERS:
+                    stack.append(node)
+            elif token.type.endswith("_close"):
+                if len(stack) > 1:
+                    stack.pop()
+            elif token.type == "inline":
+                if stack[-1].get("type") in ["heading", "paragraph", "list_item"]:
+                    stack[-1]["content"] = token.content
+            else:
+                stack[-1]["children"].append(self.service._token_to_node(token))
+
+        def assign_ids(node):
+            if "id" not in node:
+                node["id"] = f"node_{uuid.uuid4().hex[:8]}"
+            for child in node.get("children", []):
+                assign_ids(child)
+        assign_ids(ast)
+
+        word_count = 0
+        node_count = 0
+
+        def count_nodes(node):
+            nonlocal word_count, node_count
+            node_count += 1
+            content = node.get("content", "")
+            if content:
+                word_count += len(re.findall(r'\b\w+\b', content))
+            for child in node.get("children", []):
+                count_nodes(child)
+        for child in ast["children"]:
+            count_nodes(child)
+
+        ast["metadata"] = {
+            "wordCount": word_count,
+            "nodeCount": node_count,
+            "pageCount": max(1, (word_count + 249) // 250)
+        }
+        return ast
+
+
+def measure(parse, markdown):
+    """Return (best wall time in ms, peak traced memory in MB, result)."""
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = parse(markdown)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+
+    tracemalloc.start()
+    result = parse(markdown)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak / (1024 * 1024), result
+
+
+def main():
+    legacy = LegacyParser()
+    fused = ASTService(cache=None)
+
+    print("📊 AST parse benchmark (best of %d runs, peak memory traced separately)" % RUNS)
+    for filename in SAMPLE_FILES:
+        with open(os.path.join(SAMPLE_DIR, filename), encoding="utf-8") as f:
+            markdown = f.read()
+
+        legacy_ms, legacy_mb, legacy_ast = measure(legacy.parse, markdown)
+        fused_ms, fused_mb, fused_ast = measure(fused.parse_markdown_to_ast, markdown)
+
+        assert legacy_ast["metadata"] == fused_ast["metadata"], "metadata mismatch"
+
+        print(f"\n📄 {filename} ({len(markdown) / 1024 / 1024:.1f} MB, "
+              f"{fused_ast['metadata']['nodeCount']} nodes)")
+        print(f"  Legacy three-pass: {legacy_ms:8.1f} ms  peak {legacy_mb:7.1f} MB")
+        print(f"  Fused single-pass: {fused_ms:8.1f} ms  peak {fused_mb:7.1f} MB")
+        print(f"  ⚡ Speedup {legacy_ms / fused_ms:.2f}x, "
+              f"peak memory {(fused_mb / legacy_mb - 1) * 100:+.0f}%")
+
+
+if __name__ == "__main__":
+    main()
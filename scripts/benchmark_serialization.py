@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /documents/{id} response serialization on the sample documents.
+Compares FastAPI's default path (DocumentResponse validated against the
+response_model, then encoded by JSONResponse) with the orjson path used by
+main_ast (unvalidated payload encoded by ORJSONResponse). The serialization
+share is measured against decoding the stored AST, which every uncached GET
+pays to read the row.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Add backend to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+if os.path.exists(backend_path):
+    sys.path.append(backend_path)
+else:
+    sys.path.append(os.path.dirname(__file__))
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from services.ast_service import ASTService
+from main_ast import DocumentResponse, document_response, json_response
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample_data')
+SAMPLE_FILES = ["dummy_300_pages_detailed.md", "large_sample.md"]
+RUNS = 5
+
+
+def best_of(fn):
+    """Return (best wall time in ms, result)."""
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    service = ASTService(cache=None)
+    field = create_response_field(name="Response_get_document", type_=DocumentResponse)
+
+    def default_path(document):
+        model = DocumentResponse(**document_response(document))
+        content = asyncio.run(serialize_response(field=field, response_content=model, is_coroutine=True))
+        return JSONResponse(content).body
+
+    def fast_path(document):
+        return json_response(document_response(document)).body
+
+    print("📊 Response serialization benchmark (best of %d runs)" % RUNS)
+    for filename in SAMPLE_FILES:
+        with open(os.path.join(SAMPLE_DIR, filename), encoding="utf-8") as f:
+            markdown = f.read()
+
+        ast = service.parse_markdown_to_ast(markdown)
+        stored = json.dumps(ast)
+        now = datetime.now(timezone.utc)
+        document = SimpleNamespace(
+            id="00000000-0000-0000-0000-000000000000", title=filename, content_ast=ast,
+            raw_markdown=markdown, doc_metadata=ast["metadata"], created_at=now, updated_at=now
+        )
+
+        decode_ms, _ = best_of(lambda: json.loads(stored))
+        default_ms, default_body = best_of(lambda: default_path(document))
+        fast_ms, fast_body = best_of(lambda: fast_path(document))
+
+        assert json.loads(default_body) == orjson.loads(fast_body), "payload mismatch"
+
+        print(f"\n📄 {filename} ({len(stored) / 1024 / 1024:.1f} MB AST, "
+              f"{ast['metadata']['nodeCount']} nodes)")
+        print(f"  Decode stored AST:     {decode_ms:8.1f} ms")
+        print(f"  Default serialization: {default_ms:8.1f} ms  "
+              f"({default_ms / (decode_ms + default_ms) * 100:4.1f}% of decode + serialize)")
+        print(f"  orjson serialization:  {fast_ms:8.1f} ms  "
+              f"({fast_ms / (decode_ms + fast_ms) * 100:4.1f}% of decode + serialize)")
+        print(f"  ⚡ Speedup {default_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to rebuild idx_documents_updated on (updated_at, id).
+Databases created before keyset pagination have the index on updated_at
+alone; create_all does not alter existing indexes, so the summary listing
+would sort instead of walking the index. The new index is built
+concurrently and swapped in under the old name, without blocking writes.
+"""
+
+import os
+import sys
+
+# Add backend to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+if os.path.exists(backend_path):
+    sys.path.append(backend_path)
+else:
+    # Running from within backend directory
+    sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import create_engine, text
+from database import DATABASE_URL
+
+INDEX_NAME = "idx_documents_updated"
+BUILD_NAME = "idx_documents_updated_keyset"
+KEYSET_COLUMNS = "(updated_at, id)"
+
+def current_definition(conn):
+    """Get the CREATE INDEX statement of an index, or None if it does not exist."""
+    return conn.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND indexname = :name"
+    ), {"name": INDEX_NAME}).scalar_one_or_none()
+
+def migrate_keyset_index():
+    """
+    Main migration function; safe to run more than once.
+    """
+    print(f"Checking {INDEX_NAME}...")
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    engine = create_engine(DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        definition = current_definition(conn)
+        if definition is not None and definition.endswith(f"USING btree {KEYSET_COLUMNS}"):
+            print(f"✓ {INDEX_NAME} already covers {KEYSET_COLUMNS}, nothing to do")
+            return
+
+        # A failed earlier run may have left an invalid index behind
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {BUILD_NAME}"))
+
+        print(f"Building {BUILD_NAME} on documents {KEYSET_COLUMNS}...")
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY {BUILD_NAME} ON documents {KEYSET_COLUMNS}"))
+
+        if definition is not None:
+            print(f"Dropping old {INDEX_NAME}...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+
+        conn.execute(text(f"ALTER INDEX {BUILD_NAME} RENAME TO {INDEX_NAME}"))
+        print(f"✅ {INDEX_NAME} now covers {KEYSET_COLUMNS}")
+
+if __name__ == "__main__":
+    migrate_keyset_index()
@@ -0,0 +1,37 @@
+"""Helpers for tests that run against the configured Postgres (skipped without one)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database import ASYNC_DATABASE_URL, Base
+
+
+class InlineWorkers:
+    """Runs parses and transforms in the calling thread."""
+
+    processes = None
+
+    async def run_parse(self, fn, *args, executor=None, size=0, **kwargs):
+        return fn(*args, **kwargs)
+
+    async def run_transform(self, fn, *args, size=0, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def run_with_database(scenario):
+    """Run scenario(session_factory) against the configured Postgres, or skip without one."""
+    async def run():
+        engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+        try:
+            try:
+                async with engine.begin() as connection:
+                    await connection.run_sync(Base.metadata.create_all)
+            except Exception as e:
+                pytest.skip(f"no database: {e}")
+            await scenario(async_sessionmaker(engine, autoflush=False, expire_on_commit=False))
+        finally:
+            await engine.dispose()
+    asyncio.run(run())
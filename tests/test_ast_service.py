@@ -0,0 +1,351 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ast_service import ASTService
+
+SAMPLE_MARKDOWN = """# Chapter 1
+
+Intro paragraph with a few words.
+
+- first item
+- second item
+
+```python
+print("hello")
+```
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+> quoted text
+
+Closing paragraph.
+"""
+
+ast_service = ASTService()
+
+
+def strip_ids(node):
+    """Drop fields that legitimately differ between two parses."""
+    if isinstance(node, dict):
+        return {k: strip_ids(v) for k, v in node.items() if k != "id"}
+    if isinstance(node, list):
+        return [strip_ids(item) for item in node]
+    return node
+
+
+def collect_ids(node):
+    ids = [node["id"]] if "id" in node else []
+    for child in node.get("children", []):
+        ids.extend(collect_ids(child))
+    return ids
+
+
+def test_incremental_reparse_matches_full_parse():
+    """Splicing re-parsed blocks must give the same tree as a full parse."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    edits = [
+        SAMPLE_MARKDOWN.replace("Intro paragraph", "Intro paragraph, now longer,"),
+        SAMPLE_MARKDOWN.replace("- second item\n", "- second item\n- third item\n"),
+        SAMPLE_MARKDOWN.replace("> quoted text\n\n", ""),
+        SAMPLE_MARKDOWN.replace("```python", "```python\n# unterminated\n```\n\n```"),
+        SAMPLE_MARKDOWN.replace("# Chapter 1\n", "# Chapter 1\n\nNew first paragraph.\n"),
+    ]
+
+    for new_markdown in edits:
+        incremental = ast_service.reparse_markdown_incremental(ast, SAMPLE_MARKDOWN, new_markdown)
+        full = ast_service.parse_markdown_to_ast(new_markdown)
+        assert strip_ids(ast_service.resolve_positions(incremental)) == strip_ids(full)
+
+    # The same input AST serves every edit: the re-parse must not modify it
+    assert ast == ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+
+
+def test_incremental_reparse_sees_edits_before_the_first_block():
+    """Lines above the first block are re-parsed along with it."""
+    cases = [
+        ("\n\n" + SAMPLE_MARKDOWN, "# Added\n\n" + SAMPLE_MARKDOWN),
+        ("\n\n" + SAMPLE_MARKDOWN, "\nNew paragraph.\n" + SAMPLE_MARKDOWN),
+        ("[ref]: http://example.com\n\n" + SAMPLE_MARKDOWN, "# Added\n[ref]: http://example.com\n\n" + SAMPLE_MARKDOWN),
+    ]
+
+    for old_markdown, new_markdown in cases:
+        ast = ast_service.parse_markdown_to_ast(old_markdown)
+        incremental = ast_service.reparse_markdown_incremental(ast, old_markdown, new_markdown)
+        full = ast_service.parse_markdown_to_ast(new_markdown)
+        assert strip_ids(ast_service.resolve_positions(incremental)) == strip_ids(full)
+
+
+def test_incremental_reparse_queues_line_shifts():
+    """Nodes after the edit are shared with the old AST; chained re-parses apply their pending shifts."""
+    markdown = SAMPLE_MARKDOWN + "\nTail one.\n\nTail two.\n"
+    ast = ast_service.parse_markdown_to_ast(markdown)
+    edits = [
+        ("Intro paragraph", "Intro\n\nparagraph"),
+        ("> quoted text", "> quoted\n> text"),
+        ("- first item\n", ""),
+    ]
+
+    for old, new in edits:
+        new_markdown = markdown.replace(old, new)
+        updated = ast_service.reparse_markdown_incremental(ast, markdown, new_markdown)
+        assert updated["children"][-1] is ast["children"][-1]
+        assert strip_ids(ast_service.resolve_positions(updated)) == \
+            strip_ids(ast_service.parse_markdown_to_ast(new_markdown))
+        ast, markdown = updated, new_markdown
+
+    assert len(ast["lineShifts"]) == 3
+
+
+def test_incremental_reparse_keeps_untouched_ids():
+    """Nodes outside the edited blocks keep their IDs."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    quote_id = ast["children"][-2]["id"]
+    closing_id = ast["children"][-1]["id"]
+
+    new_markdown = SAMPLE_MARKDOWN.replace("Intro paragraph", "Edited intro paragraph")
+    updated = ast_service.reparse_markdown_incremental(ast, SAMPLE_MARKDOWN, new_markdown)
+
+    assert updated["children"][-2]["id"] == quote_id
+    assert updated["children"][-1]["id"] == closing_id
+    assert len(set(collect_ids(updated))) == len(collect_ids(updated))
+
+
+def test_incremental_reparse_falls_back_on_stale_source():
+    """An AST that no longer matches the stored markdown is fully re-parsed."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    new_markdown = SAMPLE_MARKDOWN + "\nAppended paragraph.\n"
+
+    updated = ast_service.reparse_markdown_incremental(ast, "# Something else\n", new_markdown)
+
+    assert strip_ids(updated) == strip_ids(ast_service.parse_markdown_to_ast(new_markdown))
+
+
+def test_incremental_reparse_on_worker_processes():
+    """Parsing the region in a worker process gives the same tree, IDs included."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    edits = [
+        SAMPLE_MARKDOWN.replace("Intro paragraph", "Intro paragraph, now longer,"),
+        SAMPLE_MARKDOWN.replace("```python", "```python\n# unterminated\n```\n\n```"),
+    ]
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        for new_markdown in edits:
+            remote = ast_service.reparse_markdown_incremental(ast, SAMPLE_MARKDOWN, new_markdown, executor=executor)
+            local = ast_service.reparse_markdown_incremental(ast, SAMPLE_MARKDOWN, new_markdown)
+            assert remote == local
+
+
+def test_parallel_parse_matches_serial_parse(monkeypatch):
+    """Chunked parsing must produce the same tree as a single serial parse."""
+    import services.ast_service as ast_module
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(ast_module, "PARALLEL_PARSE_THRESHOLD", 0)
+    monkeypatch.setattr(ast_module, "PARSE_CHUNK_SIZE", 64)
+    markdown = (SAMPLE_MARKDOWN + "\n") * 20
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = ast_service.parse_markdown_to_ast_parallel(markdown, executor=executor)
+    serial = ast_service.parse_markdown_to_ast(markdown)
+
+    assert len(ast_service._chunk_boundaries(ast_service._split_lines(markdown), 64)) > 1
+    assert parallel == serial
+
+
+def test_node_ids_are_deterministic_and_unique():
+    """Re-parsing unchanged markdown yields the same IDs, even for repeated content."""
+    service = ASTService(cache=None)
+    markdown = SAMPLE_MARKDOWN + "\n---\n\n---\n\nClosing paragraph.\n"
+
+    first = service.parse_markdown_to_ast(markdown)
+    second = service.parse_markdown_to_ast(markdown)
+
+    assert collect_ids(first) == collect_ids(second)
+    assert len(set(collect_ids(first))) == len(collect_ids(first))
+
+
+def test_node_ids_survive_unrelated_edits():
+    """Inserting a block does not change the IDs of other blocks."""
+    service = ASTService(cache=None)
+    before = service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    after = service.parse_markdown_to_ast("New opening paragraph.\n\n" + SAMPLE_MARKDOWN)
+
+    assert collect_ids(after)[-len(collect_ids(before)):] == collect_ids(before)
+
+
+def test_parse_cache_hits_memory_and_disk(tmp_path):
+    """Repeated parses are served from the cache, including after a restart."""
+    from services.parse_cache import ParseCache
+
+    service = ASTService(cache=ParseCache(directory=str(tmp_path)))
+    first = service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    second = service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+
+    assert second == first
+    assert second is not first
+    assert service.cache.get_stats()["hits"] == 1
+    assert service.cache.get_stats()["misses"] == 1
+
+    restarted = ASTService(cache=ParseCache(directory=str(tmp_path)))
+    assert restarted.parse_markdown_to_ast(SAMPLE_MARKDOWN) == first
+    assert restarted.cache.get_stats()["diskHits"] == 1
+
+
+def test_parse_cache_evicts_to_memory_budget():
+    """The in-memory tier stays within its byte budget."""
+    from services.parse_cache import ParseCache
+
+    cache = ParseCache(max_bytes=4096, directory=None)
+    service = ASTService(cache=cache)
+    for i in range(20):
+        service.parse_markdown_to_ast(f"# Document {i}\n\n{SAMPLE_MARKDOWN}")
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 4096
+    assert stats["evictions"] > 0
+
+
+def test_node_metadata_aggregates_subtree_counts():
+    """Every node records its subtree word and node counts."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    list_node = ast["children"][2]
+
+    assert list_node["type"] == "list"
+    assert list_node["metadata"] == {"wordCount": 4, "nodeCount": 5}
+    assert sum(node["metadata"]["nodeCount"] for node in ast["children"]) == ast["metadata"]["nodeCount"]
+    assert sum(node["metadata"]["wordCount"] for node in ast["children"]) == ast["metadata"]["wordCount"]
+
+
+def test_update_node_shares_untouched_subtrees():
+    """Updates copy only the edited path and leave the old version intact."""
+    import json
+
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    snapshot = json.dumps(ast, sort_keys=True)
+    item = ast["children"][2]["children"][1]["children"][0]
+
+    updated = ast_service.update_ast_node(ast, item["id"], "update", {"content": "second item, with more words"})
+
+    assert json.dumps(ast, sort_keys=True) == snapshot
+    assert ast_service.find_node_by_id(updated, item["id"])["content"] == "second item, with more words"
+    assert updated["children"][2] is not ast["children"][2]
+    assert updated["children"][2]["children"][0] is ast["children"][2]["children"][0]
+    assert all(updated["children"][i] is ast["children"][i] for i in range(len(ast["children"])) if i != 2)
+
+    expected = ast_service.parse_markdown_to_ast(
+        SAMPLE_MARKDOWN.replace("- second item", "- second item, with more words")
+    )
+    assert updated["metadata"] == expected["metadata"]
+    assert updated["children"][2]["metadata"] == expected["children"][2]["metadata"]
+
+
+def test_structural_operations_keep_metadata_and_positions():
+    """Insert, delete and move adjust counts by delta and shift later lines."""
+    import json
+
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    snapshot = json.dumps(ast, sort_keys=True)
+    intro, closing = ast["children"][1], ast["children"][-1]
+
+    def check(updated, expected_markdown, unpositioned=None):
+        expected = ast_service.parse_markdown_to_ast(expected_markdown)
+        resolved = ast_service.resolve_positions(updated)
+        assert "lineShifts" not in resolved
+        assert updated["metadata"] == expected["metadata"]
+        assert [child["metadata"] for child in updated["children"]] == \
+            [child["metadata"] for child in expected["children"]]
+        # Moved and inserted nodes get their positions back on the next parse
+        for i, (child, expected_child) in enumerate(zip(resolved["children"], expected["children"])):
+            assert child.get("position") == (None if i == unpositioned else expected_child.get("position"))
+
+    deleted = ast_service.update_ast_node(ast, intro["id"], "delete", {})
+    assert ast_service.find_node_by_id(deleted, intro["id"]) is None
+    check(deleted, SAMPLE_MARKDOWN.replace("Intro paragraph with a few words.\n\n", ""))
+
+    inserted = ast_service.update_ast_node(ast, intro["id"], "insert", {
+        "position": "after",
+        "node": {"id": "new", "type": "paragraph", "content": "Inserted paragraph"}
+    })
+    assert inserted["children"][2]["id"] == "new"
+    check(inserted, SAMPLE_MARKDOWN.replace("words.\n\n", "words.\n\nInserted paragraph\n\n"), 2)
+
+    moved = ast_service.update_ast_node(ast, closing["id"], "move", {"target_id": intro["id"], "position": "before"})
+    assert moved["children"][1]["id"] == closing["id"]
+    check(moved, SAMPLE_MARKDOWN.replace("\nClosing paragraph.\n", "").replace(
+        "# Chapter 1\n\n", "# Chapter 1\n\nClosing paragraph.\n\n"), 1)
+
+    assert json.dumps(ast, sort_keys=True) == snapshot
+
+
+def test_move_rejects_own_subtree():
+    """A node cannot be moved next to one of its own descendants."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    list_node = ast["children"][2]
+    item = list_node["children"][0]
+
+    try:
+        ast_service.update_ast_node(ast, list_node["id"], "move", {"target_id": item["id"]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("moving a node into itself should fail")
+
+
+def test_sections_nest_under_headings():
+    """Sections span their subsections and carry precomputed counts."""
+    markdown = "# One\n\nA b.\n\n## One.1\n\nC d e.\n\n## One.2\n\nF.\n\n# Two\n\nG h.\n"
+    ast = ast_service.parse_markdown_to_ast(markdown)
+    sections = ast["sections"]
+
+    assert [(s["title"], s["start"], s["end"], s["parent"]) for s in sections] == [
+        ("One", 0, 6, None), ("One.1", 2, 4, 0), ("One.2", 4, 6, 0), ("Two", 6, 8, None)
+    ]
+    assert sections[0]["nodeCount"] == 6
+    assert sections[0]["wordCount"] == 11
+
+    chapter = ast["children"][0]["id"]
+    assert ast_service.get_section(ast, chapter) is sections[0]
+    assert ast_service.get_section_nodes(ast, chapter) == ast["children"][0:6]
+    assert ast_service.get_section(ast, ast["children"][1]["id"]) is None
+
+    updated = ast_service.update_ast_node(ast, ast["children"][3]["id"], "delete", {})
+    assert updated["sections"] == ast_service.build_sections(updated)
+    assert updated["sections"][0]["end"] == 5
+
+
+def test_node_edits_update_sections_in_place():
+    """Edits adjust the sections they touch and shift later spans instead of rebuilding them."""
+    markdown = "# One\n\nA b.\n\n## One.1\n\n- c d\n- e\n\n## One.2\n\nF.\n\n# Two\n\nG h.\n"
+    ast = ast_service.parse_markdown_to_ast(markdown)
+    one, paragraph, sub, items = (ast["children"][i] for i in range(4))
+    item = items["children"][0]["id"]
+    edits = [
+        (one["id"], "update", {"content": "First chapter"}),
+        (item, "update", {"content": "c d more words"}),
+        (paragraph["id"], "insert", {"node": {"type": "paragraph", "content": "New text"}, "position": "after"}),
+        (item, "move", {"target_id": paragraph["id"], "position": "before"}),
+        (items["id"], "delete", {}),
+        (paragraph["id"], "move", {"target_id": ast["children"][-1]["id"], "position": "after"}),
+        (sub["id"], "delete", {}),
+    ]
+
+    for node_id, operation, data in edits:
+        sections = [dict(section) for section in ast["sections"]]
+        updated = ast_service.update_ast_node(ast, node_id, operation, data)
+        assert updated["sections"] == ast_service.build_sections(updated)
+        assert ast["sections"] == sections
+        ast = updated
+
+    assert ast["sections"][0]["title"] == "First chapter"
+
+    # A word count change leaves sections that do not contain the node shared
+    updated = ast_service.update_ast_node(ast, ast["children"][-1]["id"], "update", {"content": "A b c."})
+    assert updated["sections"][0] is ast["sections"][0]
+    assert updated["sections"][-1]["wordCount"] == ast["sections"][-1]["wordCount"] + 1
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.block_index import BlockIndex
+
+BLOCKS = [
+    {"id": f"b{i}", "type": "heading" if i % 5 == 0 else "paragraph"}
+    for i in range(20)
+]
+
+
+def ids(blocks):
+    return [block["id"] for block in blocks]
+
+
+def test_window_by_offset_and_anchor():
+    index = BlockIndex(BLOCKS)
+
+    blocks, total, offset = index.window(offset=18, limit=5)
+    assert (ids(blocks), total, offset) == (["b18", "b19"], 20, 18)
+
+    blocks, total, offset = index.window(anchor="b1", before=3, after=2)
+    assert (ids(blocks), offset) == (["b0", "b1", "b2", "b3"], 0)
+
+
+def test_window_filters_types():
+    index = BlockIndex(BLOCKS)
+
+    blocks, total, offset = index.window(offset=1, limit=2, types=["heading"])
+    assert (ids(blocks), total, offset) == (["b5", "b10"], 4, 1)
+
+    # An anchor of another type is placed among the matching blocks
+    blocks, _, offset = index.window(anchor="b7", before=1, after=1, types=["heading"])
+    assert (ids(blocks), offset) == (["b5", "b10", "b15"], 1)
+
+    try:
+        index.window(anchor="missing")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unknown anchors should raise KeyError")
+
+
+def test_iter_blocks_streams_flattened_blocks():
+    """Lazily generated blocks match the flattened list, line shifts applied."""
+    from services.document_service import DocumentService
+
+    service = DocumentService()
+    ast = service.ast_service.parse_markdown_to_ast("# A\n\nOne.\n\n- x\n  - y\n\n```py\nz\n```\n\nEnd.\n")
+    edited = service.ast_service.update_ast_node(ast, ast["children"][1]["id"], "delete", {})
+    assert edited.get("lineShifts")
+
+    blocks = service.iter_blocks(edited)
+    first = next(blocks)
+    assert first["id"] == edited["children"][0]["id"]
+    assert [first] + list(blocks) == service.flatten_ast_to_blocks(edited)
+    assert service.flatten_ast_to_blocks(edited)[-1]["position"]["line"] < ast["children"][-1]["position"]["line"]
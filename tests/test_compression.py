@@ -0,0 +1,102 @@
+import sys
+import os
+import gzip
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services.compression import CompressedResponseCache, CompressionMiddleware, negotiate, uncompressed
+
+LINES = [b'{"id": "node_%d", "content": "Some paragraph text"}\n' % i for i in range(2000)]
+
+
+def make_client(cache):
+    async def stream(request):
+        async def body():
+            for i in range(0, len(LINES), 100):
+                yield b"".join(LINES[i:i + 100])
+        return StreamingResponse(body(), media_type="application/x-ndjson", headers={"ETag": '"42"'})
+
+    @uncompressed
+    async def raw(request):
+        return JSONResponse({"text": "x" * 5000})
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def echo(request):
+        return JSONResponse({"tags": request.headers.get("if-none-match")})
+
+    async def not_modified(request):
+        return Response(status_code=304, headers={"ETag": '"42"'})
+
+    app = Starlette(routes=[
+        Route("/stream", stream), Route("/raw", raw), Route("/small", small), Route("/echo", echo),
+        Route("/not-modified", not_modified)
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=512, cache=cache)
+    return TestClient(app)
+
+
+def test_negotiate_prefers_brotli_by_weight():
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate("br;q=0, gzip") == "gzip"
+    assert negotiate("*") == "br"
+    assert negotiate("identity") is None
+    assert negotiate("") is None
+
+
+def test_streamed_responses_are_compressed_once_per_etag():
+    """Streams are compressed chunk by chunk, tagged per encoding and replayed from the cache."""
+    cache = CompressedResponseCache()
+    client = make_client(cache)
+
+    for encoding in ("gzip", "br", "gzip"):
+        response = client.get("/stream", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["etag"] == f'"42-{encoding}"'
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.content == b"".join(LINES)
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_if_none_match_loses_the_encoding_suffix():
+    """The application compares If-None-Match against its own, unsuffixed ETags."""
+    client = make_client(CompressedResponseCache())
+    response = client.get("/echo", headers={"If-None-Match": 'W/"1", "42-br", "7-gzip"'})
+    assert response.json() == {"tags": 'W/"1","42","7"'}
+
+
+def test_small_and_opted_out_responses_are_sent_as_is():
+    client = make_client(CompressedResponseCache())
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    raw = client.get("/raw", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in raw.headers
+    assert "vary" not in raw.headers
+    assert raw.json() == {"text": "x" * 5000}
+
+
+def test_gzip_stream_is_a_valid_gzip_file():
+    client = make_client(CompressedResponseCache())
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        compressed = b"".join(response.iter_raw())
+    assert gzip.decompress(compressed) == b"".join(LINES)
+
+
+def test_not_modified_echoes_the_tag_the_client_holds():
+    """A 304 names the compressed representation only if the client revalidated that one."""
+    client = make_client(CompressedResponseCache())
+    compressed = client.get("/not-modified", headers={"Accept-Encoding": "br", "If-None-Match": '"42-br"'})
+    plain = client.get("/not-modified", headers={"Accept-Encoding": "br", "If-None-Match": '"42"'})
+    assert (compressed.status_code, compressed.headers["etag"]) == (304, '"42-br"')
+    assert (plain.status_code, plain.headers["etag"]) == (304, '"42"')
@@ -0,0 +1,85 @@
+import sys
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main_ast
+from database import get_async_db
+from main_ast import IMMUTABLE_CACHE_CONTROL, etag_matches, tag_version, version_headers, version_tag
+
+V1 = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+V2 = datetime(2024, 5, 1, 12, 31, 0, 1, tzinfo=timezone.utc)
+STATS = {"wordCount": 3}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """API client whose document sits at V1 when checked but is read at the version in state["read"]."""
+    state = {"read": V1}
+
+    async def get_version(db, document_id):
+        return V1
+
+    async def get_document_view(db, document_id, name):
+        return STATS, state["read"]
+
+    monkeypatch.setattr(main_ast.document_service, "get_version", get_version)
+    monkeypatch.setattr(main_ast.document_service, "get_document_view", get_document_view)
+    main_ast.app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(main_ast.app), state
+    main_ast.app.dependency_overrides.pop(get_async_db)
+
+
+def test_version_tags_round_trip():
+    assert version_tag(V1) == "1714566615123456"
+    assert tag_version(version_tag(V1)) == V1
+
+
+def test_etag_matches_weak_lists_and_star():
+    assert etag_matches('"1"', '"1"')
+    assert etag_matches('W/"1"', '"1"')
+    assert etag_matches('"0", W/"1" ,"2"', '"1"')
+    assert etag_matches("*", '"1"')
+    assert not etag_matches('"12"', '"1"')
+    assert not etag_matches(None, '"1"')
+    assert not etag_matches("", '"1"')
+
+
+def test_version_headers_pin_versions():
+    assert version_headers(V1) == {"ETag": f'"{version_tag(V1)}"', "Cache-Control": "no-cache"}
+    assert version_headers(V1, version_tag(V1))["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    with pytest.raises(HTTPException) as error:
+        version_headers(V2, version_tag(V1))
+    assert error.value.status_code == 404
+
+
+def test_if_none_match_round_trip(client):
+    api, _ = client
+    response = api.get("/documents/doc/stats")
+    assert response.status_code == 200
+    assert response.json() == STATS
+
+    etag = response.headers["etag"]
+    not_modified = api.get("/documents/doc/stats", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    assert api.get("/documents/doc/stats", params={"v": "1"}).status_code == 404
+
+
+def test_responses_are_tagged_with_the_version_read(client):
+    """A write between the version check and the read must not pair the checked tag with the newer body."""
+    api, state = client
+    state["read"] = V2
+
+    response = api.get("/documents/doc/stats")
+    assert response.headers["etag"] == f'"{version_tag(V2)}"'
+    assert api.get("/documents/doc/stats", params={"v": version_tag(V1)}).status_code == 404
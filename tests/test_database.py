@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+import asyncio
+import subprocess
+
+# Add backend to path
+BACKEND = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.append(BACKEND)
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+
+
+def engine_settings(**env):
+    """Import database in a fresh interpreter with env and report its engine settings."""
+    script = (
+        "import json, database\n"
+        "pool = database.async_engine.pool\n"
+        "print(json.dumps({'url': database.ASYNC_DATABASE_URL, 'driver': database.async_engine.dialect.driver,"
+        " 'size': pool.size(), 'overflow': pool._max_overflow, 'timeout': pool._timeout,"
+        " 'recycle': pool._recycle, 'pre_ping': pool._pre_ping}))\n"
+    )
+    environment = {key: value for key, value in os.environ.items()
+                   if not key.startswith("DB_POOL_") and key not in ("DB_MAX_OVERFLOW", "ASYNC_DATABASE_URL")}
+    environment.update(env)
+    output = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def test_async_url_follows_database_url():
+    settings = engine_settings(DATABASE_URL="postgresql://user:secret@db:5432/docs")
+    assert settings["url"] == "postgresql+asyncpg://user:secret@db:5432/docs"
+    assert settings["driver"] == "asyncpg"
+
+    settings = engine_settings(DATABASE_URL="postgresql+psycopg2://user@db/docs")
+    assert settings["url"] == "postgresql+asyncpg://user@db/docs"
+
+    settings = engine_settings(DATABASE_URL="postgresql://user@db/docs",
+                               ASYNC_DATABASE_URL="postgresql+asyncpg://other@replica/docs")
+    assert settings["url"] == "postgresql+asyncpg://other@replica/docs"
+
+
+def test_pool_settings_come_from_the_environment():
+    settings = engine_settings(DATABASE_URL="postgresql://user@db/docs", DB_POOL_SIZE="3", DB_MAX_OVERFLOW="4",
+                               DB_POOL_TIMEOUT="5", DB_POOL_RECYCLE="60", DB_POOL_PRE_PING="false")
+    pool = {key: settings[key] for key in ("size", "overflow", "timeout", "recycle", "pre_ping")}
+    assert pool == {"size": 3, "overflow": 4, "timeout": 5, "recycle": 60, "pre_ping": False}
+
+    assert engine_settings(DATABASE_URL="postgresql://user@db/docs")["pre_ping"] is True
+
+
+def test_get_async_db_yields_a_session_and_closes_it(monkeypatch):
+    """The dependency hands out one AsyncSession per request and closes it afterwards."""
+    closed = []
+    monkeypatch.setattr(AsyncSession, "close", lambda self: asyncio.sleep(0, closed.append(self)))
+
+    async def request():
+        dependency = database.get_async_db()
+        db = await dependency.__anext__()
+        assert isinstance(db, AsyncSession)
+        assert not db.sync_session.autoflush
+        assert not db.sync_session.expire_on_commit
+        await dependency.aclose()
+        return db
+
+    assert closed == [asyncio.run(request())]
@@ -0,0 +1,93 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ast_service import ASTService
+from services.document_cache import DocumentCache, deep_size
+
+V1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+V2 = V1 + timedelta(seconds=1)
+
+
+def fields(i):
+    ast = ASTService(cache=None).parse_markdown_to_ast(f"# Document {i}\n\nSome words here.\n")
+    return {"id": f"doc-{i}", "title": f"Document {i}", "content_ast": ast}
+
+
+def test_deep_size_counts_shared_subtrees_once():
+    ast = fields(0)["content_ast"]
+    assert deep_size({"a": ast, "b": ast}) < 2 * deep_size(ast)
+
+
+def test_document_cache_evicts_to_budget():
+    """Least recently used documents are evicted to stay within the byte budget."""
+    budget = 3 * deep_size(fields(0))
+    cache = DocumentCache(max_bytes=budget)
+    for i in range(10):
+        assert cache.put(f"doc-{i}", V1, fields(i), cache.token())
+        cache.get("doc-0")
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= budget
+    assert stats["evictions"] > 0
+    assert cache.get("doc-0") is not None
+    assert cache.get("doc-1") is None
+
+
+def test_document_cache_drops_stale_fills_and_views():
+    """Fills racing an invalidation and views of older versions are not served."""
+    cache = DocumentCache()
+    token = cache.token()
+    cache.invalidate("doc-1")
+    assert not cache.put("doc-1", V1, fields(1), token)
+    assert cache.get("doc-1") is None
+
+    assert cache.put("doc-1", V2, fields(1), cache.token())
+    assert not cache.put("doc-1", V1, fields(1), cache.token())
+    cache.put_view("doc-1", V2, "outline", [{"id": "x"}])
+    assert cache.get_view("doc-1", V2, "outline") == [{"id": "x"}]
+    assert cache.get_view("doc-1", V1, "outline") is None
+
+    cache.invalidate("doc-1", V1)
+    assert cache.get("doc-1") is not None
+    cache.invalidate("doc-1")
+    assert cache.get("doc-1") is None
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_change_notifications_evict_older_versions():
+    """A NOTIFY payload evicts cached versions older than the one it announces."""
+    from services.cache_invalidation import DocumentChangeListener
+
+    cache = DocumentCache()
+    listener = DocumentChangeListener(cache=cache, url="postgresql+asyncpg://postgres@localhost/test")
+    cache.put("doc-1", V2, fields(1), cache.token())
+
+    listener._on_notification(None, 0, "document_changes", f"doc-1 {V1.isoformat()}")
+    assert cache.get("doc-1") is not None
+    listener._on_notification(None, 0, "document_changes", f"doc-1 {(V2 + timedelta(seconds=1)).isoformat()}")
+    assert cache.get("doc-1") is None
+
+
+def test_change_notifications_send_the_stored_version():
+    """The version sent is read from the flushed row, not the transaction timestamp."""
+    import asyncio
+    from services.cache_invalidation import notify_document_changed
+
+    calls = []
+
+    class RecordingSession:
+        async def flush(self):
+            calls.append("flush")
+
+        async def execute(self, statement, params):
+            calls.append(str(statement))
+
+    asyncio.run(notify_document_changed(RecordingSession(), "doc-1"))
+
+    assert calls[0] == "flush"
+    assert "to_json(updated_at)" in calls[1]
+    assert "now()" not in calls[1]
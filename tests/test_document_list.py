@@ -0,0 +1,127 @@
+import sys
+import os
+import asyncio
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+import main_ast
+from database import Document, get_async_db
+from services.document_service import DocumentService
+
+V1 = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def summary(i):
+    return Document(
+        id=uuid.UUID(int=i), title=f"Document {i}", doc_metadata={"wordCount": i},
+        created_at=V1, updated_at=V1 - timedelta(minutes=i)
+    )
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ListSession:
+    """Returns the rows of a newest-first listing after the cursor, up to the query's limit."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        rows = self.rows
+        cutoff = statement.whereclause
+        if cutoff is not None:
+            after = cutoff.right.clauses
+            key = (after[0].value, after[1].value)
+            rows = [row for row in rows if (row.updated_at, row.id) < key]
+        return FakeResult(rows[:statement._limit])
+
+
+@pytest.fixture
+def client():
+    main_ast.app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(main_ast.app)
+    main_ast.app.dependency_overrides.pop(get_async_db)
+
+
+def test_cursor_round_trip():
+    service = DocumentService()
+    document = summary(3)
+
+    cursor = service._encode_cursor(document)
+    assert service._decode_cursor(cursor) == (document.updated_at, document.id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"no separator").decode("ascii"),
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.UUID(int=1)).encode("ascii")).decode("ascii"),
+    base64.urlsafe_b64encode(f"{V1.isoformat()}|not-a-uuid".encode("ascii")).decode("ascii"),
+    base64.urlsafe_b64encode(b"\xff\xfe|x").decode("ascii"),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        DocumentService()._decode_cursor(cursor)
+
+
+def test_summaries_page_by_keyset():
+    """Pages follow each other without gaps or repeats; the last one has no cursor."""
+    service = DocumentService()
+    db = ListSession([summary(i) for i in range(5)])
+
+    pages = []
+    cursor = None
+    while True:
+        documents, cursor = asyncio.run(service.list_document_summaries(db, 2, cursor))
+        pages.append([document.id.int for document in documents])
+        if cursor is None:
+            break
+
+    assert pages == [[0, 1], [2, 3], [4]]
+    assert all(statement._limit == 3 for statement in db.statements)
+
+
+def test_list_endpoint_returns_summaries_and_next_cursor(client, monkeypatch):
+    calls = []
+
+    async def list_document_summaries(db, limit, cursor):
+        calls.append((limit, cursor))
+        return [summary(1)], "next-page"
+
+    monkeypatch.setattr(main_ast.document_service, "list_document_summaries", list_document_summaries)
+
+    response = client.get("/documents", params={"limit": 1, "cursor": "this-page"})
+    assert response.status_code == 200
+    assert response.headers["x-next-cursor"] == "next-page"
+    assert response.json() == [{
+        "id": str(uuid.UUID(int=1)),
+        "title": "Document 1",
+        "metadata": {"wordCount": 1},
+        "created_at": V1.isoformat(),
+        "updated_at": (V1 - timedelta(minutes=1)).isoformat()
+    }]
+    assert calls == [(1, "this-page")]
+
+
+def test_list_endpoint_rejects_bad_or_mixed_paging(client):
+    assert client.get("/documents", params={"cursor": "not base64!"}).status_code == 400
+    assert client.get("/documents", params={"skip": 10}).status_code == 400
+    assert client.get("/documents", params={"view": "full", "cursor": "abc"}).status_code == 400
@@ -0,0 +1,161 @@
+import sys
+import os
+import re
+import json
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ast_service import ASTService
+from services.document_storage import DocumentStorage
+from services.document_service import DocumentService
+
+ast_service = ASTService(cache=None)
+
+
+def chunked(markdown, storage):
+    """Parse markdown and attach the manifest a full write would record."""
+    ast = ast_service.parse_markdown_to_ast(markdown)
+    children = ast["children"]
+    sizes = [storage._size(node) for node in children]
+    ast["chunks"] = [
+        {"ordinal": ordinal, "count": end - start, "bytes": sum(sizes[start:end])}
+        for ordinal, (start, end) in enumerate(storage._split(children, sizes))
+    ]
+    return ast
+
+
+def sections_markdown(count):
+    return "".join(f"# Section {i}\n\nSome text for section {i}.\n\n" for i in range(count))
+
+
+def test_split_prefers_heading_boundaries():
+    """Chunks start at headings once they reach the target size."""
+    storage = DocumentStorage(threshold=0, chunk_bytes=200)
+    ast = chunked(sections_markdown(20), storage)
+
+    offset = 0
+    for chunk in ast["chunks"]:
+        assert ast["children"][offset]["type"] == "heading"
+        offset += chunk["count"]
+    assert offset == len(ast["children"])
+    assert len(ast["chunks"]) > 1
+
+
+def test_plan_rewrites_only_touched_chunks():
+    """Node edits map onto the chunks that hold the edited nodes."""
+    storage = DocumentStorage(threshold=0, chunk_bytes=200)
+    ast = chunked(sections_markdown(20), storage)
+    children = ast["children"]
+
+    def plan(updated):
+        result = storage._plan(children, ast["chunks"], updated["children"])
+        rebuilt = [node for _, start, end, _ in result for node in updated["children"][start:end]]
+        assert rebuilt == updated["children"]
+        return [chunk["ordinal"] for chunk, _, _, changed in result if changed]
+
+    paragraph = children[len(children) // 2 + 1]
+    unchanged = storage._plan(children, ast["chunks"], children)
+    assert not any(changed for *_, changed in unchanged)
+
+    updated = ast_service.update_ast_node(ast, paragraph["id"], "update", {"content": "changed"})
+    assert len(plan(updated)) == 1
+
+    inserted = ast_service.update_ast_node(ast, paragraph["id"], "insert", {"node": {"content": "new"}})
+    assert plan(inserted) == plan(updated)
+
+    moved = ast_service.update_ast_node(ast, children[-1]["id"], "move", {"target_id": children[0]["id"]})
+    assert len(plan(moved)) == 2
+
+
+def test_plan_keeps_chunks_shifted_by_a_reparse():
+    """Nodes after a re-parsed edit keep their identity, so only the edited chunk is rewritten."""
+    storage = DocumentStorage(threshold=0, chunk_bytes=200)
+    markdown = sections_markdown(20)
+    ast = chunked(markdown, storage)
+    before = [dict(node["position"]) for node in ast["children"]]
+
+    reparsed = ast_service.reparse_markdown_incremental(ast, markdown, "Inserted line.\n\n" + markdown)
+    result = storage._plan(ast["children"], ast["chunks"], reparsed["children"])
+
+    assert [chunk["ordinal"] for chunk, _, _, changed in result if changed] == [0]
+    assert [node["position"] for node in ast["children"]] == before
+    assert reparsed["lineShifts"]
+
+
+class JSONSession:
+    """Answers read_json's statements from a stored row, rendering jsonb as Postgres would (json.dumps)."""
+
+    def __init__(self, content_ast, chunks=None):
+        self.content_ast = content_ast
+        self.chunks = chunks or {}
+
+    async def execute(self, statement, params):
+        sql = str(statement)
+        if "FROM document_chunks" in sql:
+            return SimpleNamespace(scalar=lambda: json.dumps(self.chunks[params["ordinal"]]))
+
+        removed = re.search(r"\(content_ast((?: - '\w+')*)\)::text AS skeleton", sql).group(1)
+        skeleton = {key: value for key, value in self.content_ast.items()
+                    if key not in re.findall(r"'(\w+)'", removed)}
+        chunked = "chunks" in self.content_ast
+        row = SimpleNamespace(
+            title="Doc", raw_markdown="", doc_metadata={}, created_at=None, updated_at=None,
+            skeleton=json.dumps(skeleton), chunks=self.content_ast.get("chunks"),
+            children=None if chunked or "children" not in self.content_ast else json.dumps(self.content_ast["children"])
+        )
+        return SimpleNamespace(first=lambda: row)
+
+
+def read_ast_json(db):
+    async def scenario():
+        _, parts = await DocumentStorage().read_json(db, "doc")
+        return "".join([part async for part in parts])
+    return asyncio.run(scenario())
+
+
+def stored_chunks(ast, counts):
+    """Split ast's children into chunks of the given sizes, as stored."""
+    children = ast["children"]
+    skeleton = {key: value for key, value in ast.items() if key != "children"}
+    skeleton["children"] = []
+    skeleton["chunks"] = [{"ordinal": ordinal, "count": count, "bytes": 0} for ordinal, count in enumerate(counts)]
+    rows, offset = {}, 0
+    for ordinal, count in enumerate(counts):
+        rows[ordinal] = children[offset:offset + count]
+        offset += count
+    return skeleton, rows
+
+
+@pytest.mark.parametrize("counts", [None, [], [3], [1, 0, 2]])
+def test_read_json_matches_the_reassembled_ast(counts):
+    """The streamed text decodes to the AST clients get, without the chunk manifest."""
+    ast = ast_service.parse_markdown_to_ast("# A\n\nOne.\n\nTwo.\n" if counts != [] else "")
+    if counts is None:
+        db = JSONSession(ast)
+    else:
+        db = JSONSession(*stored_chunks(ast, counts))
+
+    # Children are spliced in last
+    reassembled = {key: value for key, value in ast.items() if key != "children"}
+    reassembled["children"] = ast["children"]
+    assert orjson.dumps(orjson.loads(read_ast_json(db))) == orjson.dumps(reassembled)
+
+
+def test_ast_without_children_is_passed_through():
+    ast = {"type": "document", "metadata": {"wordCount": 0}}
+    assert orjson.loads(read_ast_json(JSONSession(ast))) == ast
+
+
+def test_encoded_ast_has_no_chunk_manifest():
+    storage = DocumentStorage()
+    ast = chunked(sections_markdown(3), DocumentStorage(threshold=0, chunk_bytes=200))
+
+    assert "chunks" not in storage.without_manifest(ast)
+    assert "chunks" in ast
+    assert orjson.loads(DocumentService()._encode_ast("doc", None, ast)) == storage.without_manifest(ast)
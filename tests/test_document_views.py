@@ -0,0 +1,124 @@
+import sys
+import os
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy.dialects import postgresql
+
+from database import Document
+from services.document_cache import DocumentCache
+from services.document_service import DocumentService
+from services.document_views import DocumentViews
+
+DOCUMENT_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+V1 = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    """Stands in for an AsyncSession and keeps the SQL of every statement executed."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+
+def test_views_take_the_stored_document_version():
+    """Views written with a document carry the updated_at in its row, not the transaction time."""
+    db = RecordingSession()
+    views = DocumentViews()
+
+    async def scenario():
+        await views.store(db, DOCUMENT_ID, {"stats": {"wordCount": 1}})
+        await views.touch(db, DOCUMENT_ID, None)
+
+    asyncio.run(scenario())
+
+    store, touch = db.statements
+    for statement in (store, touch):
+        assert "SELECT documents.updated_at" in statement
+        assert "now()" not in statement
+    assert "document_views.version < excluded.version" in store
+
+
+class InlineWorkers:
+    """Runs transforms in the calling thread."""
+
+    async def run_transform(self, fn, *args, size=0, **kwargs):
+        return fn(*args, **kwargs)
+
+
+class FakeViews:
+    """In-memory document_views keyed by (name, version)."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.stored = []
+
+    async def load(self, db, document_id, name, version):
+        return self.rows.get((name, version))
+
+    async def store(self, db, document_id, views, version=None):
+        self.stored.append((dict(views), version))
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    async def flush(self):
+        self.calls.append("flush")
+
+    async def commit(self):
+        self.calls.append("commit")
+
+
+def view_service(rows=None):
+    service = DocumentService(workers=InlineWorkers(), cache=DocumentCache())
+    service.views = FakeViews(rows)
+    return service
+
+
+def document():
+    ast = view_service().ast_service.parse_markdown_to_ast("# Title\n\nSome text.\n")
+    return Document(id=DOCUMENT_ID, title="Doc", content_ast=ast, updated_at=V1)
+
+
+def test_current_stored_view_is_reused():
+    stored = [{"id": "stored"}]
+    service = view_service({("blocks", V1): stored})
+    service.view_builders["blocks"] = lambda ast: pytest.fail("a current view was rebuilt")
+
+    assert asyncio.run(service._get_view(FakeSession(), document(), "blocks")) is stored
+    assert service.views.stored == []
+
+
+def test_stale_view_is_rebuilt_and_stored_at_the_document_version():
+    service = view_service({("blocks", datetime(2024, 1, 1, tzinfo=timezone.utc)): [{"id": "old"}]})
+    db = FakeSession()
+    doc = document()
+
+    blocks = asyncio.run(service._get_view(db, doc, "blocks"))
+
+    assert blocks == service.flatten_ast_to_blocks(doc.content_ast)
+    assert service.views.stored == [({"blocks": blocks}, V1)]
+    assert db.calls == ["commit"]
+
+
+def test_writes_leave_blocks_to_the_first_read():
+    service = view_service()
+    db = FakeSession()
+
+    asyncio.run(service._store_views(db, DOCUMENT_ID, document().content_ast))
+
+    (views, version), = service.views.stored
+    assert sorted(views) == ["outline", "stats"]
+    assert version is None
+    assert db.calls == ["flush"]
@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+import main_ast
+from database import Document, get_async_db
+from services.ast_service import ASTService
+
+MARKDOWN = "# Tïtle ✓\n\nSome \"quoted\" text.\n\n- one\n- two\n"
+CREATED = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+UPDATED = datetime(2024, 5, 2, 8, 0, 0, 1, tzinfo=timezone.utc)
+
+
+def document():
+    ast = ASTService(cache=None).parse_markdown_to_ast(MARKDOWN)
+    return Document(
+        id=uuid.UUID(int=7), title="Tïtle ✓", content_ast=ast, raw_markdown=MARKDOWN,
+        doc_metadata=ast["metadata"], created_at=CREATED, updated_at=UPDATED
+    )
+
+
+def validated(model, payload):
+    """What FastAPI's response_model processing would have sent."""
+    return json.loads(model.model_validate(payload).model_dump_json())
+
+
+@pytest.fixture
+def client():
+    main_ast.app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(main_ast.app)
+    main_ast.app.dependency_overrides.pop(get_async_db)
+
+
+def test_orjson_response_matches_the_validated_model(client, monkeypatch):
+    async def update_document(db, document_id, **changes):
+        return document()
+
+    monkeypatch.setattr(main_ast.document_service, "update_document", update_document)
+
+    response = client.put("/documents/doc", json={"title": "Tïtle ✓"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    payload = main_ast.document_response(document())
+    assert response.json() == validated(main_ast.DocumentResponse, payload) == json.loads(json.dumps(payload))
+
+
+def test_summary_adapter_matches_the_validated_models(client, monkeypatch):
+    documents = [document(), Document(id=uuid.UUID(int=8), title="Empty", doc_metadata=None,
+                                      created_at=CREATED, updated_at=UPDATED)]
+
+    async def list_document_summaries(db, limit, cursor):
+        return documents, None
+
+    monkeypatch.setattr(main_ast.document_service, "list_document_summaries", list_document_summaries)
+
+    response = client.get("/documents")
+    assert "x-next-cursor" not in response.headers
+    assert response.json() == [
+        validated(main_ast.DocumentSummary, {
+            "id": str(doc.id), "title": doc.title, "metadata": doc.doc_metadata or {},
+            "created_at": doc.created_at.isoformat(), "updated_at": doc.updated_at.isoformat()
+        })
+        for doc in documents
+    ]
+
+
+def test_streaming_response_matches_the_json_encoding():
+    payload = main_ast.document_response(document())
+    response = main_ast.streaming_json_response(payload, headers={"ETag": '"1"'})
+
+    async def body():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == '"1"'
+    assert json.loads(asyncio.run(body())) == validated(main_ast.DocumentResponse, payload)
+
+
+def test_openapi_schema_still_documents_the_response_models():
+    schema = main_ast.app.openapi()
+    assert {"DocumentResponse", "DocumentSummary", "DocumentBlocksResponse"} <= set(schema["components"]["schemas"])
+
+    def response_schema(path, method):
+        return schema["paths"][path][method]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    document_ref = {"$ref": "#/components/schemas/DocumentResponse"}
+    assert response_schema("/documents/{document_id}", "get") == document_ref
+    assert response_schema("/documents/{document_id}", "put") == document_ref
+    assert response_schema("/documents/{document_id}/blocks", "get") == {
+        "$ref": "#/components/schemas/DocumentBlocksResponse"
+    }
+    listing = json.dumps(response_schema("/documents", "get"))
+    assert "DocumentSummary" in listing and "DocumentResponse" in listing
@@ -0,0 +1,44 @@
+import sys
+import os
+import json
+import asyncio
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ast_service import ASTService
+from services.json_stream import LIST_BATCH_SIZE, RawJSON, iter_json
+
+
+def collect(value, depth, chunk_bytes):
+    async def run():
+        return [chunk async for chunk in iter_json(value, depth, chunk_bytes)]
+    return asyncio.run(run())
+
+
+def test_iter_json_matches_json_in_bounded_chunks():
+    """Streamed output decodes to the payload and no chunk outgrows the largest batch of items."""
+    markdown = "\n\n".join(f"## Section {i}\n\nParagraph {i} with ünïcode ✓ and \"quotes\"." for i in range(200))
+    ast = ASTService(cache=None).parse_markdown_to_ast(markdown)
+    payload = {"document": {"title": "T", "content_ast": ast, "raw_markdown": markdown}, "blocks": [], "empty": {}}
+
+    chunks = collect(payload, 4, 256)
+    largest_batch = LIST_BATCH_SIZE * max(len(json.dumps(node, ensure_ascii=False).encode()) for node in ast["children"])
+    assert json.loads(b"".join(chunks)) == payload
+    assert len(chunks) > 10
+    assert max(len(chunk) for chunk in chunks) < 256 + largest_batch
+
+
+def test_iter_json_splices_raw_parts():
+    async def parts():
+        yield '{"children": ['
+        yield '{"id": "a"}, {"id": "b"}'
+        yield "]}"
+
+    payload = {"id": "x", "content_ast": RawJSON(parts()), "cached": RawJSON(b"[1, 2]"), "items": [RawJSON("3")]}
+    assert json.loads(b"".join(collect(payload, 2, 4))) == {
+        "id": "x",
+        "content_ast": {"children": [{"id": "a"}, {"id": "b"}]},
+        "cached": [1, 2],
+        "items": [3]
+    }
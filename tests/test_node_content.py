@@ -0,0 +1,109 @@
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+import main_ast
+from database import get_async_db
+from database_helpers import InlineWorkers, run_with_database
+from services.ast_service import ASTService
+from services.document_cache import DocumentCache
+from services.document_service import DocumentService
+from services.document_storage import DocumentStorage
+
+MARKDOWN = """# Title
+
+Intro words here.
+
+## Part
+
+- item one
+- item two with more words
+
+Closing text.
+"""
+
+
+@pytest.fixture
+def client():
+    main_ast.app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(main_ast.app)
+    main_ast.app.dependency_overrides.pop(get_async_db)
+
+
+def test_content_endpoint_stops_after_the_fast_path(client, monkeypatch):
+    async def update_node_content(db, document_id, node_id, content):
+        return {"wordCount": 7}
+
+    async def update_ast_node(*args, **kwargs):
+        pytest.fail("the tree path ran after the fast path")
+
+    monkeypatch.setattr(main_ast.document_service, "update_node_content", update_node_content)
+    monkeypatch.setattr(main_ast.document_service, "update_ast_node", update_ast_node)
+
+    response = client.put("/documents/doc/nodes/node/content", json={"content": "new"})
+    assert response.status_code == 200
+    assert response.json() == {"id": "doc", "node_id": "node", "metadata": {"wordCount": 7}}
+
+
+def test_content_endpoint_falls_back_once(client, monkeypatch):
+    calls = []
+
+    async def update_node_content(db, document_id, node_id, content):
+        calls.append("fast")
+        return None
+
+    async def update_ast_node(db, document_id, node_id, operation, data, fast_path=True):
+        calls.append(("tree", operation, data, fast_path))
+        return main_ast.Document(doc_metadata={"wordCount": 8})
+
+    monkeypatch.setattr(main_ast.document_service, "update_node_content", update_node_content)
+    monkeypatch.setattr(main_ast.document_service, "update_ast_node", update_ast_node)
+
+    response = client.put("/documents/doc/nodes/node/content", json={"content": "new"})
+    assert response.json()["metadata"] == {"wordCount": 8}
+    assert calls == ["fast", ("tree", "update", {"content": "new"}, False)]
+
+
+def comparable(ast):
+    """The parts of an AST a content edit changes."""
+    return {key: ast.get(key) for key in ("children", "sections", "metadata")}
+
+
+@pytest.mark.parametrize("chunked", [True, False])
+def test_node_content_paths_match_the_tree_edit(chunked):
+    """The SQL fast path (chunked documents) and its fallback give what ASTService.update_ast_node gives."""
+    ast_service = ASTService(cache=None)
+
+    async def scenario(sessions):
+        service = DocumentService(workers=InlineWorkers(), cache=DocumentCache(), session_factory=sessions)
+        service.storage = DocumentStorage(threshold=0, chunk_bytes=200) if chunked else DocumentStorage()
+        async with sessions() as db:
+            document = await service.create_document(db, "Node content", MARKDOWN)
+        try:
+            ast = document.content_ast
+            for node, content in ((ast["children"][0], "New title words"),
+                                  (ast["children"][3]["children"][1], "item two")):
+                expected = ast_service.update_ast_node(ast, node["id"], "update", {"content": content})
+                async with sessions() as db:
+                    metadata = await service.update_node_content(db, document.id, node["id"], content)
+                    assert (metadata is not None) == chunked
+                    if metadata is None:
+                        updated = await service.update_ast_node(
+                            db, document.id, node["id"], "update", {"content": content}, fast_path=False
+                        )
+                        metadata = updated.doc_metadata
+                async with sessions() as db:
+                    ast = (await service.get_document(db, document.id)).content_ast
+                assert comparable(ast) == comparable(expected)
+                assert metadata == expected["metadata"]
+        finally:
+            async with sessions() as db:
+                await service.delete_document(db, document.id)
+
+    run_with_database(scenario)
@@ -0,0 +1,146 @@
+import sys
+import os
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ast_service import ASTService
+from services.document_cache import DocumentCache
+from services.document_service import DocumentService
+from services.node_index import NodeIndex
+
+SAMPLE_MARKDOWN = """# Title
+
+First paragraph.
+
+- one
+- two
+  - nested
+
+> quote
+
+Last paragraph.
+"""
+
+ast_service = ASTService(cache=None)
+
+
+def walk_paths(nodes, path=()):
+    """Reference DFS: yield (node, path) for every node."""
+    for i, node in enumerate(nodes):
+        yield node, list(path) + [i]
+        yield from walk_paths(node.get("children", []), tuple(path) + (i,))
+
+
+def test_index_matches_tree_walk():
+    """Lookups and paths agree with a full walk of the tree."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    index = NodeIndex(ast)
+
+    for node, path in walk_paths(ast["children"]):
+        assert index.get(node["id"]) is node
+        assert index.path(node["id"]) == path
+    assert len(index) == ast["metadata"]["nodeCount"]
+
+
+def test_index_tracks_structural_edits():
+    """Slots are renumbered after inserts and removals under a parent."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    index = NodeIndex(ast)
+    last = ast["children"][-1]
+    removed = ast["children"][1]
+
+    new_node = {"id": "node_new", "type": "paragraph", "content": "Inserted", "children": []}
+    ast["children"].insert(0, new_node)
+    index.add(new_node, None)
+    assert index.path("node_new") == [0]
+    assert index.path(last["id"]) == [len(ast["children"]) - 1]
+
+    ast["children"].remove(removed)
+    index.remove(removed["id"])
+    assert index.get(removed["id"]) is None
+    assert index.path(last["id"]) == [len(ast["children"]) - 1]
+
+
+def test_ast_service_reuses_index_for_same_ast():
+    """The service builds one index per AST object."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    node_id = ast["children"][2]["children"][1]["id"]
+
+    assert ast_service.get_node_index(ast) is ast_service.get_node_index(ast)
+    assert ast_service.find_node_by_id(ast, node_id) is ast["children"][2]["children"][1]
+    assert ast_service.get_node_path(ast, node_id) == [2, 1]
+    assert ast_service.get_node_path(ast, "missing") == []
+
+
+def test_ast_service_does_not_keep_indexes_alive():
+    """Indexes are only found again while something else holds them."""
+    service = ASTService(cache=None)
+    ast = service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+
+    index = weakref.ref(service.get_node_index(ast))
+    gc.collect()
+    assert index() is None
+
+
+def test_edits_leave_a_held_index_unchanged():
+    """An edit works on a copy of the index, which readers of the old AST may still use."""
+    ast = ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    index = ast_service.get_node_index(ast)
+    removed = ast["children"][1]["id"]
+
+    updated = ast_service.update_ast_node(ast, removed, "delete", {})
+
+    assert index.ast is ast
+    assert index.get(removed) is ast["children"][1]
+    assert ast_service.get_node_index(ast) is index
+    assert ast_service.find_node_by_id(updated, removed) is None
+
+
+def test_cached_documents_hold_their_index():
+    """The document cache keeps the index of a cached version and drops it with the entry."""
+    cache = DocumentCache()
+    service = DocumentService(cache=cache)
+    ast = service.ast_service.parse_markdown_to_ast(SAMPLE_MARKDOWN)
+    version = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    cache.put("doc-1", version, {"id": "doc-1", "content_ast": ast}, cache.token())
+    size = cache.get_stats()["bytes"]
+
+    index = service._node_index("doc-1", version, ast)
+    assert service._node_index("doc-1", version, ast) is index
+    assert service.ast_service.get_node_index(ast) is index
+    assert cache.get_stats()["bytes"] == size + index.memory_size()
+
+    index = weakref.ref(index)
+    gc.collect()
+    assert index() is not None
+    cache.invalidate("doc-1")
+    gc.collect()
+    assert index() is None
+
+
+def test_index_cache_is_safe_across_threads():
+    """Lookups and edits from several threads share the index cache without errors."""
+    service = ASTService(cache=None)
+    asts = [service.parse_markdown_to_ast(SAMPLE_MARKDOWN + f"\nParagraph {i}.\n") for i in range(20)]
+
+    def work(offset):
+        for i in range(2000):
+            ast = asts[(offset * 7 + i) % len(asts)]
+            node_id = ast["children"][1]["id"]
+            assert service.find_node_by_id(ast, node_id)["id"] == node_id
+            updated = service.update_ast_node(ast, node_id, "update", {"content": f"edit {i}"})
+            assert service.find_node_by_id(updated, node_id)["content"] == f"edit {i}"
+
+    # Switch threads often so that interleavings inside the cache are likely
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(work, range(4)))
+    finally:
+        sys.setswitchinterval(interval)
@@ -0,0 +1,101 @@
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi.testclient import TestClient
+
+import main_ast
+from database import get_async_db
+from database_helpers import InlineWorkers, run_with_database
+from services.document_cache import DocumentCache
+from services.document_service import DocumentService
+from services.document_storage import DocumentStorage
+
+MARKDOWN = "".join(
+    f"# Section {i}\n\nSome text for section {i}.\n\n- item {i}\n  - nested {i}\n\n" for i in range(6)
+)
+
+RANGES = [(0, 2), (1, 4), (10, 100), (5, 2), (100, 200)]
+
+
+@pytest.fixture
+def client():
+    main_ast.app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(main_ast.app)
+    main_ast.app.dependency_overrides.pop(get_async_db)
+
+
+def walk(nodes):
+    for node in nodes:
+        yield node
+        yield from walk(node.get("children") or [])
+
+
+@pytest.mark.parametrize("chunked", [True, False])
+def test_node_and_range_reads_match_the_full_ast(chunked):
+    """Subtrees and top-level ranges read in SQL equal the slices of the full AST, positions included."""
+    async def scenario(sessions):
+        service = DocumentService(workers=InlineWorkers(), cache=DocumentCache(), session_factory=sessions)
+        service.storage = DocumentStorage(threshold=0, chunk_bytes=200) if chunked else DocumentStorage()
+        # Reads must go to the database
+        service.cache.enabled = False
+        async with sessions() as db:
+            document = await service.create_document(db, "Node reads", MARKDOWN)
+        try:
+            async with sessions() as db:
+                # Leave line shifts pending, which reads must apply
+                first = document.content_ast["children"][0]["id"]
+                await service.update_ast_node(db, document.id, first, "insert",
+                                              {"node": {"type": "paragraph", "content": "Inserted"}})
+                full = await service.get_document(db, document.id)
+                assert full.content_ast.get("lineShifts")
+                assert bool(service.storage.is_chunked(full)) == chunked
+                children = service.ast_service.resolve_positions(full.content_ast)["children"]
+
+                for node in walk(children):
+                    assert await service.get_node(db, document.id, node["id"]) == node
+                assert await service.get_node(db, document.id, "missing") is None
+
+                for start, end in RANGES:
+                    assert await service.get_children(db, document.id, start, end) == {
+                        "children": children[start:end],
+                        "start": min(start, len(children)),
+                        "total": len(children)
+                    }
+        finally:
+            async with sessions() as db:
+                await service.delete_document(db, document.id)
+
+        async with sessions() as db:
+            assert await service.get_node(db, document.id, first) is None
+            assert await service.get_children(db, document.id, 0, 2) is None
+
+    run_with_database(scenario)
+
+
+def test_read_endpoints_return_the_service_results(client, monkeypatch):
+    calls = []
+
+    async def get_node(db, document_id, node_id):
+        calls.append((document_id, node_id))
+        return {"id": node_id, "type": "paragraph"} if node_id == "n1" else None
+
+    async def get_children(db, document_id, start, end):
+        calls.append((document_id, start, end))
+        return {"children": [], "start": start, "total": 0} if document_id == "doc" else None
+
+    monkeypatch.setattr(main_ast.document_service, "get_node", get_node)
+    monkeypatch.setattr(main_ast.document_service, "get_children", get_children)
+
+    assert client.get("/documents/doc/nodes/n1").json() == {"id": "n1", "type": "paragraph"}
+    assert client.get("/documents/doc/nodes/n2").status_code == 404
+    assert client.get("/documents/doc/children", params={"start": 2, "end": 5}).json() == {
+        "children": [], "start": 2, "total": 0
+    }
+    assert client.get("/documents/other/children").status_code == 404
+    assert client.get("/documents/doc/children", params={"start": -1}).status_code == 422
+    assert calls == [("doc", "n1"), ("doc", "n2"), ("doc", 2, 5), ("other", 0, 100)]
@@ -0,0 +1,51 @@
+import sys
+import os
+import asyncio
+import threading
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.worker_pool import WorkerPool, WorkerPoolSaturated, TaskTooLarge
+
+
+def test_worker_pool_rejects_when_saturated():
+    """Tasks beyond workers plus queue depth are refused without waiting."""
+    pool = WorkerPool(parse_workers=1, transform_workers=1, queue_depth=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run_transform(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            await pool.run_transform(len, "abc")
+        except WorkerPoolSaturated as e:
+            assert e.retry_after >= 1
+        else:
+            raise AssertionError("third task should be rejected")
+        release.set()
+        await asyncio.gather(*running)
+        return await pool.run_transform(len, "abc")
+
+    try:
+        assert asyncio.run(scenario()) == 3
+        stats = pool.get_stats()["transform"]
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["inFlight"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_enforces_task_size():
+    """Inputs over a lane's size limit are refused."""
+    pool = WorkerPool(max_parse_bytes=10)
+
+    try:
+        asyncio.run(pool.run_parse(len, "x" * 11, size=11))
+    except TaskTooLarge as e:
+        assert e.limit == 10
+    else:
+        raise AssertionError("oversized parse should be rejected")
+    finally:
+        pool.shutdown()